@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Job, OfficeSite
+
+
+@admin.register(OfficeSite)
+class OfficeSiteAdmin(admin.ModelAdmin):
+    list_display = ('name', 'latitude', 'longitude', 'radius_meters', 'is_active')
+    list_filter = ('is_active',)
+    filter_horizontal = ('employees',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'attempts', 'run_at', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_by', 'locked_at', 'result', 'last_error', 'created_at', 'finished_at')
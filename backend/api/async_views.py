@@ -0,0 +1,163 @@
+"""
+Native async endpoints for ASGI deployments (see gunicorn.conf.py).
+
+attendance_mark has the same request and response contract as AttendanceView,
+as plain Django async views because DRF views are sync-only. Reads use the
+async ORM and the geofence check runs on the in-process index, so a check-in
+only leaves the event loop for the transactional write (record_check_in),
+which the ORM cannot do natively in async code yet.
+
+event_stream is the server-sent event feed of api/events.py. An open stream
+costs a queue on the event loop rather than a worker thread, which is why it
+is only served under ASGI.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.request import Request
+
+from . import events, geofence
+from .authentication import CachedTokenAuthentication
+from .models import Attendance, User
+from .pagination import KeysetPagination
+from .serializers import AttendanceSerializer
+from .views import AttendanceView, date_range_filters, geofence_error, record_check_in, user_department
+
+
+def error(message, status, **extra):
+    return JsonResponse({'error': message, **extra}, status=status)
+
+
+def request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+async def attendance_mark(request):
+    if request.method == 'GET':
+        return await attendance_history(request)
+
+    data = request_data(request)
+    if data is None:
+        return error('Malformed request body', 400)
+    user_id = data.get('user_id')
+    lat = data.get('latitude')
+    lng = data.get('longitude')
+
+    if not user_id or not lat or not lng:
+        return error('Missing location data', 400)
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return error('Invalid location data', 400)
+
+    try:
+        user = await User.objects.select_related('profile').aget(id=user_id)
+    except (User.DoesNotExist, ValueError):
+        return error('User not found', 404)
+
+    index = geofence.cached_index() or await sync_to_async(geofence.get_index)()
+    site, distance = index.locate(lat, lng, user.id, user_department(user))
+    if site is None:
+        return error(
+            geofence_error(distance), 403,
+            distance=f"{int(distance)} meters away" if distance is not None else None,
+        )
+
+    attendance, message = await sync_to_async(record_check_in)(user)
+
+    return JsonResponse({
+        'message': message,
+        'site': site.name,
+        'distance': f"{int(distance)} meters",
+        'data': AttendanceSerializer(attendance).data,
+    })
+
+
+async def attendance_history(request):
+    user_id = request.GET.get('user_id')
+    if not user_id:
+        return error('Missing user_id parameter', 400)
+    try:
+        if not await User.objects.filter(id=user_id).aexists():
+            return error('User not found', 404)
+    except ValueError:
+        return error('User not found', 404)
+
+    date_range, message = date_range_filters(request.GET)
+    if message:
+        return error(message, 400)
+    history = Attendance.objects.filter(user_id=user_id, **date_range).order_by('-date', '-id')
+    paginator = KeysetPagination()
+    try:
+        page_queryset = paginator.page_queryset(history, Request(request), view=AttendanceView)
+    except NotFound as exc:
+        return JsonResponse({'detail': str(exc.detail)}, status=404)
+
+    if page_queryset is None:
+        rows = [row async for row in history]
+        return JsonResponse(AttendanceSerializer(rows, many=True).data, safe=False)
+    page = paginator.finish_page([row async for row in page_queryset])
+    return JsonResponse(paginator.get_paginated_data(AttendanceSerializer(page, many=True).data))
+
+
+def stream_user(request):
+    """
+    The user of a `Token` Authorization header or, since browsers' EventSource
+    cannot set headers, of a `token` query parameter. None when missing or invalid.
+    """
+    key = request.GET.get('token')
+    header = request.headers.get('Authorization', '').split()
+    if len(header) == 2 and header[0].lower() == 'token':
+        key = header[1]
+    if not key:
+        return None
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+@require_GET
+async def event_stream(request):
+    if not isinstance(request, ASGIRequest):
+        return error('The event stream is only served under ASGI (SERVE_ASGI=True)', 501)
+    user = await sync_to_async(stream_user)(request)
+    if user is None:
+        return error('Invalid or missing token', 401)
+
+    # Subscribe before returning so nothing published from here on is missed.
+    subscriber = events.subscribe(user)
+    response = StreamingHttpResponse(stream_events(subscriber), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no' # nginx: pass events through as they are written
+    return response
+
+
+async def stream_events(subscriber):
+    try:
+        yield f'retry: {settings.EVENT_STREAM_RETRY_MS}\n: connected\n\n'
+        while True:
+            event = await subscriber.next(settings.EVENT_STREAM_HEARTBEAT)
+            if event is None:
+                # Keeps proxies from closing an idle connection.
+                yield ': keepalive\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+    finally:
+        events.unsubscribe(subscriber)
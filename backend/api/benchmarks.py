@@ -0,0 +1,262 @@
+"""
+Endpoint benchmarks (`manage.py benchmark_endpoints`).
+
+Every named route in api/urls.py is requested through the Django test client
+with a real token header, so authentication, middleware, serialization and
+the database all count. For each scenario we record latency percentiles,
+single-client throughput, SQL queries per request (via an execute wrapper,
+which works with DEBUG off), time spent in the database and the response
+size. The results are plain dicts, ready to be dumped as JSON and compared
+against a baseline run of another branch.
+
+post_json() and run_spike() drive the concurrent load tests
+(`manage.py loadtest_checkin`, `manage.py loadtest_login`) against a
+running server instead.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+
+from .synthetic import DEFAULT_PASSWORD
+
+# Query parameters for routes that need them to do real work. Values are
+# formatted with context().
+ROUTE_PARAMS = {
+    'mark_attendance': {'user_id': '{employee_id}'},
+    'mark_attendance_async': {'user_id': '{employee_id}'},
+    'reports_summary': {'start_date': '{month_ago}', 'end_date': '{today}'},
+    'attendance_export': {'start_date': '{month_ago}', 'end_date': '{today}'},
+    'attendance_rollups': {'start_date': '{month_ago}', 'end_date': '{today}'},
+    'search': {'q': 'fix'},
+}
+# Streams that never finish a response; not benchmarked.
+STREAMING_ROUTES = {'events'}
+# Routes about the caller's own data, requested as an employee; all others run as an admin.
+EMPLOYEE_ROUTES = {'my_tickets', 'mark_attendance', 'mark_attendance_async'}
+# Extra scenarios: (label, route name, method, params or body, run as employee).
+EXTRA_SCENARIOS = [
+    ('login', 'login', 'post', {'username': '{employee_username}', 'password': DEFAULT_PASSWORD}, False),
+    ('employee-list?view=summary', 'employee-list', 'get', {'view': 'summary'}, False),
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+async def post_json(url, payload, timeout):
+    """Minimal HTTP/1.1 POST over a fresh connection; returns the status code."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=parts.scheme == 'https'), timeout
+    )
+    try:
+        body = json.dumps(payload).encode()
+        writer.write(
+            f'POST {parts.path} HTTP/1.1\r\n'
+            f'Host: {parts.netloc}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            'Connection: close\r\n\r\n'.encode() + body
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_spike(url, payloads, concurrency, timeout):
+    """POST every payload with at most `concurrency` in flight: (seconds, sorted latencies, Counter of statuses)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], Counter()
+
+    async def one(payload):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = await post_json(url, payload, timeout)
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                # Counted under None: no response at all.
+                status = None
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(payload) for payload in payloads))
+    return time.perf_counter() - started, sorted(latencies), statuses
+
+
+def api_routes():
+    """(name, url pattern) of every named route in api/urls.py, without DRF's format-suffix copies."""
+    from . import urls
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif pattern.name and 'format' not in pattern.pattern.regex.groupindex:
+                yield pattern.name, pattern
+
+    return list(dict(walk(urls.urlpatterns)).items())
+
+
+class Scenario:
+    def __init__(self, label, route, method='get', data=None, as_employee=False):
+        self.label = label
+        self.route = route
+        self.method = method
+        self.data = data or {}
+        self.as_employee = as_employee
+
+
+def scenarios(page_size=None):
+    """Scenarios for every route; list routes get `page_size` when given."""
+    found = [
+        Scenario(name, name, data=ROUTE_PARAMS.get(name), as_employee=name in EMPLOYEE_ROUTES)
+        for name, _ in api_routes()
+    ]
+    found += [Scenario(*extra) for extra in EXTRA_SCENARIOS]
+    if page_size:
+        for scenario in found:
+            if scenario.route.endswith('-list'):
+                scenario.data = {**scenario.data, 'page_size': page_size}
+    return found
+
+
+def context(employee):
+    today = timezone.localdate()
+    return {
+        'employee_id': employee.pk,
+        'employee_username': employee.username,
+        'today': today.isoformat(),
+        'month_ago': (today - timedelta(days=30)).isoformat(),
+    }
+
+
+class QueryCounter:
+    """connection.execute_wrapper() that counts statements and the time spent in them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
+
+
+def request_once(client, method, path, data, headers):
+    # Repeated logins would otherwise be throttled after a few requests; the
+    # benchmark measures the endpoint, not the limiter.
+    caches['throttle'].clear()
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        if method == 'get':
+            response = client.get(path, data, headers=headers)
+        else:
+            response = client.post(path, data, content_type='application/json', headers=headers)
+        # Streaming responses do their work while being consumed.
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        elapsed = time.perf_counter() - start
+    return response, body, elapsed, counter
+
+
+def detail_pk(client, scenario, headers):
+    """First id from the matching list route, for `<name>-detail` routes."""
+    response = client.get(reverse(scenario.route.replace('-detail', '-list')), headers=headers)
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    rows = data.get('results', []) if isinstance(data, dict) else data
+    return rows[0]['id'] if rows else None
+
+
+def run(scenario, tokens, employee, requests, warmup):
+    """Benchmark one scenario; returns its result dict, with 'skipped' set when it cannot run."""
+    client = Client()
+    headers = {'Authorization': f'Token {tokens["employee" if scenario.as_employee else "admin"]}'}
+    values = context(employee)
+    data = {key: str(value).format(**values) for key, value in scenario.data.items()}
+    result = {'endpoint': scenario.label, 'method': scenario.method.upper()}
+
+    if scenario.route in STREAMING_ROUTES:
+        return {**result, 'skipped': 'event stream'}
+    kwargs = {}
+    if scenario.route.endswith('-detail'):
+        kwargs['pk'] = detail_pk(client, scenario, headers)
+        if kwargs['pk'] is None:
+            return {**result, 'skipped': 'no rows to fetch'}
+    path = reverse(scenario.route, kwargs=kwargs)
+    result['path'] = path
+
+    for _ in range(warmup):
+        response = request_once(client, scenario.method, path, data, headers)[0]
+    latencies, queries, db_seconds = [], [], []
+    for _ in range(requests):
+        response, body, elapsed, counter = request_once(client, scenario.method, path, data, headers)
+        latencies.append(elapsed)
+        queries.append(counter.queries)
+        db_seconds.append(counter.seconds)
+    if response.status_code == 405:
+        return {**result, 'skipped': f'{scenario.method.upper()} not allowed'}
+
+    latencies.sort()
+    return {
+        **result,
+        'status': response.status_code,
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'throughput_rps': round(len(latencies) / sum(latencies), 1),
+        'queries': sorted(queries)[len(queries) // 2],
+        'db_ms': round(sorted(db_seconds)[len(db_seconds) // 2] * 1000, 3),
+        'bytes': len(body),
+    }
+
+
+def compare(baseline, current, threshold, min_ms=1.0):
+    """
+    Regressions of `current` against `baseline` (both result lists): p95 or
+    response size up by more than `threshold` (a fraction), or more queries.
+    Latency changes under `min_ms` are ignored as noise.
+    """
+    def key(row):
+        return row['scale'], row['method'], row['endpoint']
+
+    before = {key(row): row for row in baseline if 'skipped' not in row}
+    regressions = []
+    for row in current:
+        old = before.get(key(row))
+        if old is None or 'skipped' in row:
+            continue
+        name = f"{row['method']} {row['endpoint']} @ {row['scale']}"
+        if row['p95_ms'] - old['p95_ms'] > max(old['p95_ms'] * threshold, min_ms):
+            regressions.append(f"{name}: p95 {old['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+        if row['queries'] > old['queries']:
+            regressions.append(f"{name}: queries {old['queries']} -> {row['queries']}")
+        if row['bytes'] > old['bytes'] * (1 + threshold):
+            regressions.append(f"{name}: response {old['bytes']} -> {row['bytes']} bytes")
+    return regressions
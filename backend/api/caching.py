@@ -0,0 +1,119 @@
+"""
+Conditional GET support for read-heavy list endpoints.
+
+Each endpoint names the collections its payload depends on. Their write
+counters (CollectionVersion, bumped from api/signals.py once a write
+commits) plus the request path and user form the ETag, so a matching
+If-None-Match is answered with 304 after a single primary-key lookup and
+before any serialization. The rendered JSON
+body for the current ETag is kept in the default Django cache.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from . import metrics
+from .models import CollectionVersion
+
+RESPONSE_CACHE_TIMEOUT = 300
+
+
+def collection_versions(names):
+    versions = dict(CollectionVersion.objects.filter(name__in=names).values_list('name', 'version'))
+    return [versions.get(name, 0) for name in names]
+
+
+def bump_collections(*names):
+    """
+    Bump the versions of `names` once the current transaction commits. Bumping
+    inside it would hold the CollectionVersion row lock until the commit, and
+    every other write to the same collection would queue behind it.
+    """
+    transaction.on_commit(lambda: _bump(names))
+
+
+def _bump(names):
+    for name in names:
+        if CollectionVersion.objects.filter(name=name).update(version=F('version') + 1):
+            continue
+        try:
+            with transaction.atomic():
+                CollectionVersion.objects.create(name=name, version=1)
+        except IntegrityError:
+            CollectionVersion.objects.filter(name=name).update(version=F('version') + 1)
+
+
+class ShortCircuit(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag / If-None-Match handling and a response cache to GET actions.
+
+    Set `version_collections` to the collection names the payload depends on
+    and `conditional_actions` to the viewset actions to cover (plain APIViews
+    are covered on `get`).
+    """
+    version_collections = ()
+    conditional_actions = ('list',)
+
+    def get_etag(self, request):
+        versions = collection_versions(self.version_collections)
+        scope = request.user.pk if request.user.is_authenticated else 'anon'
+        raw = f"{request.get_full_path()}|{scope}|{versions}"
+        return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+    def is_conditional(self, request):
+        if request.method != 'GET' or not self.version_collections:
+            return False
+        action = getattr(self, 'action', None)
+        return action in self.conditional_actions if action else True
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if not self.is_conditional(request):
+            return
+        self.etag = self.get_etag(request)
+
+        if self.etag in parse_etags(request.headers.get('If-None-Match', '')):
+            raise ShortCircuit(self.with_validators(HttpResponseNotModified()))
+
+        if request.accepted_renderer.format == 'json':
+            cached = cache.get(f'api-response:{self.etag}')
+            if cached is not None:
+                content, content_type = cached
+                raise ShortCircuit(self.with_validators(HttpResponse(content, content_type=content_type)))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ShortCircuit):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, 'etag', None)
+        if etag and response.status_code == 200 and not response.has_header('ETag'):
+            self.with_validators(response)
+            if getattr(response, 'accepted_renderer', None) and response.accepted_renderer.format == 'json':
+                # Rendered here rather than after the view, so time it for the request metrics.
+                with metrics.timed(request, 'render'):
+                    response.render()
+                cache.set(
+                    f'api-response:{etag}',
+                    (response.content, response['Content-Type']),
+                    RESPONSE_CACHE_TIMEOUT,
+                )
+        return response
+
+    def with_validators(self, response):
+        response['ETag'] = self.etag
+        # Let browsers keep the body but revalidate it on every use.
+        response['Cache-Control'] = 'private, no-cache'
+        return response
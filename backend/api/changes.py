@@ -0,0 +1,245 @@
+"""
+Change log for delta sync (`GET /api/changes/`).
+
+Database triggers on the synced tables append a Change row for every insert,
+update and delete, so bulk writes and raw SQL are logged as well as model
+saves. A client keeps the cursor of the last change it has seen and asks
+for everything after it; several changes to one object collapse into its
+latest state.
+
+The cursor has to be safe to resume from: no change may later appear
+before it. SQLite has a single writer, so Change ids are assigned in commit
+order and the cursor is the last id. On Postgres, concurrent transactions
+can commit their ids out of order. Each change therefore records the
+writing transaction's id, and only changes of transactions older than every
+transaction still running (the snapshot's xmin) are served, in
+(transaction_id, id) order. A transaction that is still open cannot add
+anything before such a cursor.
+
+Changes to rows that belong to one employee (work updates, attendance)
+record that employee as the owner. An employee reads only their own entries
+from those collections, so the log does not reveal what others are doing.
+Their cursor moves past the entries it skips all the same. A cursor records
+whose view it was issued for, and the client must reload when that no longer
+matches, e.g. after a role change.
+
+The log is pruned after CHANGE_LOG_RETENTION_DAYS (`manage.py prune_changes`).
+A cursor older than the oldest remaining change is rejected so the client
+resyncs from the list endpoints.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Max, Min, Q
+
+from .models import Attendance, Change, EmployeeProfile, Ticket, TicketUpdate, User, WorkUpdate
+
+# (model, collection, column holding the collection's object id, whether deleting the row deletes the object,
+#  column holding the owning employee or None when everyone may see the collection)
+TRACKED = [
+    (Ticket, 'tickets', 'id', True, None),
+    (TicketUpdate, 'ticket_updates', 'id', True, None),
+    (WorkUpdate, 'work_updates', 'id', True, 'user_id'),
+    (Attendance, 'attendance', 'id', True, 'user_id'),
+    (User, 'employees', 'id', True, None),
+    # An employee is served with their profile embedded.
+    (EmployeeProfile, 'employees', 'user_id', False, None),
+]
+OWNED_COLLECTIONS = {collection for _, collection, _, _, owner in TRACKED if owner}
+# Columns whose updates are not worth a sync.
+IGNORED_COLUMNS = {User: {'last_login'}}
+# Migration that first installs the triggers; api/signals.py reinstalls them after later migrations.
+MIGRATION = '0019_change'
+
+POSTGRES_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION api_change_log() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    row_data jsonb := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+BEGIN
+    INSERT INTO {Change._meta.db_table} (collection, object_id, deleted, owner_id, transaction_id)
+    VALUES (
+        TG_ARGV[0], (row_data ->> TG_ARGV[1])::bigint, TG_OP = 'DELETE' AND TG_ARGV[2]::boolean,
+        (row_data ->> TG_ARGV[3])::bigint, pg_current_xact_id()::text::bigint
+    );
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _trigger_name(model, operation):
+    return f'api_change_{model._meta.db_table}_{operation}'
+
+
+def _watched_columns(model):
+    ignored = IGNORED_COLUMNS.get(model, set())
+    return [f'"{field.column}"' for field in model._meta.concrete_fields if field.name not in ignored]
+
+
+def _sqlite_insert(collection, column, owner, row, deleted):
+    owner_value = f'{row}.{owner}' if owner else 'NULL'
+    return (
+        f"INSERT INTO {Change._meta.db_table} (collection, object_id, deleted, owner_id) "
+        f"VALUES ('{collection}', {row}.{column}, {deleted:d}, {owner_value});"
+    )
+
+
+def _sqlite_triggers():
+    """name -> CREATE statement for every trigger."""
+    triggers = {}
+    for model, collection, column, deletes, owner in TRACKED:
+        source = model._meta.db_table
+        triggers[_trigger_name(model, 'insert')] = (
+            f"AFTER INSERT ON {source} BEGIN {_sqlite_insert(collection, column, owner, 'new', False)} END"
+        )
+        triggers[_trigger_name(model, 'update')] = (
+            f"AFTER UPDATE OF {', '.join(_watched_columns(model))} ON {source} "
+            f"BEGIN {_sqlite_insert(collection, column, owner, 'new', False)} END"
+        )
+        triggers[_trigger_name(model, 'delete')] = (
+            f"AFTER DELETE ON {source} BEGIN {_sqlite_insert(collection, column, owner, 'old', deletes)} END"
+        )
+    return {name: f"CREATE TRIGGER {name} {body}" for name, body in triggers.items()}
+
+
+def install(connection):
+    """(Re)create the triggers; safe to run repeatedly, and picks up columns added since."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name, statement in _sqlite_triggers().items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute(statement)
+        elif connection.vendor == 'postgresql':
+            cursor.execute(POSTGRES_FUNCTION)
+            for model, collection, column, deletes, owner in TRACKED:
+                name, table = _trigger_name(model, 'log'), model._meta.db_table
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+                cursor.execute(
+                    f"CREATE TRIGGER {name} AFTER INSERT OR DELETE OR UPDATE OF {', '.join(_watched_columns(model))} "
+                    f"ON {table} FOR EACH ROW EXECUTE FUNCTION "
+                    f"api_change_log('{collection}', '{column}', '{deletes}', '{owner or ''}')"
+                )
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in _sqlite_triggers():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        elif connection.vendor == 'postgresql':
+            for model, *_ in TRACKED:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {_trigger_name(model, 'log')} ON {model._meta.db_table}")
+            cursor.execute("DROP FUNCTION IF EXISTS api_change_log()")
+
+
+def reset():
+    """
+    Empty the log, leaving one marker row. Every cursor issued so far is then
+    older than the log, so clients resync instead of missing unlogged writes.
+    """
+    marker = Change.objects.create(collection='', object_id=0)
+    Change.objects.filter(id__lt=marker.id).delete()
+
+
+@contextmanager
+def deferred(connection):
+    """For bulk loads: no triggers while the block runs, then reset() the log it no longer covers."""
+    uninstall(connection)
+    try:
+        yield
+    finally:
+        install(connection)
+        reset()
+
+
+def prune(before):
+    """Delete changes older than `before`, always keeping the newest; returns the number deleted."""
+    newest = Change.objects.aggregate(newest=Max('id'))['newest']
+    if newest is None:
+        return 0
+    return Change.objects.filter(changed_at__lt=before, id__lt=newest).delete()[0]
+
+
+class ExpiredCursor(Exception):
+    pass
+
+
+def encode_cursor(transaction_id, id, owner=None):
+    return f'{transaction_id}.{id}' if owner is None else f'{transaction_id}.{id}.{owner}'
+
+
+def decode_cursor(cursor):
+    """(transaction_id, id, owner) of a cursor; raises ValueError when malformed."""
+    parts = cursor.split('.')
+    if len(parts) not in (2, 3):
+        raise ValueError(cursor)
+    transaction_id, id, *owner = map(int, parts)
+    return transaction_id, id, owner[0] if owner else None
+
+
+def _horizon():
+    """Postgres: the oldest transaction still running; changes of older transactions are final."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def current_cursor(owner=None):
+    """
+    Cursor for a client that is about to download the full collections; `owner`
+    is the employee whose view of the owned collections it reads, None for all.
+    """
+    newest = Change.objects.aggregate(newest=Max('id'))['newest'] or 0
+    if connection.vendor == 'postgresql':
+        return encode_cursor(_horizon() - 1, newest, owner)
+    return encode_cursor(0, newest, owner)
+
+
+def read(cursor, collections, limit, owner=None):
+    """
+    Changes after `cursor` in `collections`, limited to `owner`'s rows of the
+    owned collections unless `owner` is None: returns ({collection: {id: deleted}},
+    next cursor, whether more changes are waiting). Reads at most `limit` log rows.
+    Raises ExpiredCursor when pruning has removed changes the client has not seen,
+    or when the cursor was issued for another owner.
+    """
+    transaction_id, id, cursor_owner = decode_cursor(cursor)
+    if cursor_owner != owner:
+        raise ExpiredCursor(cursor)
+    # Ids start at 1, so an oldest change above 1 means the log has been pruned or reset.
+    oldest = Change.objects.aggregate(oldest=Min('id'))['oldest']
+    if oldest is not None and oldest > 1 and id < oldest:
+        raise ExpiredCursor(cursor)
+
+    log = Change.objects.filter(collection__in=collections)
+    if connection.vendor == 'postgresql':
+        log = log.filter(
+            Q(transaction_id__gt=transaction_id) | Q(transaction_id=transaction_id, id__gt=id),
+            transaction_id__lt=_horizon(),
+        ).order_by('transaction_id', 'id')
+    else:
+        log = log.filter(id__gt=id).order_by('id')
+
+    end = None
+    if owner is not None:
+        # The last entry, visible or not, that the cursor may move to once everything before it is read.
+        end = log.reverse().values_list('transaction_id', 'id').first()
+        if end is None:
+            return {}, cursor, False
+        if connection.vendor != 'postgresql':
+            # Entries committed from here on wait for the next read. (On Postgres the horizon already fixes the set.)
+            log = log.filter(id__lte=end[1])
+        log = log.filter(Q(owner_id=owner) | ~Q(collection__in=OWNED_COLLECTIONS))
+    rows = list(log.values_list('collection', 'object_id', 'deleted', 'transaction_id', 'id')[:limit + 1])
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    changes = {}
+    for collection, object_id, deleted, _, _ in rows:
+        # Rows are in log order, so the last change to an object wins.
+        changes.setdefault(collection, {})[object_id] = deleted
+    if end is not None and not more:
+        transaction_id, id = end[0] or 0, end[1]
+    elif rows:
+        transaction_id, id = rows[-1][3] or 0, rows[-1][4]
+    return changes, encode_cursor(transaction_id, id, owner), more
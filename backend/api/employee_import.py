@@ -0,0 +1,154 @@
+"""
+Bulk employee import (`POST /api/employees/import/`, `manage.py import_employees`).
+
+Rows have the fields of CreateEmployeeSerializer and come as CSV (one column
+per field, header first) or a JSON list of objects. All rows are validated
+before anything is written. That covers the serializer, duplicates within
+the file and usernames or employee ids that are already taken. The
+passwords are then hashed and the users and profiles are inserted with
+bulk_create in one transaction. The result is a per-row report; rows are
+numbered from 1, not counting a CSV header.
+
+PBKDF2 is what makes one-by-one onboarding slow: every create_user() burns a
+few hundred milliseconds of CPU while holding the GIL. hash_passwords()
+spreads that over a process pool. The workers are spawned, not forked,
+because the caller may be a threaded server and a fork copies the locks its
+other threads hold. They only import Django's hashers and the settings.
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .caching import bump_collections
+from .models import EmployeeProfile, User
+from .serializers import CreateEmployeeSerializer
+
+# Below this many passwords, starting the pool costs more than it saves.
+POOL_MIN_PASSWORDS = 8
+BATCH_SIZE = 500
+UNIQUE_FIELDS = ('username', 'employee_id')
+
+
+def read_rows(content, format):
+    """Rows of a CSV or JSON upload (bytes) as dicts; raises ValueError when it cannot be parsed."""
+    text = content.decode('utf-8-sig')
+    if format == 'json':
+        rows = json.loads(text)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError('Expected a JSON list of objects.')
+        return rows
+    try:
+        reader = csv.DictReader(io.StringIO(text))
+        # Blank cells count as missing, so optional fields fall back to their defaults.
+        return [
+            {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            for row in reader
+        ]
+    except csv.Error as exc:
+        raise ValueError(f'Malformed CSV: {exc}') from exc
+
+
+def validate(rows):
+    """([(row number, validated data)], [{'row': n, 'errors': {field: [messages]}}])."""
+    valid, errors = [], {}
+    first_seen = {field: {} for field in UNIQUE_FIELDS}
+    for number, row in enumerate(rows, 1):
+        serializer = CreateEmployeeSerializer(data=row)
+        if not serializer.is_valid():
+            errors[number] = dict(serializer.errors)
+            continue
+        data = dict(serializer.validated_data)
+        # What create_user() would store.
+        data['username'] = User.normalize_username(data['username'])
+        data['email'] = User.objects.normalize_email(data['email'])
+        for field in UNIQUE_FIELDS:
+            first = first_seen[field].setdefault(data[field], number)
+            if first != number:
+                errors.setdefault(number, {})[field] = [f'Same as row {first}.']
+        if number not in errors:
+            valid.append((number, data))
+
+    for field in UNIQUE_FIELDS:
+        taken = set(
+            User.objects.filter(**{f'{field}__in': [data[field] for _, data in valid]})
+            .values_list(field, flat=True)
+        )
+        for number, data in valid:
+            if data[field] in taken:
+                errors.setdefault(number, {})[field] = [f'An employee with this {field} already exists.']
+    valid = [(number, data) for number, data in valid if number not in errors]
+    return valid, [{'row': number, 'errors': errors[number]} for number in sorted(errors)]
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password() of each password, in order, on up to `workers` processes (default: one per CPU)."""
+    passwords = list(passwords)
+    workers = min(workers or os.cpu_count() or 1, len(passwords))
+    if workers <= 1 or len(passwords) < POOL_MIN_PASSWORDS:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(len(passwords) // (workers * 4), 1)))
+
+
+def new_profile(user, data):
+    """The profile an employee created from CreateEmployeeSerializer data starts with (unsaved)."""
+    return EmployeeProfile(
+        user=user,
+        department=data.get('department', 'Unassigned'),
+        designation=data.get('designation', 'Trainee'),
+        phone_number=data['phone_number'],
+        location=data.get('location', 'Head Office'),
+        date_of_birth=data.get('date_of_birth'),
+        gender=data.get('gender'),
+        employee_type=data.get('employee_type', 'Full-Time'),
+    )
+
+
+def create(valid, workers=None):
+    """Insert validated rows; returns the new users in row order."""
+    passwords = hash_passwords([data['password'] for _, data in valid], workers)
+    users = [
+        User(
+            username=data['username'],
+            email=data['email'],
+            password=password,
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            role=User.IS_EMPLOYEE,
+            employee_id=data['employee_id'],
+        )
+        for (_, data), password in zip(valid, passwords)
+    ]
+    with transaction.atomic():
+        users = User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        EmployeeProfile.objects.bulk_create(
+            [new_profile(user, data) for user, (_, data) in zip(users, valid)], batch_size=BATCH_SIZE,
+        )
+        # bulk_create skips the post_save signal that would do this.
+        bump_collections('employees')
+    return users
+
+
+def import_rows(rows, partial=False, workers=None):
+    """
+    Validate and insert `rows`. Nothing is inserted while any row is invalid,
+    unless `partial`, which imports the valid rows and reports the rest. A
+    username or employee id taken between validation and insert raises
+    IntegrityError and nothing is inserted.
+    """
+    valid, errors = validate(rows)
+    users = create(valid, workers) if valid and (partial or not errors) else []
+    return {
+        'created': len(users),
+        'employees': [
+            {'row': number, 'id': user.pk, 'username': user.username}
+            for (number, _), user in zip(valid, users)
+        ],
+        'errors': errors,
+    }
@@ -0,0 +1,210 @@
+"""
+Publish/subscribe hub behind the server-sent event stream (`GET /api/events/`).
+
+publish() is called from api/signals.py when tickets, ticket updates, work
+updates or attendance are written. Events are small notices, such as
+{"type": "ticket", "action": "updated", "id": 7}, sent once the transaction
+commits. Clients then fetch what changed from /api/changes/.
+
+publish() queues its events until the transaction commits and then sends
+them in one go, so a bulk write costs one round trip however many rows it
+touched. On Postgres that is a single pg_notify() statement, which the
+database delivers to every process. Each process that has subscribers
+keeps one extra connection LISTENing in a background thread and fans the
+notifications out to them. Other databases fall back to an in-process hub, so only
+subscribers in the publishing process hear an event. That is fine for
+development and single-worker deployments.
+
+Subscribers are asyncio queues read by the ASGI stream. They are bounded,
+and a subscriber that falls behind gets a `resync` event instead of the
+events it missed.
+"""
+import asyncio
+import json
+import logging
+import select
+import socket
+import threading
+
+from django.db import connection, transaction
+
+from .models import Attendance, Ticket, TicketUpdate, User, WorkUpdate
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'api_events'
+QUEUE_SIZE = 100
+LISTEN_POLL_SECONDS = 5.0
+RECONNECT_SECONDS = 5.0
+# model -> (event type, fields sent along with the id)
+PUSHED_MODELS = {
+    Ticket: ('ticket', ('status', 'assignee_id')),
+    TicketUpdate: ('ticket_update', ('ticket_id',)),
+    WorkUpdate: ('work_update', ('user_id',)),
+    Attendance: ('attendance', ('user_id', 'date')),
+}
+# Event types only their owner and admins receive; the others go to every signed-in user.
+OWNED_TYPES = {'work_update', 'attendance'}
+
+
+def event_for(instance, action):
+    kind, fields = PUSHED_MODELS[type(instance)]
+    event = {'type': kind, 'action': action, 'id': instance.pk}
+    for field in fields:
+        value = getattr(instance, field)
+        event[field] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return event
+
+
+class Subscriber:
+    def __init__(self, user_id, is_admin):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, event):
+        return self.is_admin or event['type'] not in OWNED_TYPES or event.get('user_id') == self.user_id
+
+    def offer(self, event):
+        """Runs on the subscriber's event loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def next(self, timeout):
+        """The next event, None after `timeout` seconds, or {'type': 'resync'} after an overflow."""
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return {'type': 'resync'}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+_lock = threading.Lock()
+_subscribers = set()
+_listener = None
+# Socket pair whose write end wakes the listener's select() for stop_listener().
+_wake = None
+_stopping = threading.Event()
+# Set while the listener's LISTEN is in place.
+_listening = threading.Event()
+
+
+def subscribe(user):
+    """Register a subscriber for `user`; call from the event loop that will read it."""
+    subscriber = Subscriber(user.pk, user.role == User.IS_ADMIN)
+    with _lock:
+        _subscribers.add(subscriber)
+    if connection.vendor == 'postgresql':
+        _start_listener()
+    return subscriber
+
+
+def unsubscribe(subscriber):
+    with _lock:
+        _subscribers.discard(subscriber)
+
+
+def dispatch(event):
+    """Hand an event to this process's subscribers; safe to call from any thread."""
+    with _lock:
+        subscribers = [subscriber for subscriber in _subscribers if subscriber.wants(event)]
+    for subscriber in subscribers:
+        try:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+        except RuntimeError:
+            # Its event loop has closed.
+            unsubscribe(subscriber)
+
+
+def publish(*events):
+    """Send `events` (small JSON-able dicts with at least type and id) together once the current transaction commits."""
+    if events:
+        # robust: the write has committed by then; a lost notice must not fail the request.
+        transaction.on_commit(lambda: _send(events), robust=True)
+
+
+def _send(events):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                [CHANNEL, [json.dumps(event) for event in events]],
+            )
+    else:
+        for event in events:
+            dispatch(event)
+
+
+def _start_listener():
+    global _listener, _wake
+    with _lock:
+        if _listener is not None and _listener.is_alive():
+            return
+        _stopping.clear()
+        _listening.clear()
+        _wake = socket.socketpair()
+        _listener = threading.Thread(target=_listen, args=(_wake[0],), name='api-events-listener', daemon=True)
+        _listener.start()
+
+
+def stop_listener(timeout=LISTEN_POLL_SECONDS):
+    """
+    Stop the LISTEN thread and close its connection, if one is running. Called
+    when a worker exits (gunicorn.conf.py) and by tests, since the open
+    connection keeps the database from being dropped.
+    """
+    global _listener, _wake
+    with _lock:
+        listener, wake = _listener, _wake
+        _listener = _wake = None
+    if listener is None:
+        return
+    _stopping.set()
+    wake[1].send(b'\0')
+    listener.join(timeout)
+    for end in wake:
+        end.close()
+
+
+def _listen(wake):
+    """Forward NOTIFYs on CHANNEL to dispatch(), reconnecting if the connection drops, until stop_listener()."""
+    while not _stopping.is_set():
+        listener = None
+        try:
+            listener = connection.get_new_connection(connection.get_connection_params())
+            listener.autocommit = True
+            with listener.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            logger.info('Listening for events on %s', CHANNEL)
+            _listening.set()
+            while not _stopping.is_set():
+                readable, _, _ = select.select([listener, wake], [], [], LISTEN_POLL_SECONDS)
+                if listener not in readable:
+                    continue
+                listener.poll()
+                while listener.notifies:
+                    notify = listener.notifies.pop(0)
+                    try:
+                        dispatch(json.loads(notify.payload))
+                    except ValueError:
+                        logger.warning('Ignoring malformed event %r', notify.payload)
+        except Exception:
+            if _stopping.is_set():
+                break
+            logger.exception('Event listener failed; reconnecting in %s s', RECONNECT_SECONDS)
+            _stopping.wait(RECONNECT_SECONDS)
+        finally:
+            _listening.clear()
+            if listener is not None:
+                try:
+                    listener.close()
+                except Exception:
+                    pass
@@ -0,0 +1,212 @@
+"""
+Streaming attendance exports (CSV and XLSX) for payroll.
+
+Rows are read with a server-side cursor (`iterator(chunk_size=...)`) and
+written out as they arrive, so memory use does not depend on how many rows
+are exported. XLSX is produced as a minimal SpreadsheetML package written
+straight into a streaming zip, without building the workbook in memory.
+Past Excel's row limit per sheet, rows continue on further sheets.
+Under ASGI the view passes the response through api.streaming, since Django
+would otherwise collect a sync stream in full before sending it.
+
+Large exports can instead run as a background job (export_job), which writes
+the file to private media storage for a signed download link.
+"""
+import csv
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import DurationField, ExpressionWrapper, F
+from django.utils import timezone
+
+from .models import Attendance
+
+CHUNK_SIZE = 2000
+# Private (see api/media.py): only reachable through a signed link.
+STORAGE_DIR = 'attendance_exports'
+
+HEADER = [
+    'Employee ID', 'Username', 'First Name', 'Last Name', 'Department',
+    'Date', 'Check In', 'Check Out', 'Hours', 'Status', 'Location Verified',
+]
+
+
+def attendance_export_rows(filters=None, chunk_size=CHUNK_SIZE):
+    """Yield one list per attendance row, oldest date first, hours computed in the database."""
+    queryset = (
+        Attendance.objects.filter(**(filters or {}))
+        .annotate(worked=ExpressionWrapper(F('check_out_time') - F('check_in_time'), output_field=DurationField()))
+        .order_by('date', 'user_id')
+        .values_list(
+            'user__employee_id', 'user__username', 'user__first_name', 'user__last_name',
+            'user__profile__department', 'date', 'check_in_time', 'check_out_time', 'worked',
+            'status', 'location_verified',
+        )
+    )
+    for (employee_id, username, first_name, last_name, department,
+         day, check_in, check_out, worked, status, verified) in queryset.iterator(chunk_size=chunk_size):
+        yield [
+            employee_id or '', username, first_name, last_name, department or '',
+            day.isoformat(),
+            timezone.localtime(check_in).strftime('%Y-%m-%d %H:%M:%S') if check_in else '',
+            timezone.localtime(check_out).strftime('%Y-%m-%d %H:%M:%S') if check_out else '',
+            round(worked.total_seconds() / 3600, 2) if worked is not None else '',
+            status,
+            'Yes' if verified else 'No',
+        ]
+
+
+class _Echo:
+    """File-like object whose write() hands the value back (see Django's streaming CSV docs)."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class _ChunkBuffer:
+    """Unseekable sink for ZipFile; the generator drains it between rows."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+# Excel refuses sheets longer than this, header included; longer exports roll over to more sheets.
+XLSX_MAX_ROWS = 1_048_576
+
+
+def _xlsx_parts(sheet_count):
+    """The package parts besides the sheets themselves, for a workbook of `sheet_count` sheets."""
+    numbers = range(1, sheet_count + 1)
+    return {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + ''.join(
+                f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for n in numbers
+            )
+            + '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="xl/workbook.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + ''.join(
+                f'<sheet name="Attendance{f" {n}" if n > 1 else ""}" sheetId="{n}" r:id="rId{n}"/>'
+                for n in numbers
+            )
+            + '</sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(
+                f'<Relationship Id="rId{n}" Target="worksheets/sheet{n}.xml" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+                for n in numbers
+            )
+            + '</Relationships>'
+        ),
+    }
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c t="n"><v>{value}</v></c>')
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return ('<row>' + ''.join(cells) + '</row>').encode()
+
+
+def stream_xlsx(rows, max_rows=XLSX_MAX_ROWS):
+    """
+    The workbook as a stream of bytes. A new sheet, with its own header, starts
+    whenever one reaches `max_rows`. The sheet count is only known at the end,
+    so the workbook parts that list the sheets are written last.
+    """
+    buffer = _ChunkBuffer()
+    rows = iter(rows)
+    sheet_count = 0
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        pending = next(rows, None)
+        while sheet_count == 0 or pending is not None:
+            sheet_count += 1
+            with archive.open(f'xl/worksheets/sheet{sheet_count}.xml', 'w', force_zip64=True) as sheet:
+                sheet.write(
+                    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                )
+                sheet.write(_xlsx_row(HEADER))
+                written = 1
+                while pending is not None and written < max_rows:
+                    sheet.write(_xlsx_row(pending))
+                    written += 1
+                    pending = next(rows, None)
+                    if len(buffer.chunks) > 16:
+                        yield buffer.drain()
+                sheet.write(b'</sheetData></worksheet>')
+            yield buffer.drain()
+        for name, content in _xlsx_parts(sheet_count).items():
+            archive.writestr(name, content)
+    yield buffer.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export_filename(filters, file_format):
+    suffix = '_'.join(str(v) for k, v in sorted(filters.items()) if k.startswith('date')) or 'all'
+    return f'attendance_{suffix}.{file_format}'
+
+
+def export_job(filters, file_format):
+    """
+    Job handler (api/jobs.py): write the export to storage. `filters` are
+    attendance lookups with ISO date strings. Returns the stored file name.
+    """
+    stream, _ = EXPORT_FORMATS[file_format]
+    with tempfile.TemporaryFile() as output:
+        for chunk in stream(attendance_export_rows(filters)):
+            output.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        output.seek(0)
+        name = default_storage.save(f'{STORAGE_DIR}/{export_filename(filters, file_format)}', File(output))
+    return {'file': name}
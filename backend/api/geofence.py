@@ -0,0 +1,272 @@
+"""
+In-process geofence index over OfficeSite rows.
+
+Sites are loaded once per process (and again after CACHE_TTL_SECONDS or an
+OfficeSite change, see api/signals.py) and bucketed into a lat/lng grid. A
+check looks up the point's grid cell, drops sites whose bounding box misses the
+point, and only then runs the exact circle/polygon test, so a check-in never
+touches the site table.
+
+Batches (locate_many) are tested site by site rather than point by point:
+each site's bbox and access checks run over all of a cell's points in one
+pass, and a polygon's edges are set up once and swept across those points.
+This is the array-at-a-time layout numpy would use, written in plain Python
+because numpy is not a dependency here. Python's per-element cost remains,
+so the gain over calling locate() per point is a modest constant factor;
+`manage.py benchmark_geofence` measures it.
+"""
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111320.0
+GRID_DEGREES = 0.01 # ~1.1 km cells
+CACHE_TTL_SECONDS = 300
+
+
+def polygon_error(polygon):
+    """Why `polygon` ([[lat, lng], ...]) cannot be used as a fence, or None when it can."""
+    if not isinstance(polygon, list) or len(polygon) < 3:
+        return 'A polygon needs at least 3 [latitude, longitude] points.'
+    for point in polygon:
+        if not (
+            isinstance(point, (list, tuple)) and len(point) == 2
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in point)
+        ):
+            return f'{point!r} is not a [latitude, longitude] pair of numbers.'
+        if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+            return f'{point!r} is outside the valid latitude/longitude range.'
+    return None
+
+
+class Site:
+    __slots__ = (
+        'id', 'name', 'latitude', 'longitude', 'radius_meters', 'polygon',
+        'employee_ids', 'departments', 'meters_per_degree_lng', 'bbox',
+    )
+
+    def __init__(self, id, name, latitude, longitude, radius_meters, polygon, employee_ids, departments):
+        self.id = id
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+        if polygon and polygon_error(polygon):
+            raise ValueError(polygon_error(polygon))
+        self.radius_meters = radius_meters
+        self.employee_ids = frozenset(employee_ids)
+        self.departments = frozenset(departments)
+        # Local equirectangular projection around the site; exact to well under a
+        # metre at office-sized distances and needs no trig per check.
+        self.meters_per_degree_lng = METERS_PER_DEGREE * math.cos(math.radians(latitude))
+        self.polygon = [self.project(lat, lng) for lat, lng in polygon] if polygon else None
+
+        if polygon:
+            lats = [lat for lat, _ in polygon]
+            lngs = [lng for _, lng in polygon]
+            self.bbox = (min(lats), max(lats), min(lngs), max(lngs))
+        else:
+            dlat = radius_meters / METERS_PER_DEGREE
+            dlng = radius_meters / self.meters_per_degree_lng
+            self.bbox = (latitude - dlat, latitude + dlat, longitude - dlng, longitude + dlng)
+
+    def project(self, lat, lng):
+        return ((lng - self.longitude) * self.meters_per_degree_lng, (lat - self.latitude) * METERS_PER_DEGREE)
+
+    def in_bbox(self, lat, lng):
+        min_lat, max_lat, min_lng, max_lng = self.bbox
+        return min_lat <= lat <= max_lat and min_lng <= lng <= max_lng
+
+    def distance(self, lat, lng):
+        """Meters from the site's reference point."""
+        x, y = self.project(lat, lng)
+        return math.hypot(x, y)
+
+    def contains(self, lat, lng):
+        if self.polygon is None:
+            return self.distance(lat, lng) <= self.radius_meters
+        x, y = self.project(lat, lng)
+        inside = False
+        points = self.polygon
+        j = len(points) - 1
+        for i in range(len(points)):
+            xi, yi = points[i]
+            xj, yj = points[j]
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+        return inside
+
+    def distances(self, points):
+        """distance() for a list of (lat, lng)."""
+        lat0, lng0, scale = self.latitude, self.longitude, self.meters_per_degree_lng
+        return [math.hypot((lng - lng0) * scale, (lat - lat0) * METERS_PER_DEGREE) for lat, lng in points]
+
+    def contains_many(self, points):
+        """contains() for a list of (lat, lng); a polygon's edges are walked once for all of them."""
+        if self.polygon is None:
+            radius = self.radius_meters
+            return [distance <= radius for distance in self.distances(points)]
+        lat0, lng0, scale = self.latitude, self.longitude, self.meters_per_degree_lng
+        projected = [((lng - lng0) * scale, (lat - lat0) * METERS_PER_DEGREE) for lat, lng in points]
+        inside = [False] * len(projected)
+        vertices = self.polygon
+        j = len(vertices) - 1
+        for i in range(len(vertices)):
+            xi, yi = vertices[i]
+            xj, yj = vertices[j]
+            # A horizontal edge is never crossed (the test below is always false for it).
+            if yi != yj:
+                slope = (xj - xi) / (yj - yi)
+                for k, (x, y) in enumerate(projected):
+                    if (yi > y) != (yj > y) and x < slope * (y - yi) + xi:
+                        inside[k] = not inside[k]
+            j = i
+        return inside
+
+    def allows(self, user_id, department):
+        if not self.employee_ids and not self.departments:
+            return True
+        return user_id in self.employee_ids or department in self.departments
+
+
+def grid_cell(lat, lng):
+    return (math.floor(lat / GRID_DEGREES), math.floor(lng / GRID_DEGREES))
+
+
+class GeofenceIndex:
+    def __init__(self, sites):
+        self.sites = list(sites)
+        self.grid = defaultdict(list)
+        for site in self.sites:
+            min_lat, max_lat, min_lng, max_lng = site.bbox
+            (row_lo, col_lo), (row_hi, col_hi) = grid_cell(min_lat, min_lng), grid_cell(max_lat, max_lng)
+            for row in range(row_lo, row_hi + 1):
+                for col in range(col_lo, col_hi + 1):
+                    self.grid[(row, col)].append(site)
+
+    def locate(self, lat, lng, user_id=None, department=None):
+        """
+        Returns (site, distance) for the site the point is inside, else
+        (None, distance to the nearest allowed site), with distance None when
+        the user has no allowed sites.
+        """
+        return self._locate(self.grid.get(grid_cell(lat, lng), ()), lat, lng, user_id, department)
+
+    def locate_many(self, points):
+        """
+        Batch form of locate() for (lat, lng, user_id, department) tuples, with
+        the same results. Points are grouped by grid cell; each candidate site
+        of a cell then filters and tests all of the cell's unmatched points at
+        once, in the order locate() would try the sites.
+        """
+        by_cell = defaultdict(list)
+        for position, point in enumerate(points):
+            by_cell[grid_cell(point[0], point[1])].append((position, *point))
+
+        results = [None] * len(points)
+        rejected = []
+        for cell, pending in by_cell.items():
+            for site in self.grid.get(cell, ()):
+                min_lat, max_lat, min_lng, max_lng = site.bbox
+                unrestricted = not site.employee_ids and not site.departments
+                near = [
+                    member for member in pending
+                    if min_lat <= member[1] <= max_lat and min_lng <= member[2] <= max_lng
+                    and (unrestricted or site.allows(member[3], member[4]))
+                ]
+                if not near:
+                    continue
+                coordinates = [(member[1], member[2]) for member in near]
+                matched = set()
+                for member, inside, distance in zip(near, site.contains_many(coordinates), site.distances(coordinates)):
+                    if inside:
+                        results[member[0]] = site, distance
+                        matched.add(member[0])
+                pending = [member for member in pending if member[0] not in matched]
+                if not pending:
+                    break
+            rejected += pending
+
+        # Rejected points get the distance to their nearest allowed site, measured
+        # a site at a time over all of them.
+        coordinates = [(member[1], member[2]) for member in rejected]
+        nearest = [math.inf] * len(rejected)
+        for site in self.sites:
+            distances = site.distances(coordinates)
+            if not site.employee_ids and not site.departments:
+                nearest = list(map(min, nearest, distances))
+            else:
+                nearest = [
+                    min(best, distance) if site.allows(member[3], member[4]) else best
+                    for best, distance, member in zip(nearest, distances, rejected)
+                ]
+        for member, distance in zip(rejected, nearest):
+            results[member[0]] = None, distance if distance != math.inf else None
+        return results
+
+    def _locate(self, candidates, lat, lng, user_id, department):
+        for site in candidates:
+            if site.in_bbox(lat, lng) and site.allows(user_id, department) and site.contains(lat, lng):
+                return site, site.distance(lat, lng)
+        # Rejected: only now pay for a scan to report how far away the user is.
+        distances = [s.distance(lat, lng) for s in self.sites if s.allows(user_id, department)]
+        return None, min(distances) if distances else None
+
+
+_index = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def load_index():
+    from .models import OfficeSite
+
+    employees = defaultdict(list)
+    for site_id, user_id in OfficeSite.employees.through.objects.values_list('officesite_id', 'user_id'):
+        employees[site_id].append(user_id)
+    sites = []
+    for site in OfficeSite.objects.filter(is_active=True):
+        try:
+            sites.append(Site(
+                id=site.id,
+                name=site.name,
+                latitude=site.latitude,
+                longitude=site.longitude,
+                radius_meters=site.radius_meters,
+                polygon=site.polygon,
+                employee_ids=employees[site.id],
+                departments=site.departments or [],
+            ))
+        except (TypeError, ValueError) as exc:
+            # Saved around OfficeSite.clean(), e.g. by a script; one bad site must not stop every check-in.
+            logger.error('Skipping office site %s (%s): %s', site.id, site.name, exc)
+    return GeofenceIndex(sites)
+
+
+def cached_index():
+    """The loaded index if it is still fresh, else None. Never touches the database."""
+    index = _index
+    if index is not None and time.monotonic() - _loaded_at < CACHE_TTL_SECONDS:
+        return index
+    return None
+
+
+def get_index():
+    global _index, _loaded_at
+    index = cached_index()
+    if index is not None:
+        return index
+    with _lock:
+        if _index is None or time.monotonic() - _loaded_at >= CACHE_TTL_SECONDS:
+            _index = load_index()
+            _loaded_at = time.monotonic()
+        return _index
+
+
+def invalidate():
+    global _index
+    _index = None
@@ -0,0 +1,135 @@
+"""
+Database-backed background jobs.
+
+enqueue() inserts a Job row inside the caller's transaction, so work is only
+visible to workers once the data it refers to has been committed.
+`manage.py run_workers` polls for due jobs in priority order. On Postgres a
+worker claims a job with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+workers never wait on each other. Databases without SKIP LOCKED (SQLite) claim
+with a conditional UPDATE instead, and the loser of a race just moves on to
+the next candidate.
+
+A failed job is retried with exponential backoff until max_attempts. A job
+whose worker died mid-run is requeued once JOB_LOCK_TIMEOUT has passed.
+Attempts are counted when a job is claimed, so that run counts too, and a
+job that keeps killing its worker (say, out of memory on a huge image)
+ends up failed instead of being requeued forever.
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Job name -> dotted path of a callable taking the payload as keyword arguments.
+HANDLERS = {
+    'thumbnails.generate': 'api.thumbnails.generate_job',
+    'rollups.rebuild': 'api.rollups.rebuild_job',
+    'exports.attendance': 'api.exports.export_job',
+}
+
+CLAIM_CANDIDATES = 10
+
+
+def enqueue(name, payload=None, priority=0, run_at=None, max_attempts=None, user=None):
+    if name not in HANDLERS:
+        raise ValueError(f'Unknown job {name!r}')
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def due_jobs():
+    return Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now()).order_by('-priority', 'run_at', 'id')
+
+
+def claim(worker):
+    """Mark the next due job as running for `worker` and return it, or None."""
+    now = timezone.now()
+    claimed = {'status': Job.RUNNING, 'locked_by': worker, 'locked_at': now, 'attempts': F('attempts') + 1}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = due_jobs().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(**claimed)
+    else:
+        for pk in due_jobs().values_list('pk', flat=True)[:CLAIM_CANDIDATES]:
+            if Job.objects.filter(pk=pk, status=Job.QUEUED).update(**claimed):
+                break
+        else:
+            return None
+        job = Job(pk=pk)
+    job.refresh_from_db()
+    return job
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts` (1-based): base, 2x base, 4x base ... capped."""
+    return timedelta(seconds=min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOB_RETRY_BACKOFF_MAX))
+
+
+def execute(job):
+    """Run a claimed job (claim() has counted the attempt) and record the outcome."""
+    try:
+        result = import_string(HANDLERS[job.name])(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + backoff(job.attempts)
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        logger.warning('Job %s #%s failed (attempt %s/%s)', job.name, job.pk, job.attempts, job.max_attempts)
+    else:
+        job.status = Job.SUCCEEDED
+        job.result = result
+        job.finished_at = timezone.now()
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=[
+        'status', 'result', 'last_error', 'run_at', 'finished_at', 'locked_by', 'locked_at',
+    ])
+    return job
+
+
+def requeue_stale():
+    """
+    Recover jobs running for longer than JOB_LOCK_TIMEOUT; their worker crashed or
+    was killed. Jobs with attempts left are put back, the rest are marked failed.
+    Returns (requeued, failed).
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT))
+    released = {'locked_by': '', 'locked_at': None, 'last_error': 'The worker stopped before the job finished.'}
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(status=Job.FAILED, finished_at=now, **released)
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(status=Job.QUEUED, run_at=now, **released)
+    return requeued, failed
+
+
+def run_next(worker):
+    """Claim and run one job; returns it, or None when nothing is due."""
+    job = claim(worker)
+    if job is not None:
+        execute(job)
+    return job
@@ -0,0 +1,142 @@
+import json
+import platform
+import subprocess
+import sys
+
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api import benchmarks
+from api.authentication import token_cache
+from api.models import User
+from api.synthetic import Generator
+
+PREFIX = 'bench'
+
+
+def git(*args):
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks every API route at several data scales and reports p50/p95/p99 latency, '
+        'throughput, SQL queries and response size per endpoint. Data is generated in a throwaway '
+        'test database unless --current-db is given. Write JSON with --output and check a branch '
+        'against a saved run with --compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=[100, 1000], help='Employee counts to benchmark')
+        parser.add_argument('--days', type=int, default=30, help='Days of generated history per employee')
+        parser.add_argument('--requests', type=int, default=20, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per endpoint first')
+        parser.add_argument('--page-size', type=int, default=50, help='page_size for list routes; 0 for the server default (API_PAGE_SIZE)')
+        parser.add_argument('--only', nargs='+', default=[], help='Only endpoints containing one of these strings')
+        parser.add_argument('--current-db', action='store_true', help='Benchmark the existing data as-is')
+        parser.add_argument('--output', help='Write the results as JSON to this file ("-" for stdout)')
+        parser.add_argument('--compare', help='Baseline JSON from an earlier run; exit non-zero on regressions')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown for --compare')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)['results']
+
+        scenarios = [
+            scenario for scenario in benchmarks.scenarios(options['page_size'] or None)
+            if not options['only'] or any(part in scenario.label for part in options['only'])
+        ]
+        if options['current_db']:
+            results = self.run_scale(scenarios, User.objects.filter(role=User.IS_EMPLOYEE).count(), options)
+        else:
+            results = self.run_generated(scenarios, sorted(set(options['scales'])), options)
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'git_commit': git('rev-parse', '--short', 'HEAD'),
+                'git_branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'options': {
+                    key: options[key]
+                    for key in ('scales', 'days', 'requests', 'warmup', 'page_size', 'current_db')
+                },
+            },
+            'results': results,
+        }
+        if options['output'] == '-':
+            json.dump(report, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+        elif options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stderr.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = benchmarks.compare(baseline, results, options['threshold'])
+            if regressions:
+                for line in regressions:
+                    self.stderr.write(self.style.ERROR(f'  {line}'))
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}')
+            self.stderr.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
+
+    def run_generated(self, scenarios, scales, options):
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            User.objects.create_user(username=f'{PREFIX}_admin', password='unused', role=User.IS_ADMIN)
+            results = []
+            generated = 0
+            for scale in scales:
+                # Each scale adds employees on top of the previous one.
+                self.stderr.write(f'Generating {scale - generated} employees x {options["days"]} days...')
+                Generator(employees=scale - generated, days=options['days'], seed=scale, prefix=PREFIX).run()
+                generated = scale
+                results += self.run_scale(scenarios, scale, options)
+            return results
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def run_scale(self, scenarios, scale, options):
+        admin = User.objects.filter(role=User.IS_ADMIN, is_active=True).order_by('pk').first()
+        employee = User.objects.filter(role=User.IS_EMPLOYEE, is_active=True).order_by('pk').first()
+        if admin is None or employee is None:
+            raise CommandError('Need at least one active admin and one active employee to benchmark.')
+        tokens = {
+            'admin': Token.objects.get_or_create(user=admin)[0].key,
+            'employee': Token.objects.get_or_create(user=employee)[0].key,
+        }
+        # Start every scale cold, then let the warmup requests fill the caches.
+        cache.clear()
+        token_cache.clear()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{scale} employees'))
+        self.stdout.write(
+            f"  {'endpoint':<32} {'status':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'req/s':>8} {'queries':>7} {'KB':>9}"
+        )
+        results = []
+        for scenario in scenarios:
+            row = {'scale': scale, **benchmarks.run(scenario, tokens, employee, options['requests'], options['warmup'])}
+            results.append(row)
+            if 'skipped' in row:
+                self.stdout.write(f"  {row['endpoint']:<32} skipped: {row['skipped']}")
+                continue
+            self.stdout.write(
+                f"  {row['endpoint']:<32} {row['status']:>6} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                f"{row['p99_ms']:>8.1f} {row['throughput_rps']:>8.1f} {row['queries']:>7} {row['bytes'] / 1024:>9.1f}"
+            )
+        return results
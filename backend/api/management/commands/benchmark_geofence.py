@@ -0,0 +1,85 @@
+import math
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.geofence import METERS_PER_DEGREE, GeofenceIndex, Site
+
+# Sites are spread over a city-sized square around this point.
+CENTRE = (13.0360406, 80.2181952)
+SPREAD_DEGREES = 0.2
+DEPARTMENTS = ['Engineering', 'Sales', 'Operations', 'Finance']
+
+
+class Command(BaseCommand):
+    help = (
+        'Times geofence locate_many() against calling locate() once per point, on synthetic '
+        'office sites and punches. Needs no database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sites', type=int, default=50)
+        parser.add_argument('--vertices', type=int, default=24, help='Polygon points per site; 0 for radius sites')
+        parser.add_argument('--points', type=int, default=1000, help='Punches per batch (the batch endpoint takes up to 1000)')
+        parser.add_argument('--outside', type=float, default=0.2, help='Share of punches outside every site')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per method; the fastest is reported')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        index = GeofenceIndex(self.sites(rng, options['sites'], options['vertices']))
+        points = self.points(rng, index.sites, options['points'], options['outside'])
+
+        single = lambda: [index.locate(*point) for point in points]
+        batch = lambda: index.locate_many(points)
+        if single() != batch():
+            raise AssertionError('locate_many() disagrees with locate()')
+        single_ms, batch_ms = (self.best(run, options['repeat']) * 1000 for run in (single, batch))
+
+        matched = sum(1 for site, _ in batch() if site is not None)
+        self.stdout.write(
+            f"{len(index.sites)} sites ({options['vertices'] or 'radius'} vertices), "
+            f"{len(points)} punches, {matched} inside a site"
+        )
+        self.stdout.write(f'locate() per point: {single_ms:.2f} ms')
+        self.stdout.write(f'locate_many():      {batch_ms:.2f} ms ({single_ms / batch_ms:.2f}x)')
+
+    def sites(self, rng, count, vertices):
+        sites = []
+        for id in range(1, count + 1):
+            lat = CENTRE[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2
+            lng = CENTRE[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2
+            radius = rng.uniform(100, 400)
+            polygon = None
+            if vertices:
+                lng_scale = METERS_PER_DEGREE * math.cos(math.radians(lat))
+                polygon = [
+                    [lat + radius * math.sin(angle) / METERS_PER_DEGREE, lng + radius * math.cos(angle) / lng_scale]
+                    for angle in (2 * math.pi * i / vertices for i in range(vertices))
+                ]
+            # A quarter of the sites are restricted to one department.
+            departments = [rng.choice(DEPARTMENTS)] if rng.random() < 0.25 else []
+            sites.append(Site(id, f'Site {id}', lat, lng, radius, polygon, [], departments))
+        return sites
+
+    def points(self, rng, sites, count, outside):
+        points = []
+        for _ in range(count):
+            if rng.random() < outside:
+                lat = CENTRE[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2
+                lng = CENTRE[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2
+            else:
+                site = rng.choice(sites)
+                reach = site.radius_meters * 0.8 / METERS_PER_DEGREE
+                lat, lng = site.latitude + rng.uniform(-reach, reach) / 2, site.longitude + rng.uniform(-reach, reach) / 2
+            points.append((lat, lng, rng.randrange(1, 200), rng.choice(DEPARTMENTS)))
+        return points
+
+    def best(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
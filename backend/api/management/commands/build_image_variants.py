@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Builds missing or stale thumbnail variants for profile pictures and ticket screenshots (api/thumbnails.py).'
+
+    def handle(self, *args, **options):
+        for model, field in thumbnails.IMAGE_FIELDS.items():
+            pending = [
+                instance.pk
+                for instance in model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                .only('pk', field, thumbnails.variants_column(field)).iterator()
+                if thumbnails.needs_variants(instance, field)
+            ]
+            for pk in pending:
+                thumbnails.generate(model, pk, field)
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}.{field}: built variants for {len(pending)} images.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates the monthly attendance partitions for the current month and the next few on '
+        'PostgreSQL, moving any of their rows out of the default partition. Run it monthly, '
+        'e.g. from cron. Does nothing on other databases.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=partitions.PARTITION_MONTHS_AHEAD,
+            help='Future months to create besides the current one',
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned(connection):
+            self.stdout.write('Attendance is not partitioned on this database; nothing to do.')
+            return
+        with transaction.atomic():
+            created = partitions.ensure_partitions(connection, options['months_ahead'])
+        for name, moved in created:
+            self.stdout.write(f'Created {name}' + (f', moved {moved} rows from the default partition' if moved else ''))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(created)} partitions created; {len(partitions.partitions(connection))} in total.'
+        ))
@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import Attendance, Ticket, TicketUpdate, User, WorkUpdate
+
+
+class RollbackIndexes(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints the query plan and timing of the hot attendance/ticket/work-update lookups, '
+        'with the composite indexes and, for comparison, with them temporarily dropped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Executions per query when timing')
+        parser.add_argument('--no-compare', action='store_true', help='Skip the run without indexes')
+
+    def hot_queries(self):
+        user = (
+            User.objects.filter(attendance_records__isnull=False).first()
+            or User.objects.first()
+        )
+        if user is None:
+            return []
+        ticket_ids = list(Ticket.objects.order_by('-created_at', '-id').values_list('id', flat=True)[:50])
+        today = timezone.localdate()
+        return [
+            ('attendance get_or_create', Attendance.objects.filter(user=user, date=today)),
+            ('attendance history', Attendance.objects.filter(user=user).order_by('-date', '-id')[:50]),
+            ('ticket list', Ticket.objects.order_by('-created_at', '-id')[:50]),
+            ('my tickets', Ticket.objects.filter(assignee=user).order_by('-created_at', '-id')[:50]),
+            ('work updates', WorkUpdate.objects.filter(user=user).order_by('-date', '-id')[:50]),
+            (
+                'ticket updates prefetch',
+                TicketUpdate.objects.filter(ticket_id__in=ticket_ids).order_by('ticket_id', 'created_at', 'id'),
+            ),
+        ]
+
+    def measure(self, label, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        for name, queryset in self.hot_queries():
+            plan = queryset.explain()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                list(queryset.all())
+            elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+            self.stdout.write(f'  {name}: {elapsed_ms:.3f} ms/query')
+            for line in plan.splitlines():
+                self.stdout.write(f'      {line}')
+
+    def handle(self, *args, **options):
+        if not User.objects.exists():
+            self.stdout.write(self.style.WARNING('No data to explain. Seed the database first.'))
+            return
+
+        self.measure('With indexes', options['repeat'])
+        if options['no_compare']:
+            return
+
+        # Drop the indexes inside a transaction that is always rolled back.
+        try:
+            with connection.constraint_checks_disabled(), transaction.atomic():
+                with connection.schema_editor(atomic=False) as editor:
+                    for model in (Attendance, Ticket, TicketUpdate, WorkUpdate):
+                        # SQLite drops constraints by rebuilding the table from the model's
+                        # meta, so hide them from the meta while they are removed.
+                        constraints = model._meta.constraints
+                        model._meta.constraints = []
+                        try:
+                            for constraint in constraints:
+                                editor.remove_constraint(model, constraint)
+                        finally:
+                            model._meta.constraints = constraints
+                        for index in model._meta.indexes:
+                            editor.remove_index(model, index)
+                self.measure('Without indexes', options['repeat'])
+                raise RollbackIndexes
+        except RollbackIndexes:
+            pass
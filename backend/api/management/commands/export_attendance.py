@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exports import CHUNK_SIZE, EXPORT_FORMATS, attendance_export_rows
+from api.views import report_filters
+
+
+class Command(BaseCommand):
+    help = 'Streams attendance with computed hours to a CSV or XLSX file for payroll.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='YYYY-MM-DD, inclusive')
+        parser.add_argument('--end-date', help='YYYY-MM-DD, inclusive')
+        parser.add_argument('--department')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='File to write; CSV defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per cursor round trip')
+
+    def handle(self, *args, **options):
+        # Same parsing as the export endpoint's query params.
+        filters, error = report_filters(options)
+        if error:
+            raise CommandError(error)
+
+        file_format = options['format']
+        if file_format == 'xlsx' and not options['output']:
+            raise CommandError('--output is required for xlsx')
+
+        stream, _ = EXPORT_FORMATS[file_format]
+        chunks = stream(attendance_export_rows(filters, chunk_size=options['chunk_size']))
+        if options['output']:
+            mode, kwargs = ('wb', {}) if file_format == 'xlsx' else ('w', {'newline': '', 'encoding': 'utf-8'})
+            with open(options['output'], mode, **kwargs) as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
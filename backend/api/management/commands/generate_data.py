@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.synthetic import DEFAULT_PASSWORD, Generator
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates synthetic employees with attendance, work updates and tickets for load and '
+        'performance testing, e.g. `generate_data --employees 10000 --days 365`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=100)
+        parser.add_argument('--days', type=int, default=30, help='Days of history ending today')
+        parser.add_argument('--tickets-per-user', type=int, default=3)
+        parser.add_argument('--updates-per-ticket', type=int, default=2)
+        parser.add_argument('--work-updates-per-week', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; same seed, same dataset')
+        parser.add_argument('--prefix', default='emp', help='Username prefix of the generated employees')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT batch')
+
+    def handle(self, *args, **options):
+        if options['employees'] < 1 or options['days'] < 1:
+            raise CommandError('--employees and --days must be positive')
+        started = time.perf_counter()
+        generator = Generator(
+            employees=options['employees'],
+            days=options['days'],
+            tickets_per_user=options['tickets_per_user'],
+            updates_per_ticket=options['updates_per_ticket'],
+            work_updates_per_week=options['work_updates_per_week'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            log=lambda message: self.stdout.write(f'  {message} ({time.perf_counter() - started:.1f}s)'),
+        )
+        users = generator.run()
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(users)} employees ({users[0].username}..{users[-1].username}, '
+            f'password "{DEFAULT_PASSWORD}") in {time.perf_counter() - started:.1f}s'
+        ))
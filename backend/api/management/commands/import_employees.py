@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from api import employee_import
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates employees from a CSV (header row of CreateEmployeeSerializer fields) or JSON '
+        'list of rows. All rows are validated first and nothing is imported while any row is '
+        'invalid, unless --partial. Passwords are hashed across a process pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--partial', action='store_true', help='Import the valid rows even when others fail')
+        parser.add_argument(
+            '--workers', type=int, default=settings.EMPLOYEE_IMPORT_HASH_WORKERS,
+            help='Password hashing processes; 0 means one per CPU',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('json' if path.lower().endswith('.json') else 'csv')
+        try:
+            with open(path, 'rb') as file:
+                rows = employee_import.read_rows(file.read(), file_format)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Could not read {path}: {exc}')
+        if not rows:
+            raise CommandError(f'No rows in {path}')
+
+        started = time.perf_counter()
+        try:
+            report = employee_import.import_rows(rows, partial=options['partial'], workers=options['workers'] or None)
+        except IntegrityError as exc:
+            raise CommandError(f'Some of these employees were created meanwhile; nothing was imported ({exc})')
+
+        for error in report['errors']:
+            messages = '; '.join(f"{field}: {' '.join(map(str, problems))}" for field, problems in error['errors'].items())
+            self.stderr.write(f"Row {error['row']}: {messages}")
+        if report['errors'] and not report['created']:
+            raise CommandError(
+                f"{len(report['errors'])} of {len(rows)} rows are invalid; nothing was imported"
+                + ('' if options['partial'] else ' (--partial imports the valid rows)')
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} employees in {time.perf_counter() - started:.1f}s"
+            + (f", skipped {len(report['errors'])} invalid rows" if report['errors'] else '')
+        ))
@@ -0,0 +1,68 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import rollups
+from api.benchmarks import percentile, run_spike
+from api.models import Attendance, OfficeSite, User
+
+PATHS = {
+    'sync': '/api/attendance/mark/',
+    'async': '/api/attendance/async/mark/',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulates the morning check-in spike against a running server and compares '
+        'throughput and latency of the sync (WSGI/ASGI) and async (ASGI) check-in paths. '
+        "Deletes and re-creates today's attendance for the employees it uses; run it "
+        'against a staging database, never production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--paths', nargs='+', choices=sorted(PATHS), default=['sync', 'async'])
+        parser.add_argument('--users', type=int, default=500, help='Employees checking in, one request each')
+        parser.add_argument('--concurrency', type=int, default=100, help='Requests in flight at once')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        site = OfficeSite.objects.filter(is_active=True, polygon__isnull=True).first()
+        if site is None:
+            raise CommandError('No active radius-based office site to check in at.')
+        user_ids = list(
+            User.objects.filter(role=User.IS_EMPLOYEE, is_active=True)
+            .order_by('id').values_list('id', flat=True)[:options['users']]
+        )
+        if not user_ids:
+            raise CommandError('No active employees; run seed_data first.')
+
+        today = timezone.localdate()
+        payloads = [
+            {'user_id': user_id, 'latitude': site.latitude, 'longitude': site.longitude}
+            for user_id in user_ids
+        ]
+        self.stdout.write(
+            f"{len(payloads)} check-ins at {site.name}, concurrency {options['concurrency']}, "
+            f"against {options['base_url']}"
+        )
+        self.stdout.write(f"{'path':<6} {'req/s':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        try:
+            for name in options['paths']:
+                # Every run starts from "nobody has checked in yet".
+                Attendance.objects.filter(user_id__in=user_ids, date=today).delete()
+                elapsed, latencies, statuses = asyncio.run(run_spike(
+                    options['base_url'].rstrip('/') + PATHS[name], payloads,
+                    options['concurrency'], options['timeout'],
+                ))
+                errors = sum(count for status, count in statuses.items() if status is None or status >= 400)
+                self.stdout.write(
+                    f"{name:<6} {len(payloads) / elapsed:>9.1f} {errors:>7} "
+                    f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+                    f"{percentile(latencies, 99) * 1000:>9.1f}"
+                )
+        finally:
+            # The deletes above bypass the incremental rollup updates.
+            rollups.rebuild(today, today)
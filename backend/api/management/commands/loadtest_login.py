@@ -0,0 +1,66 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import percentile, run_spike
+from api.models import User
+from api.synthetic import DEFAULT_PASSWORD
+
+PATH = '/api/auth/login/'
+SCENARIOS = ('shift-start', 'stuffing')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures login throughput under concurrent load against a running server. '
+        '"shift-start" signs every employee in once with the right password; "stuffing" '
+        'sends wrong passwords for a handful of accounts, most of which the login '
+        'throttles should turn away before any password is hashed. All requests come '
+        'from this machine, so the per-IP limit (LOGIN_RATE_PER_IP) applies to the '
+        'whole run; raise it on the server to measure raw password-hashing throughput. '
+        'Expects the synthetic employees of generate_data, whose password it uses.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+        parser.add_argument('--users', type=int, default=200, help='Employees signing in at shift start, one login each')
+        parser.add_argument('--targets', type=int, default=5, help='Accounts attacked in the stuffing scenario')
+        parser.add_argument('--attempts', type=int, default=500, help='Wrong-password attempts in the stuffing scenario')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        usernames = list(
+            User.objects.filter(role=User.IS_EMPLOYEE, is_active=True)
+            .order_by('id').values_list('username', flat=True)[:max(options['users'], options['targets'])]
+        )
+        if not usernames:
+            raise CommandError('No active employees; run generate_data first.')
+
+        payloads = {
+            'shift-start': [
+                {'username': username, 'password': DEFAULT_PASSWORD} for username in usernames[:options['users']]
+            ],
+            'stuffing': [
+                {'username': usernames[i % options['targets']], 'password': f'guess-{i}'}
+                for i in range(options['attempts'])
+            ],
+        }
+        url = options['base_url'].rstrip('/') + PATH
+        self.stdout.write(f"Concurrency {options['concurrency']}, against {url}")
+        self.stdout.write(
+            f"{'scenario':<12} {'requests':>8} {'req/s':>9} {'200':>6} {'400':>6} {'429':>6} {'other':>6} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for name in options['scenarios']:
+            elapsed, latencies, statuses = asyncio.run(run_spike(
+                url, payloads[name], options['concurrency'], options['timeout'],
+            ))
+            other = sum(count for status, count in statuses.items() if status not in (200, 400, 429))
+            self.stdout.write(
+                f"{name:<12} {len(payloads[name]):>8} {len(payloads[name]) / elapsed:>9.1f} "
+                f"{statuses[200]:>6} {statuses[400]:>6} {statuses[429]:>6} {other:>6} "
+                f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+                f"{percentile(latencies, 99) * 1000:>9.1f}"
+            )
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes change-log entries older than CHANGE_LOG_RETENTION_DAYS. Clients holding an older '
+        'cursor get 410 from /api/changes/ and reload. Run it daily, e.g. from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.CHANGE_LOG_RETENTION_DAYS, help='Keep this many days of changes'
+        )
+
+    def handle(self, *args, **options):
+        deleted = changes.prune(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} changes older than {options["days"]} days.'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_date
+
+from api import jobs, rollups
+from api.models import Attendance
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds (or backfills) the daily department and monthly employee attendance rollups for a date range.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='YYYY-MM-DD; defaults to the earliest attendance date')
+        parser.add_argument('--end-date', help='YYYY-MM-DD; defaults to the latest attendance date')
+        parser.add_argument('--background', action='store_true', help='Queue the rebuild for run_workers instead')
+
+    def handle(self, *args, **options):
+        bounds = Attendance.objects.aggregate(first=Min('date'), last=Max('date'))
+        start, end = bounds['first'], bounds['last']
+        if options['start_date']:
+            start = parse_date(options['start_date'])
+        if options['end_date']:
+            end = parse_date(options['end_date'])
+        if start is None or end is None:
+            if not options['start_date'] and not options['end_date']:
+                self.stdout.write(self.style.WARNING('No attendance to roll up.'))
+                return
+            raise CommandError('Invalid or missing --start-date/--end-date, expected YYYY-MM-DD')
+        if start > end:
+            raise CommandError('--start-date must not be after --end-date')
+
+        if options['background']:
+            job = jobs.enqueue('rollups.rebuild', {'start': start.isoformat(), 'end': end.isoformat()})
+            self.stdout.write(self.style.SUCCESS(f'Queued job #{job.pk} to rebuild {start} to {end}.'))
+            return
+
+        self.stdout.write(f'Rebuilding attendance rollups from {start} to {end}...')
+        daily, monthly = rollups.rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {daily} daily department rows and {monthly} monthly employee rows.'))
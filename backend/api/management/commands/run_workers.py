@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from api import jobs
+
+STALE_CHECK_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs background jobs from the job table (api/jobs.py). '
+        'SIGTERM/SIGINT finish the current job and exit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes to run')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when no job is due')
+        parser.add_argument('--once', action='store_true', help='Exit when no job is due instead of polling')
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 1:
+            self.work(options['poll_interval'], options['once'])
+            return
+
+        # Children must not share the parent's database connection.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=self.work, args=(options['poll_interval'], options['once']))
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+
+        def forward(signum, frame):
+            for process in processes:
+                if process.is_alive():
+                    os.kill(process.pid, signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for process in processes:
+            process.join()
+
+    def work(self, poll_interval, once):
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        worker = jobs.worker_name()
+        self.stdout.write(f'Worker {worker} started')
+        last_stale_check = 0.0
+        while not stopping:
+            if time.monotonic() - last_stale_check > STALE_CHECK_SECONDS:
+                requeued, failed = jobs.requeue_stale()
+                if requeued or failed:
+                    self.stdout.write(self.style.WARNING(
+                        f'Requeued {requeued} stale jobs; {failed} more were out of attempts and failed'
+                    ))
+                last_stale_check = time.monotonic()
+
+            job = jobs.run_next(worker)
+            close_old_connections()
+            if job is not None:
+                style = self.style.SUCCESS if job.status == job.SUCCEEDED else self.style.WARNING
+                self.stdout.write(style(f'{job.name} #{job.pk}: {job.status} (attempt {job.attempts})'))
+                continue
+            if once:
+                break
+            time.sleep(poll_interval)
+        self.stdout.write(f'Worker {worker} stopped')
@@ -0,0 +1,213 @@
+"""
+Serving user uploads under MEDIA_URL.
+
+Django only decides whether a file may be served and with which headers.
+The bytes are moved by the front proxy when MEDIA_ACCEL is set ('x-accel'
+for nginx X-Accel-Redirect, 'x-sendfile' for Apache/lighttpd). Otherwise
+they are moved by the WSGI server's sendfile through FileResponse, with
+single byte-range support, so a worker never reads a whole file into Python.
+ASGI has no sendfile: there the file is read in chunks through an async
+iterator (api.streaming), which costs a worker thread hop per 64 KB, so
+ASGI deployments should set MEDIA_ACCEL.
+
+Employee documents are private. A request for one needs either a signature
+issued by EmployeeDocumentSerializer, which only serializes documents from
+visible_documents(), or an API token whose user passes visible_documents().
+Everything else (profile pictures, ticket screenshots) is public.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions
+
+from .authentication import CachedTokenAuthentication
+from .permissions import visible_documents
+from .streaming import asgi_streaming
+
+PRIVATE_PREFIXES = ('employee_documents/', 'attendance_exports/')
+SIGNATURE_PARAM = 'signature'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+_signer = signing.TimestampSigner(salt='api.media')
+
+
+def is_private(name):
+    return name.startswith(PRIVATE_PREFIXES)
+
+
+def sign(name):
+    """Signature for a private file name, valid for MEDIA_SIGNATURE_MAX_AGE seconds."""
+    return _signer.sign(name)[len(name) + 1:]
+
+
+def signed_url(url, name):
+    separator = '&' if '?' in url else '?'
+    return f'{url}{separator}{SIGNATURE_PARAM}={quote(sign(name))}'
+
+
+def has_valid_signature(request, name):
+    signature = request.GET.get(SIGNATURE_PARAM)
+    if not signature:
+        return False
+    try:
+        _signer.unsign(f'{name}:{signature}', max_age=settings.MEDIA_SIGNATURE_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def token_user(request):
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def can_read(request, name):
+    if not is_private(name):
+        return True
+    if has_valid_signature(request, name):
+        return True
+    user = token_user(request)
+    return user is not None and visible_documents(user).filter(file=name).exists()
+
+
+class _FileRange:
+    """
+    File object limited to the bytes before `end`.
+
+    It keeps the real fileno() so the WSGI file wrapper can still sendfile()
+    the range (gunicorn sends Content-Length bytes from the current offset).
+    Servers without sendfile iterate read(), which stops at `end`.
+    """
+
+    def __init__(self, file, end):
+        self.file = file
+        self.end = end
+
+    def read(self, size=-1):
+        remaining = max(self.end - self.file.tell(), 0)
+        return self.file.read(remaining if size is None or size < 0 else min(size, remaining))
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def byte_range(request, size, etag, last_modified):
+    """
+    (start, end) for a satisfiable single-range request, None to send the whole
+    file, or False when the range cannot be satisfied.
+    """
+    header = request.headers.get('Range', '')
+    match = RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range:
+        if if_range.startswith(('"', 'W/')):
+            if etag not in parse_etags(if_range):
+                return None
+        elif parse_http_date_safe(if_range) != last_modified:
+            return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    if start >= size or start >= end:
+        return False
+    return start, end
+
+
+def cache_control(name):
+    if is_private(name):
+        return f'private, max-age={settings.MEDIA_SIGNATURE_MAX_AGE}'
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Not found')
+    name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+    if not can_read(request, name):
+        # Same answer as a missing file, so private names cannot be probed.
+        raise Http404('Not found')
+
+    if not os.path.isfile(full_path):
+        raise Http404('Not found')
+    stat = os.stat(full_path)
+
+    last_modified = int(stat.st_mtime)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control(name),
+    }
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        for header, value in headers.items():
+            conditional[header] = value
+        return conditional
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type if not encoding and content_type else 'application/octet-stream'
+
+    accel = settings.MEDIA_ACCEL
+    if accel:
+        # The proxy handles Range/HEAD itself; it keeps headers set here.
+        response = HttpResponse(content_type=content_type)
+        if accel == 'x-accel':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = full_path
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    requested = byte_range(request, stat.st_size, etag, last_modified)
+    if requested is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    start, end = requested or (0, stat.st_size)
+    file = open(full_path, 'rb')
+    file.seek(start)
+    response = FileResponse(_FileRange(file, end), content_type=content_type)
+    if requested:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end - 1}/{stat.st_size}'
+    response['Content-Length'] = end - start
+    response['Accept-Ranges'] = 'bytes'
+    for header, value in headers.items():
+        response[header] = value
+    return asgi_streaming(request, response)
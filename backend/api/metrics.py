@@ -0,0 +1,280 @@
+"""
+Per-request timing: Server-Timing headers, Prometheus metrics and slow-request logging.
+
+RequestMetricsMiddleware times every request, the SQL it runs (through a
+connection execute wrapper, so it works with DEBUG off) and the rendering of
+DRF/template responses into bytes. Serializing objects into data happens
+earlier, inside the view; TimedSerializationMixin times it for viewsets'
+list/retrieve, and other views wrap it in timed(). The
+figures are returned in a Server-Timing header, shown by the browser's network
+panel. They are also added to histograms labelled by route, which is the URL
+name and never the raw path, so label cardinality stays bounded. `/metrics`
+serves those histograms in the Prometheus text format.
+
+Each process keeps its own histograms. With several gunicorn workers, set
+METRICS_DIR to a directory the workers of a host share. Every process writes
+its totals there at most once a second, and `/metrics` adds up all the files,
+so whichever worker answers the scrape reports the whole host.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# name -> (help, label names, bucket upper bounds)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Time from the request entering Django until its response is ready.',
+        ('route', 'method', 'status'), DURATION_BUCKETS,
+    ),
+    'http_request_db_seconds': ('Time spent executing SQL per request.', ('route', 'method'), DURATION_BUCKETS),
+    'http_request_queries': ('SQL statements executed per request.', ('route', 'method'), QUERY_BUCKETS),
+    'http_request_serialize_seconds': (
+        'Time spent serializing objects for the response, excluding SQL.', ('route', 'method'), DURATION_BUCKETS,
+    ),
+    'http_request_render_seconds': (
+        'Time spent rendering the response body.', ('route', 'method'), DURATION_BUCKETS,
+    ),
+}
+
+FLUSH_INTERVAL = 1.0
+
+_lock = threading.Lock()
+# (name, label values) -> [per-bucket counts with a final +Inf slot, sum of observed values]
+_series = {}
+_flushed_at = 0.0
+_file_name = f'metrics-{os.getpid()}-{time.time_ns()}.json'
+
+
+def observe(name, labels, value):
+    buckets = HISTOGRAMS[name][2]
+    with _lock:
+        series = _series.get((name, labels))
+        if series is None:
+            series = _series[(name, labels)] = [[0] * (len(buckets) + 1), 0.0]
+        series[0][bisect_left(buckets, value)] += 1
+        series[1] += value
+
+
+def snapshot():
+    with _lock:
+        return [[name, list(labels), list(counts), total] for (name, labels), (counts, total) in _series.items()]
+
+
+def reset():
+    with _lock:
+        _series.clear()
+
+
+def flush(force=False):
+    """Write this process's totals to METRICS_DIR, at most once per FLUSH_INTERVAL unless forced."""
+    global _flushed_at
+    directory = settings.METRICS_DIR
+    if not directory or (not force and time.monotonic() - _flushed_at < FLUSH_INTERVAL):
+        return
+    _flushed_at = time.monotonic()
+    path = os.path.join(directory, _file_name)
+    try:
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(snapshot(), file)
+        os.replace(f'{path}.tmp', path)
+    except OSError as exc:
+        logger.warning('Could not write metrics to %s: %s', path, exc)
+
+
+def collect():
+    """Histograms of this process plus, with METRICS_DIR, those written by the other processes."""
+    snapshots = [snapshot()]
+    directory = settings.METRICS_DIR
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith('.json') and name != _file_name:
+                try:
+                    with open(os.path.join(directory, name)) as file:
+                        snapshots.append(json.load(file))
+                except (OSError, ValueError):
+                    continue
+
+    merged = {}
+    for rows in snapshots:
+        for name, labels, counts, total in rows:
+            if name not in HISTOGRAMS or len(counts) != len(HISTOGRAMS[name][2]) + 1:
+                continue
+            series = merged.setdefault((name, tuple(labels)), [[0] * len(counts), 0.0])
+            series[0] = [a + b for a, b in zip(series[0], counts)]
+            series[1] += total
+    return merged
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition(merged):
+    """Prometheus text format (version 0.0.4) for collect()'s result."""
+    lines = []
+    for name, (help_text, label_names, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (series_name, labels), (counts, total) in sorted(merged.items()):
+            if series_name != name:
+                continue
+            base = ','.join(f'{key}="{_label(value)}"' for key, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{base},le="{_number(bound)}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{base}}} {_number(total)}')
+            lines.append(f'{name}_count{{{base}}} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape target. Needs `Authorization: Bearer <METRICS_TOKEN>`; without a token only DEBUG serves it."""
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        raise Http404('Not found')
+    return HttpResponse(exposition(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class RequestTimings:
+    """connection.execute_wrapper() that also accumulates serialize and render time for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - start
+
+
+@contextmanager
+def timed(request, part):
+    """Add the time spent in the block, less its SQL, to `request`'s `part` ('serialize' or 'render')."""
+    timings = getattr(request, '_timings', None)
+    if timings is None:
+        yield
+        return
+    start, db = time.perf_counter(), timings.db
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start - (timings.db - db)
+        setattr(timings, part, getattr(timings, part) + max(elapsed, 0.0))
+
+
+class TimedSerializationMixin:
+    """
+    For viewsets: list and retrieve count as serialize time. Their SQL is
+    subtracted, which leaves almost only the serializer's work.
+    """
+
+    def list(self, request, *args, **kwargs):
+        with timed(request, 'serialize'):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with timed(request, 'serialize'):
+            return super().retrieve(request, *args, **kwargs)
+
+
+class RequestMetricsMiddleware:
+    """Keep it first in MIDDLEWARE so the total includes the other middleware."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = request._timings = RequestTimings()
+        with self.wrap_connections(timings):
+            response = self.get_response(request)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = request._timings = RequestTimings()
+        with self.wrap_connections(timings):
+            response = await self.get_response(request)
+        return self.finish(request, response, timings)
+
+    def wrap_connections(self, timings):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timings))
+        return stack
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, '_timings', None)
+        if timings is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timings.render += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        labels = (route, request.method)
+
+        observe('http_request_duration_seconds', (*labels, str(response.status_code)), total)
+        observe('http_request_db_seconds', labels, timings.db)
+        observe('http_request_queries', labels, timings.queries)
+        observe('http_request_serialize_seconds', labels, timings.serialize)
+        observe('http_request_render_seconds', labels, timings.render)
+        flush()
+
+        if settings.SERVER_TIMING:
+            app = max(total - timings.db - timings.serialize - timings.render, 0.0)
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+                f'serialize;dur={timings.serialize * 1000:.1f}',
+                f'render;dur={timings.render * 1000:.1f}',
+                f'app;dur={app * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+
+        if settings.SLOW_REQUEST_MS and total * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning(
+                'Slow request %s %s (%s) -> %s: %.0f ms total, %.0f ms in %d queries, %.0f ms serializing, '
+                '%.0f ms rendering',
+                request.method, request.get_full_path(), route, response.status_code,
+                total * 1000, timings.db * 1000, timings.queries, timings.serialize * 1000, timings.render * 1000,
+            )
+        return response
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:19
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_duplicate_attendance(apps, schema_editor):
+    """
+    Collapse attendance rows sharing (user, date) into the oldest row so the
+    unique constraint added in 0011 can be created.
+    """
+    Attendance = apps.get_model('api', 'Attendance')
+    duplicates = (
+        Attendance.objects.values('user_id', 'date')
+        .annotate(rows=Count('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for group in duplicates.iterator():
+        rows = list(Attendance.objects.filter(user_id=group['user_id'], date=group['date']).order_by('id'))
+        keep, extra = rows[0], rows[1:]
+        check_ins = [r.check_in_time for r in rows if r.check_in_time]
+        check_outs = [r.check_out_time for r in rows if r.check_out_time]
+        keep.check_in_time = min(check_ins) if check_ins else None
+        keep.check_out_time = max(check_outs) if check_outs else None
+        if any(r.status == 'Present' for r in rows):
+            keep.status = 'Present'
+        keep.location_verified = any(r.location_verified for r in rows)
+        keep.save()
+        Attendance.objects.filter(id__in=[r.id for r in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_employeeprofile_employee_type_employeeprofile_gender'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_attendance, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_merge_duplicate_attendance'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['-created_at', '-id'], name='ticket_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assignee', '-created_at', '-id'], name='ticket_assignee_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketupdate',
+            index=models.Index(fields=['ticket', 'created_at', 'id'], name='ticketupdate_ticket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workupdate',
+            index=models.Index(fields=['user', '-date', '-id'], name='workupdate_user_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='attendance_user_date_uniq'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_head_office(apps, schema_editor):
+    # The single office that used to be hardcoded in AttendanceView.post
+    OfficeSite = apps.get_model('api', 'OfficeSite')
+    OfficeSite.objects.create(
+        name='Head Office - 37/5, Aryagowda Rd, Chennai',
+        latitude=13.0360406,
+        longitude=80.2181952,
+        radius_meters=200,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfficeSite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('radius_meters', models.PositiveIntegerField(default=200)),
+                ('polygon', models.JSONField(blank=True, null=True)),
+                ('departments', models.JSONField(blank=True, default=list)),
+                ('is_active', models.BooleanField(default=True)),
+                ('employees', models.ManyToManyField(blank=True, related_name='office_sites', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(create_head_office, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_collectionversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyDepartmentAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('half_day', models.IntegerField(default=0)),
+                ('minutes_worked', models.IntegerField(default=0)),
+                ('late_arrivals', models.IntegerField(default=0)),
+                ('date', models.DateField()),
+                ('department', models.CharField(max_length=100)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'department'), name='daily_department_rollup_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyUserAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('half_day', models.IntegerField(default=0)),
+                ('minutes_worked', models.IntegerField(default=0)),
+                ('late_arrivals', models.IntegerField(default=0)),
+                ('month', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_attendance', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month'], name='monthly_user_rollup_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='monthly_user_rollup_uniq')],
+            },
+        ),
+    ]
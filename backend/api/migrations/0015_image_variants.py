@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ticketupdate',
+            name='screenshot_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
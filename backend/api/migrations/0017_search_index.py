@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:02
+
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    """tsvector columns + GIN indexes on Postgres, an FTS5 table + triggers on SQLite (see api/search.py)."""
+    from api import search
+    search.install(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from api import search
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
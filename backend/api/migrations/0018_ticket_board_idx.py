@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['year', 'month', 'status', '-created_at', '-id'], name='ticket_board_idx'),
+        ),
+    ]
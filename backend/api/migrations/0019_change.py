@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-18 22:10
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+def install_change_log(apps, schema_editor):
+    """Triggers that log every write to the synced tables (see api/changes.py)."""
+    from api import changes
+    changes.install(schema_editor.connection)
+
+
+def uninstall_change_log(apps, schema_editor):
+    from api import changes
+    changes.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_ticket_board_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=32)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('transaction_id', models.BigIntegerField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+            ],
+            options={
+                'indexes': [models.Index(fields=['transaction_id', 'id'], name='change_transaction_idx'), models.Index(fields=['changed_at'], name='change_changed_at_idx')],
+            },
+        ),
+        migrations.RunPython(install_change_log, uninstall_change_log),
+    ]
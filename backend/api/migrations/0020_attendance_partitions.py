@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 22:45
+
+from django.db import migrations
+
+
+def partition_attendance(apps, schema_editor):
+    """Monthly range partitions for attendance on PostgreSQL (see api/partitions.py)."""
+    from api import changes, partitions
+    partitions.partition_table(schema_editor.connection)
+    # The rebuild dropped the old table's change-log triggers.
+    changes.install(schema_editor.connection)
+
+
+def unpartition_attendance(apps, schema_editor):
+    from api import changes, partitions
+    partitions.unpartition_table(schema_editor.connection)
+    changes.install(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_change'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_attendance, unpartition_attendance),
+    ]
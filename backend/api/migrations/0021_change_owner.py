@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+def log_owners(apps, schema_editor):
+    """
+    Reinstall the triggers so they record owners (see api/changes.py). Older
+    entries have none, so the log is reset and existing cursors expire.
+    """
+    from api import changes
+    changes.install(schema_editor.connection)
+    Change = apps.get_model('api', 'Change')
+    marker = Change.objects.create(collection='', object_id=0)
+    Change.objects.filter(id__lt=marker.id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_attendance_partitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='change',
+            name='owner_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(log_owners, migrations.RunPython.noop),
+    ]
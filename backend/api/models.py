@@ -1,5 +1,10 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .geofence import polygon_error
 
 class User(AbstractUser):
     IS_ADMIN = 'ADMIN'
@@ -61,6 +66,7 @@ class EmployeeProfile(models.Model):
     employee_type = models.CharField(max_length=20, choices=EMPLOYEE_TYPE_CHOICES, default='Full-Time')
     
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False) # see api/thumbnails.py
 
     def __str__(self):
         return f"{self.user.username} - {self.designation}"
@@ -76,12 +82,19 @@ class EmployeeDocument(models.Model):
 
 class Attendance(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attendance_records')
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField(default=timezone.localdate)
     check_in_time = models.DateTimeField(null=True, blank=True)
     check_out_time = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, default='Absent') # Present, Absent, Half-Day
     location_verified = models.BooleanField(default=False)
 
+    class Meta:
+        # The unique index also serves (user, date) lookups and per-user history ordered by date.
+        # On PostgreSQL the table is partitioned by month of `date` (api/partitions.py).
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='attendance_user_date_uniq'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.date}"
 
@@ -92,6 +105,11 @@ class WorkUpdate(models.Model):
     description = models.TextField()
     status = models.CharField(max_length=50, default='In Progress') # In Progress, Completed, On Hold
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='workupdate_user_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.project_name}"
 
@@ -113,6 +131,14 @@ class Ticket(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='ticket_created_idx'),
+            models.Index(fields=['assignee', '-created_at', '-id'], name='ticket_assignee_created_idx'),
+            # Ticket board: one month's tickets per status, newest first.
+            models.Index(fields=['year', 'month', 'status', '-created_at', '-id'], name='ticket_board_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.status})"
 
@@ -121,7 +147,151 @@ class TicketUpdate(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     update_text = models.TextField()
     screenshot = models.ImageField(upload_to='ticket_updates/', null=True, blank=True)
+    screenshot_variants = models.JSONField(default=dict, blank=True, editable=False) # see api/thumbnails.py
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'created_at', 'id'], name='ticketupdate_ticket_idx'),
+        ]
+
     def __str__(self):
         return f"Update on {self.ticket.title} by {self.user.username}"
+
+class OfficeSite(models.Model):
+    """
+    A location employees may check in from: a circle around (latitude, longitude),
+    or a polygon when one is given. A site with no employees and no departments
+    assigned is open to everyone.
+    """
+    name = models.CharField(max_length=100)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    radius_meters = models.PositiveIntegerField(default=200)
+    polygon = models.JSONField(null=True, blank=True) # [[lat, lng], ...]; replaces the radius when set
+    departments = models.JSONField(default=list, blank=True) # EmployeeProfile.department values
+    employees = models.ManyToManyField(User, blank=True, related_name='office_sites')
+    is_active = models.BooleanField(default=True)
+
+    def clean(self):
+        super().clean()
+        errors = {}
+        if self.polygon not in (None, []):
+            errors['polygon'] = polygon_error(self.polygon)
+        if not isinstance(self.departments, list) or not all(isinstance(d, str) for d in self.departments):
+            errors['departments'] = 'Expected a list of department names.'
+        errors = {field: message for field, message in errors.items() if message}
+        if errors:
+            raise ValidationError(errors)
+
+    def __str__(self):
+        return self.name
+
+class CollectionVersion(models.Model):
+    """
+    Write counter per API collection, bumped by signals on every change.
+    Read-heavy list endpoints derive their ETag from it (see api/caching.py).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class AttendanceRollupFields(models.Model):
+    present = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    half_day = models.IntegerField(default=0)
+    minutes_worked = models.IntegerField(default=0)
+    late_arrivals = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+class DailyDepartmentAttendance(AttendanceRollupFields):
+    """Attendance totals per day per department, maintained by api/rollups.py."""
+    date = models.DateField()
+    department = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'department'], name='daily_department_rollup_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.department}"
+
+class MonthlyUserAttendance(AttendanceRollupFields):
+    """Attendance totals per employee per month (month is its first day), maintained by api/rollups.py."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_attendance')
+    month = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month'], name='monthly_user_rollup_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['month'], name='monthly_user_rollup_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.month:%Y-%m}"
+
+class Job(models.Model):
+    """A unit of background work, run by `manage.py run_workers` (see api/jobs.py)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100) # key in api.jobs.HANDLERS
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.IntegerField(default=0) # higher runs first
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Claim order: status='queued' AND run_at <= now ORDER BY priority DESC, run_at, id
+            models.Index(fields=['status', '-priority', 'run_at', 'id'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+class Change(models.Model):
+    """
+    One row per insert, update or delete of a synced model, written by
+    database triggers (see api/changes.py). Served by /api/changes/.
+    """
+    collection = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    owner_id = models.BigIntegerField(null=True, blank=True) # the employee a work-update or attendance row belongs to
+    transaction_id = models.BigIntegerField(null=True, blank=True) # Postgres only: the writing transaction's xid
+    changed_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        indexes = [
+            # Postgres reads the log in (transaction_id, id) order.
+            models.Index(fields=['transaction_id', 'id'], name='change_transaction_idx'),
+            models.Index(fields=['changed_at'], name='change_changed_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.collection} #{self.object_id} ({'deleted' if self.deleted else 'upserted'})"
@@ -0,0 +1,121 @@
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (<timestamp or date column>, id), newest first.
+
+    Each page is a `WHERE (field, id) < (last_field, last_id) ORDER BY field DESC, id DESC
+    LIMIT n` query, so paging deep into a table costs the same as the first page.
+    Views choose the column with a `keyset_field` attribute (default `created_at`).
+
+    Lists are paginated at REST_FRAMEWORK['PAGE_SIZE'] rows (API_PAGE_SIZE, default 50)
+    unless the client sends its own `page_size`. With PAGE_SIZE set to None, the full
+    list is returned unless the client sends `page_size` / `cursor`.
+    """
+    keyset_field = 'created_at'
+    page_size = api_settings.PAGE_SIZE
+    fallback_page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        if self.page_size_query_param in request.query_params:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except (TypeError, ValueError):
+                page_size = 0
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        if self.page_size:
+            return self.page_size
+        if self.cursor_query_param in request.query_params:
+            return self.fallback_page_size
+        return None
+
+    def encode_cursor(self, value, pk):
+        payload = json.dumps([value.isoformat(), pk]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, request, field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return field.to_python(value), int(pk)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        The unevaluated queryset for the requested page (one extra row to detect a
+        next page), or None when pagination is off. Pass the fetched rows to
+        finish_page(); async views use this pair to fetch the rows themselves.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.field_name = getattr(view, 'keyset_field', self.keyset_field)
+        self.limit = page_size
+        field = queryset.model._meta.get_field(self.field_name)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(f'-{self.field_name}', '-id')
+        cursor = self.decode_cursor(request, field)
+        if cursor is not None:
+            value, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f'{self.field_name}__lt': value}) | Q(**{self.field_name: value, 'id__lt': pk})
+            )
+        return queryset[:page_size + 1]
+
+    def finish_page(self, rows):
+        page = rows[:self.limit]
+        self.next_cursor = None
+        if len(rows) > self.limit:
+            last = page[-1]
+            self.next_cursor = self.encode_cursor(getattr(last, self.field_name), last.pk)
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.finish_page(list(queryset))
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,186 @@
+"""
+Monthly range partitioning of the attendance table on PostgreSQL.
+
+Attendance grows by one row per employee per working day and is nearly
+always read by date range: someone's recent history, a month's report, an
+export. With one partition per month, the planner only scans the months a
+query asks for. Each partition's indexes stay small, and an old year can be
+detached and archived as plain tables.
+
+Migration 0020 rebuilds the table as a partitioned one. It gets a partition
+for every month that has rows, PARTITION_MONTHS_AHEAD future months, and a
+default partition for anything else. `manage.py create_attendance_partitions`,
+run monthly, adds future months before they begin. If rows for a new month
+already sit in the default partition, they are moved into it.
+
+Postgres wants the partition key in every unique index, so the primary key
+is (id, date). Django still treats id as the primary key. A lookup by id
+alone, such as the UPDATE behind save(), probes the primary-key index of
+every partition. That is cheap at a few dozen partitions, and the hot paths
+select rows by (user, date) anyway.
+
+Other databases keep the plain table; everything here is a no-op there.
+"""
+from datetime import date
+
+from django.utils import timezone
+
+from .models import Attendance
+
+PARTITION_MONTHS_AHEAD = 3
+# Migration that partitions the table.
+MIGRATION = '0020_attendance_partitions'
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{Attendance._meta.db_table}_{month:%Y_%m}'
+
+
+def default_partition_name():
+    return f'{Attendance._meta.db_table}_default'
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [Attendance._meta.db_table])
+        return cursor.fetchone() is not None
+
+
+def partitions(connection):
+    """[(partition name, bound expression)] of the attendance table, by name."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            ORDER BY child.relname
+            """,
+            [Attendance._meta.db_table],
+        )
+        return cursor.fetchall()
+
+
+def create_partition(connection, month):
+    """
+    Add the partition for `month` unless it exists; returns (created, rows moved in
+    from the default partition). Needs a transaction (ATTACH locks the default partition).
+    """
+    table, name, default = Attendance._meta.db_table, partition_name(month), default_partition_name()
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        if cursor.fetchone()[0]:
+            return False, 0
+        # Built detached so rows of this month can be moved out of the default
+        # partition first; ATTACH refuses while the default still holds any.
+        # The CHECK lets ATTACH skip scanning the new table.
+        cursor.execute(f"CREATE TABLE {name} (LIKE {table})")
+        cursor.execute(f"ALTER TABLE {name} ADD CONSTRAINT {name}_range CHECK (date >= %s AND date < %s)", [start, end])
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} WHERE date >= %s AND date < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [start, end],
+        )
+        moved = cursor.rowcount
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", [start, end])
+        cursor.execute(f"ALTER TABLE {name} DROP CONSTRAINT {name}_range")
+        if moved:
+            # The delete from the default partition logged these rows as deleted
+            # for delta sync (api/changes.py). Touching them through the attached
+            # partition logs them again as present, which is the change that wins.
+            cursor.execute(f"UPDATE {name} SET status = status")
+    return True, moved
+
+
+def ensure_partitions(connection, months_ahead=PARTITION_MONTHS_AHEAD, today=None):
+    """Create the partitions of the current month and the next `months_ahead`; returns [(name, rows moved)]."""
+    if not is_partitioned(connection):
+        return []
+    first = month_start(today or timezone.localdate())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        made, moved = create_partition(connection, month)
+        if made:
+            created.append((partition_name(month), moved))
+    return created
+
+
+def _constraints_and_indexes(cursor, table):
+    """
+    (constraints, indexes) of `table` besides its primary key, as
+    ([(name, definition)], [CREATE INDEX statement]), to recreate on a rebuilt table.
+    """
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('u', 'f', 'c') ORDER BY conname",
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = indexrelid) ORDER BY indexrelid",
+        [table],
+    )
+    return constraints, [row[0] for row in cursor.fetchall()]
+
+
+def _rebuild(connection, partitioned):
+    """Copy the attendance table into a new partitioned (or plain) table of the same name."""
+    table = Attendance._meta.db_table
+    old = f'{table}_old'
+    with connection.cursor() as cursor:
+        constraints, indexes = _constraints_and_indexes(cursor, table)
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        cursor.execute(f"CREATE TABLE {table} (LIKE {old})" + (" PARTITION BY RANGE (date)" if partitioned else ""))
+        if partitioned:
+            cursor.execute(f"CREATE TABLE {default_partition_name()} PARTITION OF {table} DEFAULT")
+            cursor.execute(f"SELECT DISTINCT date_trunc('month', date)::date FROM {old}")
+            months = {row[0] for row in cursor.fetchall()}
+            first = month_start(timezone.localdate())
+            months.update(add_months(first, offset) for offset in range(PARTITION_MONTHS_AHEAD + 1))
+            for month in sorted(months):
+                cursor.execute(
+                    f"CREATE TABLE {partition_name(month)} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                    [month.isoformat(), add_months(month, 1).isoformat()],
+                )
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {old}")
+        next_id = cursor.fetchone()[0]
+        # Drops the partitions, the old id sequence and the old constraint names with it.
+        cursor.execute(f"DROP TABLE {old}")
+
+        if partitioned:
+            # Identity columns need PostgreSQL 17 on partitioned tables; a sequence works everywhere.
+            cursor.execute(f"CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id START WITH {next_id}")
+            cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+            cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, date)")
+        else:
+            cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {next_id})")
+            cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        for name, definition in constraints:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        for statement in indexes:
+            cursor.execute(statement)
+
+
+def partition_table(connection):
+    if connection.vendor == 'postgresql' and not is_partitioned(connection):
+        _rebuild(connection, partitioned=True)
+
+
+def unpartition_table(connection):
+    if is_partitioned(connection):
+        _rebuild(connection, partitioned=False)
@@ -0,0 +1,22 @@
+from .models import Attendance, EmployeeDocument, User, WorkUpdate
+
+
+def visible_documents(user):
+    """Documents a user may see: admins see everyone's, employees only their own."""
+    if user.role == User.IS_ADMIN:
+        return EmployeeDocument.objects.all()
+    return EmployeeDocument.objects.filter(user=user)
+
+
+def visible_work_updates(user):
+    """Work updates a user may see: admins see everyone's, employees only their own."""
+    if user.role == User.IS_ADMIN:
+        return WorkUpdate.objects.all()
+    return WorkUpdate.objects.filter(user=user)
+
+
+def visible_attendance(user):
+    """Attendance a user may see: admins see everyone's, employees only their own."""
+    if user.role == User.IS_ADMIN:
+        return Attendance.objects.all()
+    return Attendance.objects.filter(user=user)
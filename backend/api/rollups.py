@@ -0,0 +1,148 @@
+"""
+Attendance rollups: one row per (date, department) and per (month, user).
+
+Every attendance row contributes a fixed set of counters (see contribution()).
+Check-in/check-out paths record the row's contribution before and after the
+change and apply the difference with F() updates, so keeping the rollups
+current costs two small UPDATEs per punch. rebuild() recomputes a date range
+from raw attendance with the same contribution() and is used for backfills
+and repairs.
+"""
+from collections import defaultdict
+from datetime import date, time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Attendance, DailyDepartmentAttendance, MonthlyUserAttendance
+
+COUNTERS = ('present', 'absent', 'half_day', 'minutes_worked', 'late_arrivals')
+STATUS_COUNTERS = {'Present': 'present', 'Absent': 'absent', 'Half-Day': 'half_day'}
+UNASSIGNED = 'Unassigned'
+
+
+def late_after():
+    hour, minute = (int(part) for part in getattr(settings, 'ATTENDANCE_LATE_AFTER', '09:30').split(':'))
+    return time(hour, minute)
+
+
+def contribution(status, check_in_time, check_out_time):
+    counters = dict.fromkeys(COUNTERS, 0)
+    if status in STATUS_COUNTERS:
+        counters[STATUS_COUNTERS[status]] = 1
+    if check_in_time and timezone.localtime(check_in_time).time() > late_after():
+        counters['late_arrivals'] = 1
+    if check_in_time and check_out_time and check_out_time > check_in_time:
+        counters['minutes_worked'] = int((check_out_time - check_in_time).total_seconds() // 60)
+    return counters
+
+
+def attendance_contribution(attendance):
+    return contribution(attendance.status, attendance.check_in_time, attendance.check_out_time)
+
+
+def month_of(day):
+    return date(day.year, day.month, 1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def rollup_keys(user_id, department, day):
+    return [
+        (DailyDepartmentAttendance, {'date': day, 'department': department or UNASSIGNED}),
+        (MonthlyUserAttendance, {'user_id': user_id, 'month': month_of(day)}),
+    ]
+
+
+def record_changes(changes):
+    """
+    Apply attendance changes to the rollups.
+
+    `changes` is an iterable of (user_id, department, date, before, after), where
+    before/after are contribution() dicts and before is None for new rows.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for user_id, department, day, before, after in changes:
+        for model, lookup in rollup_keys(user_id, department, day):
+            delta = deltas[(model, tuple(sorted(lookup.items())))]
+            for counter in COUNTERS:
+                delta[counter] += after[counter] - (before[counter] if before else 0)
+
+    for (model, lookup), delta in deltas.items():
+        lookup = dict(lookup)
+        delta = {counter: value for counter, value in delta.items() if value}
+        if not delta:
+            continue
+        if model.objects.filter(**lookup).update(**{c: F(c) + v for c, v in delta.items()}):
+            continue
+        # No rollup row yet (first punch of the day/month, or the range was never
+        # backfilled): compute it from the source rows, which already include this change.
+        values = _recompute(model, lookup)
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **values)
+        except IntegrityError:
+            model.objects.filter(**lookup).update(**{c: F(c) + v for c, v in delta.items()})
+
+
+def _recompute(model, lookup):
+    if model is DailyDepartmentAttendance:
+        rows = Attendance.objects.filter(date=lookup['date'])
+        if lookup['department'] == UNASSIGNED:
+            rows = rows.filter(user__profile__department__in=[UNASSIGNED, '']) | rows.filter(user__profile__isnull=True)
+        else:
+            rows = rows.filter(user__profile__department=lookup['department'])
+    else:
+        month = lookup['month']
+        rows = Attendance.objects.filter(user_id=lookup['user_id'], date__gte=month, date__lt=next_month(month))
+
+    totals = dict.fromkeys(COUNTERS, 0)
+    for status, check_in, check_out in rows.values_list('status', 'check_in_time', 'check_out_time'):
+        for counter, value in contribution(status, check_in, check_out).items():
+            totals[counter] += value
+    return totals
+
+
+def rebuild(start, end, chunk_size=5000):
+    """Recompute every rollup touching [start, end]; monthly rows cover whole months."""
+    month_start = month_of(start)
+    month_end = next_month(end)
+
+    daily = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    monthly = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    rows = (
+        Attendance.objects.filter(date__gte=month_start, date__lt=month_end)
+        .values_list('user_id', 'user__profile__department', 'date', 'status', 'check_in_time', 'check_out_time')
+        .order_by()
+    )
+    for user_id, department, day, status, check_in, check_out in rows.iterator(chunk_size=chunk_size):
+        counters = contribution(status, check_in, check_out)
+        targets = [monthly[(user_id, month_of(day))]]
+        if start <= day <= end:
+            targets.append(daily[(day, department or UNASSIGNED)])
+        for target in targets:
+            for counter, value in counters.items():
+                target[counter] += value
+
+    with transaction.atomic():
+        DailyDepartmentAttendance.objects.filter(date__gte=start, date__lte=end).delete()
+        MonthlyUserAttendance.objects.filter(month__gte=month_start, month__lt=month_end).delete()
+        DailyDepartmentAttendance.objects.bulk_create(
+            [DailyDepartmentAttendance(date=day, department=dept, **c) for (day, dept), c in daily.items()],
+            batch_size=1000,
+        )
+        MonthlyUserAttendance.objects.bulk_create(
+            [MonthlyUserAttendance(user_id=user_id, month=month, **c) for (user_id, month), c in monthly.items()],
+            batch_size=1000,
+        )
+    return len(daily), len(monthly)
+
+
+def rebuild_job(start, end):
+    """Job handler (api/jobs.py) for rebuild(); dates are ISO strings."""
+    daily, monthly = rebuild(date.fromisoformat(start), date.fromisoformat(end))
+    return {'daily_rows': daily, 'monthly_rows': monthly}
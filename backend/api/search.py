@@ -0,0 +1,340 @@
+"""
+Full-text search over tickets, ticket updates and work updates.
+
+The index lives in the database and is kept current by the database itself,
+so bulk inserts and raw SQL are covered as well as model saves:
+
+* Postgres: each table has a generated, weighted `search_vector` tsvector
+  column (title-like text 'A', body 'B') with a GIN index.
+* SQLite: one FTS5 table, `api_search_index`, filled by triggers on the three
+  tables. Its rowid encodes the source row as id * KIND_SLOTS + kind code, so
+  a trigger updates or deletes exactly one index row by rowid.
+
+A search runs in two steps. First the ranked (kind, id) page is fetched from
+the index alone; then highlights and display fields are loaded for just
+those rows. Words are matched after stemming ("fixes" finds "fixed"), not as
+prefixes, on both databases. Highlight markers are control characters that are swapped for
+<mark> only after the text has been HTML-escaped.
+"""
+import html
+import re
+from contextlib import contextmanager
+
+from django.db import NotSupportedError, connection
+
+from .models import Ticket, TicketUpdate, User, WorkUpdate
+
+# kind -> (model, title column or None, body column, SQLite rowid code)
+KINDS = {
+    'ticket': (Ticket, 'title', 'description', 1),
+    'ticket_update': (TicketUpdate, None, 'update_text', 2),
+    'work_update': (WorkUpdate, 'project_name', 'description', 3),
+}
+KIND_SLOTS = 4
+FTS_TABLE = 'api_search_index'
+TS_CONFIG = 'english'
+MAX_TERMS = 8
+# Per kind, only the newest MAX_RANKED matches are ranked, which bounds the cost of very common words.
+MAX_RANKED = 1000
+# Migration that first installs the index; api/signals.py reinstalls it after later migrations.
+MIGRATION = '0017_search_index'
+
+START, STOP = '\x02', '\x03'
+# ts_headline() drops anything its parser takes for an XML tag, so angle brackets
+# go in as these control characters and are put back before escaping.
+ANGLE_BRACKETS, ANGLE_STAND_INS = '<>', '\x0e\x0f'
+HEADLINE_OPTIONS = f'StartSel={START}, StopSel={STOP}, MaxWords=30, MinWords=12, MaxFragments=2, FragmentDelimiter=" … "'
+TERM_RE = re.compile(r'\w+')
+
+
+def terms(text):
+    return TERM_RE.findall((text or '').lower())[:MAX_TERMS]
+
+
+def mark(text):
+    """HTML-escape highlighted text and turn the markers into <mark> tags."""
+    if not text:
+        return ''
+    return html.escape(text).replace(START, '<mark>').replace(STOP, '</mark>')
+
+
+def table(kind):
+    return KINDS[kind][0]._meta.db_table
+
+
+def _sqlite_columns(kind, row=None):
+    """rowid, title and body expressions for a kind's table, or for the new/old row in a trigger."""
+    _, title, body, code = KINDS[kind]
+    prefix = f'{row}.' if row else ''
+    title_sql = f"coalesce({prefix}{title}, '')" if title else "''"
+    return f"{prefix}id * {KIND_SLOTS} + {code}, {title_sql}, coalesce({prefix}{body}, '')"
+
+
+def _sqlite_objects():
+    """name -> CREATE statement for the FTS table and its triggers."""
+    objects = {
+        FTS_TABLE: (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"title, body, tokenize = 'porter unicode61 remove_diacritics 2')"
+        ),
+    }
+    for kind, (model, title, body, code) in KINDS.items():
+        name = f'{FTS_TABLE}_{kind}'
+        insert = f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES ({_sqlite_columns(kind, 'new')});"
+        delete = f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id * {KIND_SLOTS} + {code};"
+        columns = ', '.join(column for column in (title, body) if column)
+        objects[f'{name}_insert'] = (
+            f"CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table(kind)} BEGIN {insert} END"
+        )
+        objects[f'{name}_update'] = (
+            f"CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE OF {columns} ON {table(kind)} "
+            f"BEGIN {delete} {insert} END"
+        )
+        objects[f'{name}_delete'] = (
+            f"CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {table(kind)} BEGIN {delete} END"
+        )
+    return objects
+
+
+def _postgres_vector(kind):
+    _, title, body, _ = KINDS[kind]
+    parts = [f"setweight(to_tsvector('{TS_CONFIG}', coalesce({body}, '')), 'B')"]
+    if title:
+        parts.insert(0, f"setweight(to_tsvector('{TS_CONFIG}', coalesce({title}, '')), 'A')")
+    return ' || '.join(parts)
+
+
+def install(connection):
+    """
+    Create the index structures if they are missing; safe to run repeatedly.
+
+    On SQLite, Django rebuilds a table to alter it, which drops its triggers.
+    install() runs after every migrate (api/signals.py) and refills the FTS
+    table whenever it had to recreate anything.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            objects = _sqlite_objects()
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name IN (%s)" % ', '.join(['%s'] * len(objects)),
+                list(objects),
+            )
+            missing = set(objects) - {name for (name,) in cursor.fetchall()}
+            if not missing:
+                return
+            for name, statement in objects.items():
+                if name in missing:
+                    cursor.execute(statement)
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            for kind in KINDS:
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, body) SELECT {_sqlite_columns(kind)} FROM {table(kind)}"
+                )
+        elif connection.vendor == 'postgresql':
+            for kind in KINDS:
+                cursor.execute(
+                    f"ALTER TABLE {table(kind)} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                    f"GENERATED ALWAYS AS ({_postgres_vector(kind)}) STORED"
+                )
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table(kind)}_search_idx ON {table(kind)} USING GIN (search_vector)"
+                )
+
+
+@contextmanager
+def deferred(connection):
+    """
+    For bulk loads: on SQLite drop the triggers while the block runs, then
+    rebuild the index once, which is several times faster than a trigger per row.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+            installed = cursor.fetchone() is not None
+            if installed:
+                for name in _sqlite_objects():
+                    if name != FTS_TABLE:
+                        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        try:
+            yield
+        finally:
+            if installed:
+                install(connection)
+    else:
+        yield
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in reversed(list(_sqlite_objects())):
+                kind = 'TABLE' if name == FTS_TABLE else 'TRIGGER'
+                cursor.execute(f"DROP {kind} IF EXISTS {name}")
+        elif connection.vendor == 'postgresql':
+            for kind in KINDS:
+                cursor.execute(f"ALTER TABLE {table(kind)} DROP COLUMN IF EXISTS search_vector")
+
+
+def _visibility(kind, user):
+    """Extra SQL condition (with params) limiting `kind` to what `user` may see; see api/permissions.py."""
+    if kind == 'work_update' and user.role != User.IS_ADMIN:
+        return 'user_id = %s', [user.pk]
+    return None, []
+
+
+def _sqlite_match(words):
+    # Whole (stemmed) words only: FTS5 answers a prefix query by merging the
+    # doclists of every matching token, which costs ~100 ms for a common word.
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def _sqlite_page(words, kinds, user, limit, offset):
+    match = _sqlite_match(words)
+    clauses, params = [], []
+    with connection.cursor() as cursor:
+        for kind in kinds:
+            code = KINDS[kind][3]
+            condition, extra = _visibility(kind, user)
+            clause = f"rowid %% {KIND_SLOTS} = {code}"
+            if condition:
+                clause += f" AND rowid / {KIND_SLOTS} IN (SELECT id FROM {table(kind)} WHERE {condition})"
+            # Walking the matches in rowid order is cheap; bm25() is not. Find the
+            # MAX_RANKED-th newest match and rank only the rows from there on.
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {clause} "
+                f"ORDER BY rowid DESC LIMIT 1 OFFSET %s",
+                [match, *extra, MAX_RANKED - 1],
+            )
+            oldest = cursor.fetchone()
+            if oldest:
+                clause += f" AND rowid >= {oldest[0]}"
+            clauses.append(f"({clause})")
+            params += extra
+
+        cursor.execute(
+            f"SELECT rowid, -bm25({FTS_TABLE}, 10.0, 1.0) AS rank FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND ({' OR '.join(clauses)}) "
+            f"ORDER BY rank DESC, rowid DESC LIMIT %s OFFSET %s",
+            [match, *params, limit, offset],
+        )
+        by_code = {code: kind for kind, (_, _, _, code) in KINDS.items()}
+        return [(by_code[rowid % KIND_SLOTS], rowid // KIND_SLOTS, rank) for rowid, rank in cursor.fetchall()]
+
+
+def _sqlite_highlights(words, hits):
+    if not hits:
+        return {}
+    rowids = {id * KIND_SLOTS + KINDS[kind][3]: (kind, id) for kind, id, _ in hits}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, highlight({FTS_TABLE}, 0, %s, %s), snippet({FTS_TABLE}, 1, %s, %s, ' … ', 24) "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({', '.join(map(str, rowids))})",
+            [START, STOP, START, STOP, _sqlite_match(words)],
+        )
+        return {rowids[rowid]: (title, snippet) for rowid, title, snippet in cursor.fetchall()}
+
+
+def _postgres_query(words):
+    return ' & '.join(words)
+
+
+def _postgres_page(words, kinds, user, limit, offset):
+    selects, params = [], []
+    for kind in kinds:
+        condition, extra = _visibility(kind, user)
+        # Rank only the MAX_RANKED newest matches; ts_rank_cd() on every match of a common word is slow.
+        selects.append(
+            f"SELECT %s AS kind, id, ts_rank_cd(search_vector, query) AS rank FROM ("
+            f"SELECT id, search_vector, query FROM {table(kind)}, to_tsquery('{TS_CONFIG}', %s) query "
+            f"WHERE search_vector @@ query{f' AND {condition}' if condition else ''} "
+            f"ORDER BY id DESC LIMIT %s) recent"
+        )
+        params += [kind, _postgres_query(words), *extra, MAX_RANKED]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT kind, id, rank FROM ({' UNION ALL '.join(selects)}) hits "
+            f"ORDER BY rank DESC, kind, id DESC LIMIT %s OFFSET %s",
+            params + [limit, offset],
+        )
+        return cursor.fetchall()
+
+
+def _postgres_highlights(words, hits):
+    found = {}
+    with connection.cursor() as cursor:
+        for kind, (model, title, body, _) in KINDS.items():
+            ids = [id for hit_kind, id, _ in hits if hit_kind == kind]
+            if not ids:
+                continue
+            protected = f"translate(coalesce(%s, ''), '{ANGLE_BRACKETS}', %%s)"
+            title_sql = f"ts_headline('{TS_CONFIG}', {protected % title}, query, %s)" if title else "''"
+            cursor.execute(
+                f"SELECT id, {title_sql}, ts_headline('{TS_CONFIG}', {protected % body}, query, %s) "
+                f"FROM {table(kind)}, to_tsquery('{TS_CONFIG}', %s) query WHERE id = ANY(%s)",
+                ([ANGLE_STAND_INS, f'{HEADLINE_OPTIONS}, HighlightAll=true'] if title else [])
+                + [ANGLE_STAND_INS, HEADLINE_OPTIONS, _postgres_query(words), ids],
+            )
+            restore = str.maketrans(ANGLE_STAND_INS, ANGLE_BRACKETS)
+            found.update({
+                (kind, id): (title_text.translate(restore), snippet.translate(restore))
+                for id, title_text, snippet in cursor.fetchall()
+            })
+    return found
+
+
+BACKENDS = {
+    'sqlite': (_sqlite_page, _sqlite_highlights),
+    'postgresql': (_postgres_page, _postgres_highlights),
+}
+
+
+def _details(hits):
+    """Display fields for the hits, one query per kind."""
+    ids = {}
+    for kind, id, _ in hits:
+        ids.setdefault(kind, []).append(id)
+    details = {}
+    if 'ticket' in ids:
+        for row in Ticket.objects.filter(pk__in=ids['ticket']).values('id', 'status', 'created_at'):
+            details[('ticket', row['id'])] = {'ticket_id': row['id'], 'status': row['status'], 'date': row['created_at']}
+    if 'ticket_update' in ids:
+        rows = TicketUpdate.objects.filter(pk__in=ids['ticket_update']).values(
+            'id', 'ticket_id', 'ticket__title', 'ticket__status', 'user__username', 'created_at',
+        )
+        for row in rows:
+            details[('ticket_update', row['id'])] = {
+                'ticket_id': row['ticket_id'], 'title': html.escape(row['ticket__title']),
+                'status': row['ticket__status'], 'user': row['user__username'], 'date': row['created_at'],
+            }
+    if 'work_update' in ids:
+        rows = WorkUpdate.objects.filter(pk__in=ids['work_update']).values('id', 'status', 'user__username', 'date')
+        for row in rows:
+            details[('work_update', row['id'])] = {'status': row['status'], 'user': row['user__username'], 'date': row['date']}
+    return details
+
+
+def search(text, user, kinds=None, limit=20, offset=0):
+    """
+    Ranked hits for `text` visible to `user`: dicts with type, id, title and
+    snippet (HTML with <mark> around matches), rank and display fields.
+    Returns at most `limit` results starting at `offset`.
+    """
+    words = terms(text)
+    if not words:
+        return []
+    if connection.vendor not in BACKENDS:
+        raise NotSupportedError(f'Search is not available on {connection.vendor}')
+    page, highlights = BACKENDS[connection.vendor]
+    hits = page(words, list(kinds or KINDS), user, limit, offset)
+    marked = highlights(words, hits)
+    details = _details(hits)
+
+    results = []
+    for kind, id, rank in hits:
+        if (kind, id) not in details:
+            continue
+        title, snippet = marked.get((kind, id), ('', ''))
+        row = {'type': kind, 'id': id, 'title': mark(title), 'snippet': mark(snippet), 'rank': round(rank, 4)}
+        row.update(details[(kind, id)])
+        results.append(row)
+    return results
@@ -1,12 +1,54 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
-from .models import User, EmployeeProfile, Attendance, EmployeeDocument, WorkUpdate, Ticket, TicketUpdate
+from . import media, thumbnails
+from .models import User, EmployeeProfile, Attendance, EmployeeDocument, WorkUpdate, Ticket, TicketUpdate, Job
 
 class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
         fields = ['id', 'user', 'date', 'check_in_time', 'check_out_time', 'status', 'location_verified']
 
-class EmployeeProfileSerializer(serializers.ModelSerializer):
+class AttendancePunchSerializer(serializers.Serializer):
+    """One queued check-in/check-out punch from a kiosk or offline device."""
+    user_id = serializers.IntegerField()
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    timestamp = serializers.DateTimeField()
+
+class SparseFieldsMixin:
+    """Keep only the fields named in the optional `fields` kwarg."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class ImageVariantField(serializers.Field):
+    """URL of a generated image variant (api/thumbnails.py); None until it has been built."""
+
+    def __init__(self, image_field, variant, fmt='webp', **kwargs):
+        self.image_field = image_field
+        self.variant = variant
+        self.fmt = fmt
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        name = thumbnails.variant_name(instance, self.image_field, self.variant, self.fmt)
+        if not name:
+            return None
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+class EmployeeProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    profile_picture_thumb = ImageVariantField('profile_picture', 'thumb')
+    profile_picture_thumb_jpeg = ImageVariantField('profile_picture', 'thumb', 'jpeg')
+    profile_picture_medium = ImageVariantField('profile_picture', 'medium')
+    profile_picture_medium_jpeg = ImageVariantField('profile_picture', 'medium', 'jpeg')
+
     class Meta:
         model = EmployeeProfile
         fields = [
@@ -15,6 +57,7 @@ class EmployeeProfileSerializer(serializers.ModelSerializer):
             'college_name', 'college_year', 'college_cgpa',
             'address_line1', 'city', 'state', 'zip_code',
             'skills', 'interests', 'hobbies', 'profile_picture',
+            'profile_picture_thumb', 'profile_picture_thumb_jpeg', 'profile_picture_medium', 'profile_picture_medium_jpeg',
             'gender', 'employee_type'
         ]
 
@@ -24,6 +67,14 @@ class EmployeeDocumentSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'document_type', 'file', 'uploaded_at']
         read_only_fields = ['user']
 
+    def to_representation(self, instance):
+        # Document files are private (see api/media.py); hand out a link that
+        # expires instead of one that works for anybody who has seen it.
+        data = super().to_representation(instance)
+        if data.get('file'):
+            data['file'] = media.signed_url(data['file'], instance.file.name)
+        return data
+
 class WorkUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkUpdate
@@ -38,6 +89,21 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'employee_id', 'profile', 'password']
 
+    def __init__(self, *args, **kwargs):
+        # `fields` takes user fields plus dotted profile fields, e.g. ['id', 'profile.department'].
+        # A bare 'profile' keeps the whole nested profile.
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            return
+        profile_fields = [f.split('.', 1)[1] for f in fields if f.startswith('profile.')]
+        keep = {f for f in fields if '.' not in f}
+        if profile_fields and 'profile' not in keep:
+            keep.add('profile')
+            self.fields['profile'] = EmployeeProfileSerializer(read_only=True, fields=profile_fields)
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
     def create(self, validated_data):
         password = validated_data.pop('password')
         user = User.objects.create_user(**validated_data)
@@ -46,26 +112,34 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 class CreateEmployeeSerializer(serializers.Serializer):
-    username = serializers.CharField()
+    # Lengths match the columns, so a bulk import fails validation rather than its insert.
+    username = serializers.CharField(max_length=150)
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
-    first_name = serializers.CharField()
-    last_name = serializers.CharField()
-    employee_id = serializers.CharField()
-    department = serializers.CharField(required=False, allow_blank=True)
-    designation = serializers.CharField(required=False, allow_blank=True)
-    phone_number = serializers.CharField()
-    location = serializers.CharField(required=False, allow_blank=True)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    employee_id = serializers.CharField(max_length=20)
+    department = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    designation = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    phone_number = serializers.CharField(max_length=20)
+    location = serializers.CharField(required=False, allow_blank=True, max_length=100)
     date_of_birth = serializers.DateField(required=False, allow_null=True)
-    gender = serializers.CharField(required=False, allow_blank=True)
-    employee_type = serializers.CharField(required=False, allow_blank=True)
+    gender = serializers.CharField(required=False, allow_blank=True, max_length=10)
+    employee_type = serializers.CharField(required=False, allow_blank=True, max_length=20)
 
 class TicketUpdateSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
+    screenshot_thumb = ImageVariantField('screenshot', 'thumb')
+    screenshot_thumb_jpeg = ImageVariantField('screenshot', 'thumb', 'jpeg')
+    screenshot_large = ImageVariantField('screenshot', 'large')
+    screenshot_large_jpeg = ImageVariantField('screenshot', 'large', 'jpeg')
     
     class Meta:
         model = TicketUpdate
-        fields = ['id', 'ticket', 'user', 'user_name', 'update_text', 'screenshot', 'created_at']
+        fields = [
+            'id', 'ticket', 'user', 'user_name', 'update_text', 'screenshot',
+            'screenshot_thumb', 'screenshot_thumb_jpeg', 'screenshot_large', 'screenshot_large_jpeg', 'created_at',
+        ]
         read_only_fields = ['user', 'created_at']
 
 class TicketSerializer(serializers.ModelSerializer):
@@ -81,3 +155,37 @@ class TicketSerializer(serializers.ModelSerializer):
         if obj.assignee:
             return f"{obj.assignee.first_name} {obj.assignee.last_name}"
         return None
+
+class TicketCardSerializer(TicketSerializer):
+    """A ticket as a board card: no description and no nested updates."""
+
+    class Meta(TicketSerializer.Meta):
+        fields = ['id', 'title', 'status', 'assignee', 'assignee_name', 'month', 'year', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+class TicketSyncSerializer(TicketSerializer):
+    """A ticket without its nested updates, which /api/changes/ serves as their own collection."""
+
+    class Meta(TicketSerializer.Meta):
+        fields = [field for field in TicketSerializer.Meta.fields if field != 'updates']
+        read_only_fields = fields
+
+class JobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'name', 'status', 'priority', 'attempts', 'max_attempts', 'run_at', 'result', 'download_url',
+            'created_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, job):
+        """Expiring link to the file a job stored (e.g. an attendance export), signed afresh on each read."""
+        name = job.result.get('file') if isinstance(job.result, dict) else None
+        if not name:
+            return None
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return media.signed_url(request.build_absolute_uri(url) if request is not None else url, name)
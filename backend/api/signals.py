@@ -0,0 +1,83 @@
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import changes, events, geofence, search, thumbnails
+from .authentication import token_cache
+from .caching import bump_collections
+from .models import EmployeeProfile, OfficeSite, Ticket, TicketUpdate, User, WorkUpdate
+
+
+@receiver(post_save, sender=OfficeSite)
+@receiver(post_delete, sender=OfficeSite)
+@receiver(m2m_changed, sender=OfficeSite.employees.through)
+def reload_geofences(sender, **kwargs):
+    geofence.invalidate()
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    token_cache.discard(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_tokens(sender, instance, **kwargs):
+    # Role, active flag or password may have changed; re-read on next request.
+    token_cache.discard_user(instance.pk)
+
+
+# Which cached API collections embed each model (see api/caching.py).
+VERSIONED_MODELS = {
+    Ticket: ('tickets',),
+    TicketUpdate: ('tickets',),
+    User: ('employees', 'tickets'), # tickets embed the assignee's name
+    EmployeeProfile: ('employees',),
+    WorkUpdate: ('work_updates',),
+}
+
+
+def bump_versions(sender, **kwargs):
+    bump_collections(*VERSIONED_MODELS[sender])
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(bump_versions, sender=model, dispatch_uid=f'bump_versions_{model.__name__}')
+    post_delete.connect(bump_versions, sender=model, dispatch_uid=f'bump_versions_delete_{model.__name__}')
+
+
+def push_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        events.publish(events.event_for(instance, 'created' if created else 'updated'))
+
+
+def push_deleted(sender, instance, **kwargs):
+    events.publish(events.event_for(instance, 'deleted'))
+
+
+for model in events.PUSHED_MODELS:
+    post_save.connect(push_saved, sender=model, dispatch_uid=f'push_saved_{model.__name__}')
+    post_delete.connect(push_deleted, sender=model, dispatch_uid=f'push_deleted_{model.__name__}')
+
+
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_save, sender=TicketUpdate)
+def build_image_variants(sender, instance, **kwargs):
+    field = thumbnails.IMAGE_FIELDS[sender]
+    if thumbnails.needs_variants(instance, field):
+        thumbnails.schedule(instance, field)
+
+
+@receiver(post_migrate)
+def restore_triggers(sender, using, **kwargs):
+    # SQLite table rebuilds in later migrations drop triggers, and new columns
+    # are missing from the change log's UPDATE OF lists.
+    if sender.name != 'api':
+        return
+    connection = connections[using]
+    applied = MigrationRecorder(connection).applied_migrations()
+    for module in (search, changes):
+        if ('api', module.MIGRATION) in applied:
+            module.install(connection)
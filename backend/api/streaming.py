@@ -0,0 +1,38 @@
+"""
+Streaming responses that stay streamed under ASGI.
+
+Django's ASGI handler reads a synchronous streaming_content with
+sync_to_async(list), so the whole body is built in memory before the first
+byte goes out. asgi_streaming() gives such a response an async iterator
+instead when the request came through ASGI. Each step pulls about BATCH_BYTES
+of chunks in the request's sync thread, which is also where the database
+cursor behind an export lives. Under WSGI the response is left as it is.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+BATCH_BYTES = 64 * 1024
+
+
+def _next_batch(chunks):
+    batch, size = [], 0
+    for chunk in chunks:
+        batch.append(chunk)
+        size += len(chunk)
+        if size >= BATCH_BYTES:
+            break
+    return b''.join(batch)
+
+
+async def _iterate(chunks):
+    next_batch = sync_to_async(_next_batch)
+    while batch := await next_batch(chunks):
+        yield batch
+
+
+def asgi_streaming(request, response):
+    """`response`, reading its sync streaming_content in batches from an async iterator under ASGI."""
+    if isinstance(getattr(request, '_request', request), ASGIRequest) and not response.is_async:
+        # Closing the response still closes the original iterator (or file).
+        response.streaming_content = _iterate(iter(response.streaming_content))
+    return response
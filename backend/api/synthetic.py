@@ -0,0 +1,350 @@
+"""
+Synthetic employees, attendance, work updates and tickets for load and
+performance testing (`manage.py generate_data`, `manage.py seed_data`).
+
+Everything is derived from one random.Random(seed), so a given set of
+parameters always produces the same dataset, and every employee shares a
+single password hash.
+
+Users, profiles and tickets go through bulk_create. Attendance and work
+updates are nearly all of the rows (10,000 employees over a year is about
+2.6M attendance rows). For those tables bulk_create's per-field preparation
+costs more than the INSERT itself, so they are written with insert_rows():
+tuples already in database form, with timestamps precomputed per day and
+minute. The attendance rollups are totalled while the rows are generated,
+using the rules of rollups.contribution(), instead of being rebuilt from
+the table afterwards.
+"""
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from itertools import chain, islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import changes, search
+from .caching import bump_collections
+from .models import (
+    Attendance, DailyDepartmentAttendance, EmployeeProfile, MonthlyUserAttendance, Ticket, TicketUpdate, User,
+    WorkUpdate,
+)
+from .rollups import COUNTERS, UNASSIGNED, late_after, month_of
+
+DEPARTMENTS = ['Engineering', 'Sales', 'Marketing', 'Finance', 'Human Resources', 'Support', 'Operations']
+DESIGNATIONS = ['Trainee', 'Associate', 'Engineer', 'Senior Engineer', 'Lead', 'Manager']
+LOCATIONS = ['Head Office', 'Branch', 'Remote']
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Divya', 'Karthik', 'Ananya', 'Vikram', 'Meera', 'Arjun', 'Lakshmi', 'Rohan', 'Sneha']
+LAST_NAMES = ['Kumar', 'Sharma', 'Iyer', 'Reddy', 'Nair', 'Patel', 'Rao', 'Menon', 'Singh', 'Das']
+PROJECTS = ['Infinite UI', 'Backend API', 'Database Migration', 'AI Integration', 'Mobile App']
+DESCRIPTIONS = [
+    'Implemented login functionality',
+    'Fixed bugs in the dashboard',
+    'Optimized database queries',
+    'Designed new landing page',
+    'Integrated payment gateway',
+]
+WORK_STATUSES = ['In Progress', 'Completed', 'Completed', 'On Hold']
+TICKET_STATUSES = ['Open', 'In_Progress', 'Review', 'Completed']
+UPDATE_TEXTS = ['Started looking into this.', 'Found the root cause.', 'Fix is ready for review.', 'Deployed and verified.']
+
+DEFAULT_PASSWORD = 'password123'
+
+# Minutes after local midnight.
+CHECK_IN_FROM, CHECK_IN_SPREAD = 8 * 60, 151
+FULL_DAY, FULL_DAY_SPREAD = 8 * 60, 91
+HALF_DAY, HALF_DAY_SPREAD = 4 * 60, 61
+ABSENT_RATE, HALF_DAY_RATE = 0.05, 0.05
+
+ATTENDANCE_FIELDS = ('user', 'date', 'check_in_time', 'check_out_time', 'status', 'location_verified')
+WORK_UPDATE_FIELDS = ('user', 'date', 'project_name', 'description', 'status')
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the values we set on auto_now / auto_now_add fields."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def bulk_insert(model, rows, batch_size):
+    """bulk_create an iterable of unsaved instances in batches inside one transaction; returns the count."""
+    count = 0
+    with transaction.atomic():
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return count
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            count += len(batch)
+
+
+def insert_rows(model, fields, rows, batch_size):
+    """
+    INSERT tuples of database-ready values for `fields` in batches inside one
+    transaction; returns the count. No save(), signals or field preparation.
+    """
+    ops = connection.ops
+    table = ops.quote_name(model._meta.db_table)
+    columns = ', '.join(ops.quote_name(model._meta.get_field(name).column) for name in fields)
+    placeholder = '(%s)' % ', '.join(['%s'] * len(fields))
+    # SQLite caps the parameters per statement; other backends take the whole batch.
+    per_statement = ops.bulk_batch_size(fields, range(batch_size))
+    count = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return count
+            if connection.vendor == 'sqlite':
+                # sqlite3 runs executemany() as one prepared statement.
+                cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES {placeholder}', batch)
+            else:
+                # psycopg's executemany() is a round trip per row; send multi-row VALUES instead.
+                for start in range(0, len(batch), per_statement):
+                    chunk = batch[start:start + per_statement]
+                    cursor.execute(
+                        f'INSERT INTO {table} ({columns}) VALUES ' + ', '.join([placeholder] * len(chunk)),
+                        list(chain.from_iterable(chunk)),
+                    )
+            count += len(batch)
+
+
+def workdays(start, end):
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def at(day, minutes):
+    return timezone.make_aware(datetime.combine(day, time()) + timedelta(minutes=minutes))
+
+
+class Generator:
+    def __init__(self, employees, days, tickets_per_user=3, updates_per_ticket=2, work_updates_per_week=2,
+                 seed=0, prefix='emp', batch_size=2000, log=None):
+        self.employees = employees
+        self.days = days
+        self.tickets_per_user = tickets_per_user
+        self.updates_per_ticket = updates_per_ticket
+        self.work_updates_per_week = work_updates_per_week
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.end = timezone.localdate()
+        self.start = self.end - timedelta(days=days - 1)
+        # Rollup totals keyed like the tables, with dates in database form; lists follow COUNTERS.
+        self.daily = defaultdict(lambda: [0] * len(COUNTERS))
+        self.monthly = defaultdict(lambda: [0] * len(COUNTERS))
+
+    def run(self, users=None):
+        """
+        Generate history for `users`, or for `employees` new employees when
+        None; returns the users. Days that already have attendance are skipped.
+        """
+        # The change log would get a row per generated row; reset it instead,
+        # so sync clients reload (see api/changes.py).
+        with changes.deferred(connection):
+            users = self.generate(users)
+        self.log('Change log reset')
+
+        self.write_rollups()
+        # Nothing here sends signals; invalidate cached list responses by hand.
+        bump_collections('employees', 'tickets', 'work_updates')
+        return users
+
+    def generate(self, users):
+        existing = set()
+        if users is None:
+            users = self.create_employees()
+        else:
+            existing = set(
+                Attendance.objects.filter(date__gte=self.start, date__lte=self.end).values_list('user_id', 'date')
+            )
+        user_ids = [user.pk for user in users]
+        departments = dict(EmployeeProfile.objects.values_list('user_id', 'department'))
+        admin = User.objects.filter(role=User.IS_ADMIN).order_by('pk').first() or users[0]
+
+        self.insert('attendance', Attendance, ATTENDANCE_FIELDS, self.attendance(user_ids, departments, existing))
+        with search.deferred(connection):
+            self.insert('work updates', WorkUpdate, WORK_UPDATE_FIELDS, self.work_updates(user_ids))
+            last_ticket = Ticket.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            with explicit_timestamps(Ticket._meta.get_field('created_at'), Ticket._meta.get_field('updated_at')):
+                self.log(f'Created {bulk_insert(Ticket, self.tickets(user_ids, admin.pk), self.batch_size)} tickets')
+            ticket_rows = list(
+                Ticket.objects.filter(pk__gt=last_ticket).order_by('pk').values_list('pk', 'assignee_id', 'created_at')
+            )
+            with explicit_timestamps(TicketUpdate._meta.get_field('created_at')):
+                count = bulk_insert(TicketUpdate, self.ticket_updates(ticket_rows), self.batch_size)
+                self.log(f'Created {count} ticket updates')
+        self.log('Search index up to date')
+        return users
+
+    def insert(self, label, model, fields, rows):
+        count = insert_rows(model, fields, rows, self.batch_size)
+        self.log(f'Created {count} {label}')
+        return count
+
+    def create_employees(self):
+        password = make_password(DEFAULT_PASSWORD)
+        first = User.objects.filter(username__startswith=self.prefix).count()
+        rng = self.random
+        users = [
+            User(
+                username=f'{self.prefix}{n:06d}',
+                employee_id=f'{self.prefix.upper()}-{n:06d}',
+                email=f'{self.prefix}{n:06d}@example.com',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                role=User.IS_EMPLOYEE,
+                password=password,
+                date_joined=at(self.start - timedelta(days=rng.randint(0, 1500)), 9 * 60),
+            )
+            for n in range(first, first + self.employees)
+        ]
+        with transaction.atomic():
+            users = User.objects.bulk_create(users, batch_size=self.batch_size)
+            with explicit_timestamps(EmployeeProfile._meta.get_field('joined_date')):
+                EmployeeProfile.objects.bulk_create(
+                    [
+                        EmployeeProfile(
+                            user_id=user.pk,
+                            department=rng.choice(DEPARTMENTS),
+                            designation=rng.choice(DESIGNATIONS),
+                            phone_number=f'9{rng.randint(0, 10 ** 9 - 1):09d}',
+                            location=rng.choice(LOCATIONS),
+                            joined_date=user.date_joined.date(),
+                            employee_type=rng.choice(['Full-Time'] * 8 + ['Part-Time', 'Contract', 'Intern']),
+                        )
+                        for user in users
+                    ],
+                    batch_size=self.batch_size,
+                )
+        self.log(f'Created {len(users)} employees with profiles')
+        return users
+
+    def day_values(self, day):
+        """(date, month, timestamps by minute of the local day), all in database form."""
+        ops = connection.ops
+        midnight = at(day, 0)
+        minutes = [ops.adapt_datetimefield_value(midnight + timedelta(minutes=m)) for m in range(24 * 60)]
+        return ops.adapt_datefield_value(day), ops.adapt_datefield_value(month_of(day)), minutes
+
+    def attendance(self, user_ids, departments, existing):
+        rng = self.random.random
+        late = late_after()
+        late_minute = late.hour * 60 + late.minute
+        days = [(day, *self.day_values(day)) for day in workdays(self.start, self.end)]
+        for user_id in user_ids:
+            department = departments.get(user_id) or UNASSIGNED
+            for day, date_value, month_value, minutes in days:
+                if existing and (user_id, day) in existing:
+                    continue
+                daily = self.daily[(date_value, department)]
+                monthly = self.monthly[(user_id, month_value)]
+                roll = rng()
+                if roll < ABSENT_RATE:
+                    daily[1] += 1
+                    monthly[1] += 1
+                    yield user_id, date_value, None, None, 'Absent', False
+                    continue
+                check_in = CHECK_IN_FROM + int(rng() * CHECK_IN_SPREAD)
+                if roll < ABSENT_RATE + HALF_DAY_RATE:
+                    status, counter = 'Half-Day', 2
+                    worked = HALF_DAY + int(rng() * HALF_DAY_SPREAD)
+                else:
+                    status, counter = 'Present', 0
+                    worked = FULL_DAY + int(rng() * FULL_DAY_SPREAD)
+                if day == self.end:
+                    # Still at work.
+                    check_out, worked = None, 0
+                else:
+                    check_out = minutes[check_in + worked]
+                is_late = check_in > late_minute
+                for totals in (daily, monthly):
+                    totals[counter] += 1
+                    totals[3] += worked
+                    totals[4] += is_late
+                yield user_id, date_value, minutes[check_in], check_out, status, True
+
+    def work_updates(self, user_ids):
+        rng = self.random
+        ops = connection.ops
+        dates = [ops.adapt_datefield_value(self.end - timedelta(days=n)) for n in range(self.days)]
+        per_user = max(self.days // 7, 1) * self.work_updates_per_week
+        for user_id in user_ids:
+            for _ in range(per_user):
+                yield (
+                    user_id, dates[int(rng.random() * self.days)],
+                    rng.choice(PROJECTS), rng.choice(DESCRIPTIONS), rng.choice(WORK_STATUSES),
+                )
+
+    def tickets(self, user_ids, admin_id):
+        rng = self.random
+        for user_id in user_ids:
+            for _ in range(self.tickets_per_user):
+                created = at(self.end - timedelta(days=rng.randrange(self.days)), rng.randint(9 * 60, 18 * 60))
+                yield Ticket(
+                    title=f'Fix issue in {rng.choice(PROJECTS)}',
+                    description='Investigate and resolve the reported bug.',
+                    status=rng.choice(TICKET_STATUSES),
+                    assignee_id=user_id,
+                    created_by_id=admin_id,
+                    month=created.strftime('%B'),
+                    year=created.year,
+                    created_at=created,
+                    updated_at=created,
+                )
+
+    def ticket_updates(self, ticket_rows):
+        rng = self.random
+        for ticket_id, assignee_id, created_at in ticket_rows:
+            for n in range(self.updates_per_ticket):
+                yield TicketUpdate(
+                    ticket_id=ticket_id,
+                    user_id=assignee_id,
+                    update_text=UPDATE_TEXTS[n % len(UPDATE_TEXTS)],
+                    created_at=created_at + timedelta(hours=rng.randint(1, 72) * (n + 1)),
+                )
+
+    def write_rollups(self):
+        daily = self.add_totals(
+            DailyDepartmentAttendance, ('date', 'department'), self.daily,
+            date__gte=self.start, date__lte=self.end,
+        )
+        monthly = self.add_totals(
+            MonthlyUserAttendance, ('user', 'month'), self.monthly,
+            month__gte=month_of(self.start), month__lte=self.end,
+        )
+        self.log(f'Inserted {daily} daily and {monthly} monthly attendance rollups')
+
+    def add_totals(self, model, key_fields, totals, **window):
+        """Add the generated totals to existing rollup rows (F() updates, like check-ins) and insert the rest."""
+        ops = connection.ops
+        adapt = {
+            'date': ops.adapt_datefield_value, 'month': ops.adapt_datefield_value,
+            'department': lambda value: value, 'user': lambda value: value,
+        }
+        attnames = [model._meta.get_field(name).attname for name in key_fields]
+        with transaction.atomic():
+            for *key, pk in model.objects.filter(**window).values_list(*attnames, 'pk'):
+                key = tuple(adapt[name](value) for name, value in zip(key_fields, key))
+                if key in totals:
+                    values = totals.pop(key)
+                    model.objects.filter(pk=pk).update(**{c: F(c) + v for c, v in zip(COUNTERS, values) if v})
+            insert_rows(
+                model, key_fields + COUNTERS, (key + tuple(values) for key, values in totals.items()), self.batch_size,
+            )
+        return len(totals)
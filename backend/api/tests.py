@@ -1,3 +1,1776 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from PIL import Image
+
+from . import async_views, benchmarks, caching, changes, employee_import, events, exports, geofence, jobs, media, metrics, partitions, rollups, search, synthetic, thumbnails
+from .authentication import token_cache
+from .pagination import KeysetPagination
+from .throttling import LoginThrottle
+from .serializers import EmployeeProfileSerializer, TicketSerializer, TicketUpdateSerializer
+from .views import record_check_in
+from .models import (
+    User, EmployeeProfile, Attendance, WorkUpdate, Ticket, TicketUpdate, OfficeSite, EmployeeDocument, Job,
+    DailyDepartmentAttendance, MonthlyUserAttendance,
+)
+
+
+def make_user(username, role=User.IS_EMPLOYEE, department='Engineering', **extra):
+    user = User.objects.create_user(username=username, password='pass1234', role=role, **extra)
+    EmployeeProfile.objects.create(
+        user=user, department=department, designation='Engineer', phone_number='000', location='HQ'
+    )
+    return user
+
+
+def make_attendance(user, day, check_in=None, check_out=None, status='Present'):
+    return Attendance.objects.create(
+        user=user, date=day, check_in_time=check_in, check_out_time=check_out, status=status
+    )
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def asgi_get(path, log, headers=None):
+    """
+    GET `path` through Django's ASGI handler, as the uvicorn workers serve it.
+    Appends 'sent' to `log` for every body message; returns (status, body).
+    """
+    headers = {'Host': 'testserver', **(headers or {})}
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    messages = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # The client stays connected until the handler cancels this.
+            await asyncio.Event().wait()
+        requested = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+        if message['type'] == 'http.response.body':
+            log.append('sent')
+
+    # The request runs on its own thread; close its connection afterwards, as SERVE_ASGI does.
+    with mock.patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0}):
+        async_to_sync(ASGIHandler())(scope, receive, send)
+    return messages[0]['status'], b''.join(message.get('body', b'') for message in messages[1:])
+
+
+class ResetCachesMixin:
+    """Resets the per-process caches, which a test-case rollback does not touch."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        caches['throttle'].clear()
+        token_cache.clear()
+        geofence.invalidate()
+
+
+class BaseTestCase(ResetCachesMixin, TestCase):
+    pass
+
+
+class BaseTransactionTestCase(ResetCachesMixin, TransactionTestCase):
+    """For code that only behaves on commit, like Postgres' transaction-id horizon and NOTIFY."""
+    # Restores the office sites seeded by the migrations after each flush.
+    serialized_rollback = True
+
+
+class ReportsViewTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN, department='Administration')
+        self.alice = make_user('alice', first_name='Alice', last_name='A')
+        self.bob = make_user('bob', department='Sales')
+
+        make_attendance(self.alice, date(2026, 1, 5), utc(2026, 1, 5, 9, 0), utc(2026, 1, 5, 17, 0))
+        make_attendance(self.alice, date(2026, 1, 6), utc(2026, 1, 6, 10, 0), utc(2026, 1, 6, 14, 30), status='Half-Day')
+        make_attendance(self.bob, date(2026, 2, 2), utc(2026, 2, 2, 8, 30))
+        WorkUpdate.objects.create(user=self.alice, project_name='A', description='x', status='Completed')
+        WorkUpdate.objects.create(user=self.alice, project_name='B', description='y')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('reports_summary')
+
+    def test_groups_by_employee_department_and_month(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        alice = next(row for row in response.data['employees'] if row['username'] == 'alice')
+        self.assertEqual(alice['name'], 'Alice A')
+        self.assertEqual(alice['days_present'], 1)
+        self.assertEqual(alice['half_days'], 1)
+        self.assertEqual(alice['avg_check_in_time'], '09:30')
+        self.assertEqual(alice['total_hours'], 12.5)
+        self.assertEqual(alice['open_work_updates'], 1)
+        self.assertEqual(alice['completed_work_updates'], 1)
+
+        departments = {row['department']: row for row in response.data['departments']}
+        self.assertEqual(departments['Sales']['days_present'], 1)
+        self.assertEqual(departments['Sales']['total_hours'], 0.0)
+
+        months = [row['month'] for row in response.data['months']]
+        self.assertIn('2026-01', months)
+        self.assertIn('2026-02', months)
+
+    def test_filters_by_date_range_and_department(self):
+        response = self.client.get(self.url, {'start_date': '2026-02-01', 'department': 'Sales'})
+        self.assertEqual([row['username'] for row in response.data['employees']], ['bob'])
+        self.assertEqual([row['month'] for row in response.data['months']], ['2026-02'])
+
+    def test_runs_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+    def test_rejects_bad_dates_and_non_admins(self):
+        self.assertEqual(self.client.get(self.url, {'start_date': 'yesterday'}).status_code, 400)
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class KeysetPaginationTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def collect(self, url, params):
+        seen, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            pages += 1
+            seen.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                return seen, pages
+            response = self.client.get(response.data['next'])
+
+    def test_walks_tickets_newest_first_without_gaps(self):
+        tickets = [
+            Ticket.objects.create(title=f't{i}', description='d', created_by=self.admin, month='January', year=2026)
+            for i in range(7)
+        ]
+        # Identical timestamps must still page deterministically via the id tiebreaker.
+        Ticket.objects.filter(pk__in=[t.pk for t in tickets[:4]]).update(created_at=tickets[0].created_at)
+
+        seen, pages = self.collect('/api/tickets/', {'page_size': 3})
+        expected = list(
+            Ticket.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+
+    def test_attendance_history_pages_on_date(self):
+        for day in range(1, 6):
+            make_attendance(self.admin, date(2026, 1, day))
+        seen, pages = self.collect('/api/attendance/mark/', {'user_id': self.admin.id, 'page_size': 2})
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen[0], Attendance.objects.get(date=date(2026, 1, 5)).id)
+
+    def test_pages_by_default(self):
+        Ticket.objects.bulk_create([
+            Ticket(title=f't{i}', description='d', created_by=self.admin, month='January', year=2026)
+            for i in range(KeysetPagination.page_size + 1)
+        ])
+        response = self.client.get('/api/tickets/')
+        self.assertEqual(len(response.data['results']), KeysetPagination.page_size)
+        self.assertIsNotNone(response.data['next'])
+
+        # API_PAGE_SIZE=0 opts the deployment into whole lists.
+        cache.clear()
+        with mock.patch.object(KeysetPagination, 'page_size', None):
+            response = self.client.get('/api/tickets/')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), KeysetPagination.page_size + 1)
+
+    def test_rejects_garbage_cursor(self):
+        response = self.client.get('/api/tickets/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class TicketQueryCountTests(BaseTestCase):
+    """Listing tickets must cost a fixed number of queries regardless of volume."""
+
+    # Collection version (ETag), tickets joined to assignees, prefetched updates joined to authors.
+    LIST_QUERIES = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', role=User.IS_ADMIN)
+        cls.employees = [make_user(f'emp{i}') for i in range(3)]
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def create_tickets(self, count, updates_per_ticket=2):
+        tickets = Ticket.objects.bulk_create([
+            Ticket(
+                title=f'Ticket {i}', description='d', created_by=self.admin,
+                assignee=self.employees[i % len(self.employees)], month='January', year=2026,
+            )
+            for i in range(count)
+        ])
+        TicketUpdate.objects.bulk_create([
+            TicketUpdate(ticket=ticket, user=self.employees[(i + j) % len(self.employees)], update_text='u')
+            for i, ticket in enumerate(tickets)
+            for j in range(updates_per_ticket)
+        ])
+
+    def assert_listing_queries(self, count):
+        self.create_tickets(count)
+
+        # Whole lists (API_PAGE_SIZE=0) as well as pages.
+        with mock.patch.object(KeysetPagination, 'page_size', None):
+            self.client.force_authenticate(self.admin)
+            with self.assertNumQueries(self.LIST_QUERIES):
+                response = self.client.get('/api/tickets/')
+            self.assertEqual(len(response.data), count)
+            self.assertEqual(len(response.data[0]['updates']), 2)
+            self.assertTrue(response.data[0]['assignee_name'])
+
+            self.client.force_authenticate(self.employees[0])
+            with self.assertNumQueries(self.LIST_QUERIES):
+                response = self.client.get('/api/my-tickets/')
+            self.assertEqual(len(response.data), (count + 2) // 3)
+
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get('/api/tickets/')
+        self.assertEqual(len(response.data['results']), min(count, KeysetPagination.page_size))
+
+    def test_10_tickets(self):
+        self.assert_listing_queries(10)
+
+    def test_1000_tickets(self):
+        self.assert_listing_queries(1000)
+
+    def test_10000_tickets(self):
+        self.assert_listing_queries(10000)
+
+
+class EmployeeSparseFieldsTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        for i in range(3):
+            make_user(f'emp{i}', first_name=f'First{i}')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_summary_view_returns_grid_fields_in_one_query(self):
+        with self.assertNumQueries(2) as ctx:  # collection version + employees
+            response = self.client.get('/api/employees/', {'view': 'summary'})
+        row = response.data['results'][0]
+        self.assertEqual(
+            set(row), {'id', 'username', 'email', 'first_name', 'last_name', 'role', 'employee_id', 'profile'}
+        )
+        self.assertIn('department', row['profile'])
+        self.assertNotIn('school_name', row['profile'])
+        sql = ctx.captured_queries[1]['sql']
+        self.assertNotIn('school_name', sql)
+        self.assertNotIn('password', sql)
+
+    def test_fields_param_selects_user_and_profile_columns(self):
+        response = self.client.get('/api/employees/', {'fields': 'id,first_name,profile.department,bogus'})
+        [row] = [row for row in response.data['results'] if row['first_name'] == 'First0']
+        self.assertEqual(row, {'id': row['id'], 'first_name': 'First0', 'profile': {'department': 'Engineering'}})
+
+    def test_full_payload_by_default(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/employees/')
+        self.assertIn('school_name', response.data['results'][0]['profile'])
+
+
+class EmployeeImportTests(BaseTestCase):
+    HEADER = 'username,email,password,first_name,last_name,employee_id,phone_number,department,date_of_birth\n'
+
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN, employee_id='ADM-1')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def upload(self, body, **params):
+        upload = SimpleUploadedFile('hires.csv', (self.HEADER + body).encode(), content_type='text/csv')
+        return self.client.post('/api/employees/import/' + ('?partial=true' if params.get('partial') else ''), {'file': upload})
+
+    def test_csv_creates_users_and_profiles(self):
+        response = self.upload(
+            'carol,carol@Example.COM,s3cret-1,Carol,Ng,E-10,111,Sales,1990-04-01\n'
+            'dave,dave@example.com,s3cret-2,Dave,Li,E-11,222,,\n'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([row['row'] for row in response.data['employees']], [1, 2])
+        carol = User.objects.get(username='carol')
+        self.assertTrue(carol.check_password('s3cret-1'))
+        self.assertEqual((carol.role, carol.email), (User.IS_EMPLOYEE, 'carol@example.com'))
+        self.assertEqual(carol.profile.date_of_birth, date(1990, 4, 1))
+        # Blank cells fall back to the defaults of the single-employee endpoint.
+        self.assertEqual(User.objects.get(username='dave').profile.department, 'Unassigned')
+
+    def test_invalid_rows_are_reported_and_block_the_import(self):
+        make_user('erin', employee_id='E-20')
+        body = (
+            'frank,frank@example.com,pw,Frank,Oz,E-21,333\n'
+            'frank,frank2@example.com,pw,Frank,Two,E-22,444\n'
+            'gina,gina@example.com,pw,Gina,Ro,E-20,555\n'
+            'hank,not-an-email,pw,Hank,Po,E-23,\n'
+        )
+        response = self.upload(body)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+        errors = {error['row']: set(error['errors']) for error in response.data['errors']}
+        self.assertEqual(errors, {2: {'username'}, 3: {'employee_id'}, 4: {'email', 'phone_number'}})
+        self.assertFalse(User.objects.filter(username='frank').exists())
+
+        response = self.upload(body, partial=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['username'] for row in response.data['employees']], ['frank'])
+
+    def test_admins_only(self):
+        self.client.force_authenticate(make_user('ivy'))
+        self.assertEqual(self.client.post('/api/employees/import/', [], format='json').status_code, 403)
+
+    def test_command_and_process_pool(self):
+        rows = [
+            {'username': f'pool{n}', 'email': f'pool{n}@example.com', 'password': f'pw-{n}', 'first_name': 'P',
+             'last_name': str(n), 'employee_id': f'P-{n}', 'phone_number': '0'}
+            for n in range(employee_import.POOL_MIN_PASSWORDS)
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as file:
+            json.dump(rows, file)
+            file.flush()
+            call_command('import_employees', file.name, workers=2, stdout=io.StringIO())
+        users = User.objects.filter(username__startswith='pool').order_by('employee_id')
+        self.assertEqual(len(users), len(rows))
+        self.assertTrue(all(user.check_password(f'pw-{n}') for n, user in enumerate(users)))
+
+
+class AttendanceBatchTests(BaseTestCase):
+    OFFICE = {'latitude': 13.0360406, 'longitude': 80.2181952}
+
+    def setUp(self):
+        super().setUp()
+        self.kiosk = make_user('kiosk', role=User.IS_ADMIN)
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.client = APIClient()
+        self.client.force_authenticate(self.kiosk)
+        geofence.get_index()
+
+    def punch(self, user, when, **overrides):
+        return {'user_id': user.id, 'timestamp': when.isoformat(), **self.OFFICE, **overrides}
+
+    def test_writes_valid_punches_and_reports_bad_ones(self):
+        make_attendance(self.bob, date(2026, 3, 2), utc(2026, 3, 2, 9, 0))
+        payload = [
+            self.punch(self.alice, utc(2026, 3, 2, 18, 0)),
+            self.punch(self.alice, utc(2026, 3, 2, 9, 15)),
+            self.punch(self.bob, utc(2026, 3, 2, 17, 30)),
+            self.punch(self.alice, utc(2026, 3, 2, 9, 0), latitude=12.0),
+            {'user_id': 99999, 'timestamp': utc(2026, 3, 2, 9, 0).isoformat(), **self.OFFICE},
+            {'user_id': self.alice.id},
+        ]
+        make_attendance(self.alice, date(2026, 3, 1), utc(2026, 3, 1, 9, 0), utc(2026, 3, 1, 17, 0))
+        rollups.rebuild(date(2026, 3, 1), date(2026, 3, 31))
+        # users, savepoint, locked attendance read, insert, update, one UPDATE per
+        # touched rollup row (March 2 daily + March for alice and bob), release
+        with mock.patch.object(events, '_send') as send, self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(9):
+                response = self.client.post('/api/attendance/batch/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        # One notice per written row, sent together after the commit.
+        send.assert_called_once()
+        self.assertEqual(sorted(event['action'] for event in send.call_args.args[0]), ['created', 'updated'])
+        self.assertEqual(response.data['succeeded'], 3)
+        self.assertEqual([r['status'] for r in response.data['results']], ['ok', 'ok', 'ok', 'error', 'error', 'error'])
+        self.assertEqual(response.data['results'][1]['message'], 'Check-in successful!')
+        self.assertEqual(response.data['results'][0]['message'], 'Check-out successful!')
+
+        alice = Attendance.objects.get(user=self.alice, date=date(2026, 3, 2))
+        self.assertEqual((alice.date, alice.check_in_time, alice.check_out_time), (date(2026, 3, 2), utc(2026, 3, 2, 9, 15), utc(2026, 3, 2, 18, 0)))
+        self.assertEqual(Attendance.objects.get(user=self.bob).check_out_time, utc(2026, 3, 2, 17, 30))
+
+    def test_out_of_order_punches_from_offline_devices(self):
+        self.client.post('/api/attendance/batch/', [self.punch(self.alice, utc(2026, 3, 2, 17, 0))], format='json')
+        self.client.post('/api/attendance/batch/', [self.punch(self.bob, utc(2026, 3, 2, 9, 0)), self.punch(self.bob, utc(2026, 3, 2, 17, 0))], format='json')
+
+        # A punch queued earlier in the day arrives after the later one.
+        response = self.client.post('/api/attendance/batch/', [
+            self.punch(self.alice, utc(2026, 3, 2, 9, 0)),
+            self.punch(self.bob, utc(2026, 3, 2, 8, 30)),
+            self.punch(self.bob, utc(2026, 3, 2, 12, 0)),
+            self.punch(self.bob, utc(2026, 3, 2, 17, 0)),
+        ], format='json')
+        self.assertEqual(
+            [(r['status'], r['message']) for r in response.data['results']],
+            [
+                ('ok', 'Check-in moved earlier to this punch.'),
+                ('ok', 'Check-in moved earlier to this punch.'),
+                ('ignored', 'Already checked out for today.'),
+                ('ignored', 'Duplicate punch.'),
+            ],
+        )
+        self.assertEqual((response.data['succeeded'], response.data['ignored'], response.data['failed']), (2, 2, 0))
+
+        alice = Attendance.objects.get(user=self.alice)
+        self.assertEqual((alice.check_in_time, alice.check_out_time), (utc(2026, 3, 2, 9, 0), utc(2026, 3, 2, 17, 0)))
+        bob = Attendance.objects.get(user=self.bob)
+        self.assertEqual((bob.check_in_time, bob.check_out_time), (utc(2026, 3, 2, 8, 30), utc(2026, 3, 2, 17, 0)))
+        self.assertEqual(
+            MonthlyUserAttendance.objects.get(user=self.alice, month=date(2026, 3, 1)).minutes_worked, 480,
+        )
+
+    def test_employees_may_only_submit_their_own_punches(self):
+        self.client.force_authenticate(self.alice)
+        response = self.client.post('/api/attendance/batch/', {'punches': [
+            self.punch(self.alice, utc(2026, 3, 2, 9, 0)),
+            self.punch(self.bob, utc(2026, 3, 2, 9, 0)),
+        ]}, format='json')
+        self.assertEqual([r['status'] for r in response.data['results']], ['ok', 'error'])
+        self.assertFalse(Attendance.objects.filter(user=self.bob).exists())
+
+
+class GeofenceTests(BaseTestCase):
+    HEAD_OFFICE = (13.0360406, 80.2181952)
+
+    def setUp(self):
+        super().setUp()
+        self.alice = make_user('alice')
+        self.bob = make_user('bob', department='Sales')
+        self.branch = OfficeSite.objects.create(
+            name='Branch', latitude=12.9716, longitude=77.5946, radius_meters=150, departments=['Sales'],
+        )
+        # Roughly a 200m square around a second branch, open to alice only.
+        self.annex = OfficeSite.objects.create(
+            name='Annex', latitude=12.9000, longitude=77.6000,
+            polygon=[[12.8991, 77.5991], [12.8991, 77.6009], [12.9009, 77.6009], [12.9009, 77.5991]],
+        )
+        self.annex.employees.add(self.alice)
+        self.client = APIClient()
+
+    def test_locates_circles_and_polygons_by_assignment(self):
+        index = geofence.get_index()
+        self.assertTrue(index.locate(*self.HEAD_OFFICE, self.alice.id, 'Engineering')[0].name.startswith('Head Office'))
+        self.assertEqual(index.locate(12.9717, 77.5947, self.bob.id, 'Sales')[0].id, self.branch.id)
+        self.assertIsNone(index.locate(12.9717, 77.5947, self.alice.id, 'Engineering')[0])
+        self.assertEqual(index.locate(12.9005, 77.6005, self.alice.id, 'Engineering')[0].id, self.annex.id)
+        self.assertIsNone(index.locate(12.9005, 77.6005, self.bob.id, 'Sales')[0])
+        # Inside the polygon's bounding circle but outside the square itself.
+        self.assertIsNone(index.locate(12.9000, 77.6012, self.alice.id, 'Engineering')[0])
+
+        site, distance = index.locate(12.9760, 77.5946, self.bob.id, 'Sales')
+        self.assertIsNone(site)
+        self.assertAlmostEqual(distance, 489, delta=5)
+
+    def test_batch_matches_single_lookups(self):
+        index = geofence.get_index()
+        points = [
+            (*self.HEAD_OFFICE, self.alice.id, 'Engineering'),
+            (12.9717, 77.5947, self.bob.id, 'Sales'),
+            (12.9717, 77.5947, self.alice.id, 'Engineering'),
+            (12.9005, 77.6005, self.alice.id, 'Engineering'),
+        ]
+        self.assertEqual(index.locate_many(points), [index.locate(*point) for point in points])
+
+    def test_batch_matches_single_lookups_on_many_sites(self):
+        # The benchmark checks locate_many() against locate() before timing them.
+        for vertices in (0, 12):
+            output = io.StringIO()
+            call_command('benchmark_geofence', sites=30, vertices=vertices, points=300, repeat=1, stdout=output)
+            self.assertIn('locate_many()', output.getvalue())
+
+    def test_check_in_does_not_query_sites_and_reloads_on_change(self):
+        geofence.get_index()
+        with self.assertNumQueries(0):
+            geofence.get_index().locate(12.9717, 77.5947, self.bob.id, 'Sales')
+
+        response = self.client.post('/api/attendance/mark/', {'user_id': self.bob.id, 'latitude': 12.9717, 'longitude': 77.5947})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['site'], 'Branch')
+
+        self.branch.is_active = False
+        self.branch.save()
+        response = self.client.post('/api/attendance/mark/', {'user_id': self.bob.id, 'latitude': 12.9717, 'longitude': 77.5947})
+        self.assertEqual(response.status_code, 403)
+
+
+    def test_invalid_sites_are_rejected_and_skipped(self):
+        for polygon in ([[12.9, 77.6], [12.91, 77.6]], [[12.9, 77.6], [12.91, 'east'], [12.9, 77.61]], [[95, 77.6]] * 3):
+            with self.assertRaises(ValidationError) as raised:
+                OfficeSite(name='Bad', latitude=12.9, longitude=77.6, polygon=polygon).full_clean()
+            self.assertIn('polygon', raised.exception.message_dict)
+        with self.assertRaises(ValidationError):
+            OfficeSite(name='Bad', latitude=12.9, longitude=77.6, departments='Sales').full_clean()
+        self.annex.full_clean()
+
+        # Saved without validation: the index leaves it out and check-ins keep working.
+        OfficeSite.objects.create(name='Bad', latitude=12.9, longitude=77.6, polygon=[[12.9, 77.6], ['x']])
+        with self.assertLogs('api.geofence', 'ERROR'):
+            index = geofence.get_index()
+        self.assertNotIn('Bad', [site.name for site in index.sites])
+        response = self.client.post('/api/attendance/mark/', {'user_id': self.bob.id, 'latitude': 12.9717, 'longitude': 77.5947})
+        self.assertEqual(response.status_code, 200)
+
+
+class AsyncAttendanceTests(BaseTestCase):
+    OFFICE = {'latitude': 13.0360406, 'longitude': 80.2181952}
+
+    def setUp(self):
+        super().setUp()
+        self.alice = make_user('alice')
+
+    async def test_check_in_and_out_match_the_sync_endpoint(self):
+        url = '/api/attendance/async/mark/'
+        response = await self.async_client.post(url, {'user_id': self.alice.id, **self.OFFICE}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['message'], 'Check-in successful!')
+        self.assertTrue(body['site'].startswith('Head Office'))
+        self.assertEqual(body['data']['status'], 'Present')
+
+        # Form-encoded bodies are accepted too, as on the DRF view.
+        response = await self.async_client.post(url, {'user_id': self.alice.id, **self.OFFICE})
+        self.assertEqual(response.json()['message'], 'Check-out successful!')
+
+        monthly = await MonthlyUserAttendance.objects.aget(user=self.alice)
+        self.assertEqual(monthly.present, 1)
+
+        response = await self.async_client.post(url, {'user_id': self.alice.id, 'latitude': 12.9, 'longitude': 77.6}, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('distance', response.json())
+        response = await self.async_client.post(url, {'user_id': 999999, **self.OFFICE}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.post(url, {'user_id': self.alice.id}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_history_is_keyset_paginated(self):
+        for day in (1, 2, 3):
+            await Attendance.objects.acreate(user=self.alice, date=date(2026, 4, day), status='Present')
+        url = '/api/attendance/async/mark/'
+
+        response = await self.async_client.get(url, {'user_id': self.alice.id})
+        self.assertEqual([row['date'] for row in response.json()['results']], ['2026-04-03', '2026-04-02', '2026-04-01'])
+
+        response = await self.async_client.get(url, {'user_id': self.alice.id, 'page_size': 2})
+        page = response.json()
+        self.assertEqual([row['date'] for row in page['results']], ['2026-04-03', '2026-04-02'])
+        response = await self.async_client.get(page['next'])
+        self.assertEqual([row['date'] for row in response.json()['results']], ['2026-04-01'])
+
+        response = await self.async_client.get(url, {'user_id': self.alice.id, 'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 404)
+
+
+class LoginTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('alice')
+        self.client = APIClient()
+
+    def login(self, username='alice', password='pass1234', **extra):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password}, format='json', **extra)
+
+    def test_login_returns_slim_user_and_me_the_full_profile(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        user = response.json()['user']
+        self.assertEqual(user['role'], User.IS_EMPLOYEE)
+        self.assertEqual(user['profile']['department'], 'Engineering')
+        self.assertNotIn('phone_number', user['profile'])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.json()['token']}")
+        me = self.client.get('/api/auth/me/').json()
+        self.assertEqual(me['profile']['phone_number'], '000')
+        self.client.credentials()
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+
+    def test_username_window_slides(self):
+        now = [1000.0]
+        with mock.patch.dict(LoginThrottle.THROTTLE_RATES, {'login_username': '2/min'}), \
+                mock.patch.object(LoginThrottle, 'timer', lambda self: now[0]):
+            self.assertEqual(self.login(password='wrong').status_code, 400)
+            now[0] += 30
+            self.assertEqual(self.login(username=' ALICE ', password='wrong').status_code, 400)
+            with mock.patch('api.views.authenticate') as authenticate:
+                response = self.login()
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '30')
+            authenticate.assert_not_called()
+
+            # The first attempt leaves the window; the second still counts.
+            now[0] += 31
+            self.assertEqual(self.login().status_code, 200)
+            self.assertEqual(self.login().status_code, 429)
+
+    def test_ip_limit_spans_usernames(self):
+        make_user('bob')
+        with mock.patch.dict(LoginThrottle.THROTTLE_RATES, {'login_ip': '2/min'}):
+            self.assertEqual(self.login(password='wrong').status_code, 400)
+            self.assertEqual(self.login('bob', 'wrong').status_code, 400)
+            self.assertEqual(self.login('bob').status_code, 429)
+            self.assertEqual(self.login('bob', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+
+class CachedTokenAuthenticationTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('alice')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_skips_token_lookup(self):
+        self.client.get('/api/my-tickets/')
+        with self.assertNumQueries(1):  # collection version only; the body comes from the response cache
+            response = self.client.get('/api/my-tickets/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_token_is_rejected_immediately(self):
+        self.client.get('/api/my-tickets/')
+        self.token.delete()
+        self.assertEqual(self.client.get('/api/my-tickets/').status_code, 401)
+
+    def test_deactivated_user_is_rejected_immediately(self):
+        self.client.get('/api/my-tickets/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/my-tickets/').status_code, 401)
+
+    def test_entries_expire_and_are_bounded(self):
+        cache = type(token_cache)(max_size=2, ttl=0)
+        cache.set('a', self.user, self.token)
+        self.assertIsNone(cache.get('a'))
+
+        cache = type(token_cache)(max_size=2, ttl=60)
+        for key in 'abc':
+            cache.set(key, self.user, self.token)
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+
+class ConditionalGetTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.ticket = Ticket.objects.create(title='t', description='d', created_by=self.admin, month='January', year=2026)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_matching_etag_returns_304_before_serializing(self):
+        first = self.client.get('/api/tickets/')
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/tickets/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_cached_body_is_served_until_a_write(self):
+        first = self.client.get('/api/tickets/')
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/tickets/')
+        self.assertEqual(cached.content, first.content)
+
+        versions = caching.collection_versions(['tickets'])
+        with self.captureOnCommitCallbacks(execute=True):
+            TicketUpdate.objects.create(ticket=self.ticket, user=self.admin, update_text='progress')
+            # Bumped after the commit, so the writer holds no CollectionVersion row lock.
+            self.assertEqual(caching.collection_versions(['tickets']), versions)
+        fresh = self.client.get('/api/tickets/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], first['ETag'])
+        self.assertEqual(fresh.json()['results'][0]['updates'][0]['update_text'], 'progress')
+
+    def test_etags_are_scoped_per_user(self):
+        other = make_user('other')
+        etag = self.client.get('/api/work-updates/')['ETag']
+        self.client.force_authenticate(other)
+        self.assertNotEqual(self.client.get('/api/work-updates/')['ETag'], etag)
+
+
+class MediaServingTests(BaseTestCase):
+    PICTURE = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_ACCEL='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for name, content in (('profile_pics/a.png', self.PICTURE), ('employee_documents/cv.pdf', b'%PDF-private')):
+            os.makedirs(os.path.join(self.media_root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(self.media_root, name), 'wb') as f:
+                f.write(content)
+
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        EmployeeDocument.objects.create(user=self.alice, document_type='CV', file='employee_documents/cv.pdf')
+
+    def fetch(self, path, **headers):
+        response = self.client.get(path, headers=headers)
+        # The test client closes the response (and its file) once the stream is
+        # read, without the request_finished handler that would close the
+        # test transaction's connection.
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_and_range_requests(self):
+        response, body = self.fetch('/media/profile_pics/a.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.PICTURE)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['Cache-Control'].startswith('public, max-age='))
+        etag = response['ETag']
+
+        response, body = self.fetch('/media/profile_pics/a.png', range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.PICTURE[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.PICTURE)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+        response, body = self.fetch('/media/profile_pics/a.png', range='bytes=-5')
+        self.assertEqual(body, self.PICTURE[-5:])
+        response, body = self.fetch('/media/profile_pics/a.png', range='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        # A stale If-Range falls back to the whole file.
+        response, body = self.fetch('/media/profile_pics/a.png', range='bytes=0-1', if_range='"stale"')
+        self.assertEqual((response.status_code, len(body)), (200, len(self.PICTURE)))
+
+        response, _ = self.fetch('/media/profile_pics/a.png', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.fetch('/media/../manage.py')[0].status_code, 404)
+        self.assertEqual(self.fetch('/media/profile_pics/missing.png')[0].status_code, 404)
+
+    def test_documents_follow_document_permissions(self):
+        self.assertEqual(self.fetch('/media/employee_documents/cv.pdf')[0].status_code, 404)
+
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        url = client.get('/api/documents/').data['results'][0]['file']
+        self.assertIn('signature=', url)
+        response, body = self.fetch(url)
+        self.assertEqual((response.status_code, body), (200, b'%PDF-private'))
+        self.assertTrue(response['Cache-Control'].startswith('private'))
+        self.assertEqual(self.fetch(url.replace('signature=', 'signature=x'))[0].status_code, 404)
+
+        owner = Token.objects.create(user=self.alice)
+        other = Token.objects.create(user=self.bob)
+        self.assertEqual(self.fetch('/media/employee_documents/cv.pdf', authorization=f'Token {owner.key}')[0].status_code, 200)
+        self.assertEqual(self.fetch('/media/employee_documents/cv.pdf', authorization=f'Token {other.key}')[0].status_code, 404)
+
+    def test_proxy_handoff(self):
+        with override_settings(MEDIA_ACCEL='x-accel', MEDIA_ACCEL_PREFIX='/protected-media/'):
+            response, body = self.fetch('/media/profile_pics/a.png')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/profile_pics/a.png')
+        self.assertEqual(body, b'')
+        with override_settings(MEDIA_ACCEL='x-sendfile'):
+            response, _ = self.fetch('/media/profile_pics/a.png')
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, 'profile_pics', 'a.png'))
+
+
+class ImageVariantTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.alice = make_user('alice')
+
+    def photo(self, name='photo.jpg', size=(2400, 1600)):
+        image = Image.new('RGB', size, (200, 30, 30))
+        exif = Image.Exif()
+        exif[0x010F] = 'PhoneMaker' # Make
+        exif[0x0112] = 6 # Orientation: rotate 90 degrees clockwise
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_schedules_variants_after_commit(self):
+        profile = self.alice.profile
+        profile.profile_picture = self.photo()
+        profile.save()
+        job = Job.objects.get(name='thumbnails.generate')
+        self.assertEqual(job.payload, {'model': 'api.EmployeeProfile', 'pk': profile.pk, 'field': 'profile_picture'})
+
+        data = EmployeeProfileSerializer(profile).data
+        self.assertIsNotNone(data['profile_picture'])
+        self.assertIsNone(data['profile_picture_thumb'])
+
+        self.assertEqual(jobs.run_next('test').status, Job.SUCCEEDED)
+        profile.refresh_from_db()
+        data = EmployeeProfileSerializer(profile).data
+        self.assertTrue(data['profile_picture_thumb'].endswith('.webp'))
+        self.assertTrue(data['profile_picture_medium_jpeg'].endswith('.jpg'))
+
+        name = thumbnails.variant_name(profile, 'profile_picture', 'medium', 'jpeg')
+        with Image.open(os.path.join(self.media_root, name)) as medium:
+            # Rotated upright, fitted into 480x480, EXIF gone.
+            self.assertEqual(medium.size, (320, 480))
+            self.assertEqual(len(medium.getexif()), 0)
+        with Image.open(os.path.join(self.media_root, thumbnails.variant_name(profile, 'profile_picture', 'thumb'))) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (96, 96)))
+
+        # Saving without touching the picture does not schedule more work.
+        profile.phone_number = '123'
+        profile.save()
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_screenshot_variants_and_stale_sources(self):
+        ticket = Ticket.objects.create(title='T', description='d', created_by=self.alice, month='January', year=2026)
+        update = TicketUpdate.objects.create(ticket=ticket, user=self.alice, update_text='x', screenshot=self.photo('s.jpg'))
+        thumbnails.generate(TicketUpdate, update.pk, 'screenshot')
+        update.refresh_from_db()
+        data = TicketUpdateSerializer(update).data
+        self.assertTrue(data['screenshot_thumb'].endswith('.webp'))
+        old_files = thumbnails.variant_files(update.screenshot_variants)
+
+        update.screenshot = self.photo('t.jpg', size=(50, 40))
+        update.save()
+        self.assertIsNone(TicketUpdateSerializer(update).data['screenshot_large'])
+        thumbnails.generate(TicketUpdate, update.pk, 'screenshot')
+        update.refresh_from_db()
+        self.assertIn('t_large', TicketUpdateSerializer(update).data['screenshot_large'])
+        for name in old_files:
+            self.assertFalse(os.path.exists(os.path.join(self.media_root, name)))
+
+        update.screenshot = SimpleUploadedFile('broken.jpg', b'not an image')
+        update.save()
+        thumbnails.generate(TicketUpdate, update.pk, 'screenshot')
+        update.refresh_from_db()
+        self.assertEqual(update.screenshot_variants, {'source': update.screenshot.name})
+        self.assertIsNone(TicketUpdateSerializer(update).data['screenshot_thumb'])
+
+
+def flaky_job(fail_times):
+    flaky_job.calls += 1
+    if flaky_job.calls <= fail_times:
+        raise RuntimeError('boom')
+    return {'calls': flaky_job.calls}
+
+
+@mock.patch.dict(jobs.HANDLERS, {'test.flaky': 'api.tests.flaky_job'})
+class JobQueueTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        flaky_job.calls = 0
+        self.admin = make_user('admin', role=User.IS_ADMIN, department='Administration')
+        self.alice = make_user('alice')
+
+    def test_priority_order_and_retry_with_backoff(self):
+        low = jobs.enqueue('test.flaky', {'fail_times': 0})
+        high = jobs.enqueue('test.flaky', {'fail_times': 1}, priority=5, max_attempts=2)
+        later = jobs.enqueue('test.flaky', {'fail_times': 0}, priority=9, run_at=timezone.now() + timedelta(hours=1))
+
+        job = jobs.run_next('w1')
+        self.assertEqual((job.pk, job.status, job.attempts), (high.pk, Job.QUEUED, 1))
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=20))
+
+        self.assertEqual(jobs.run_next('w1').pk, low.pk)
+        self.assertIsNone(jobs.run_next('w1')) # high is backing off, later is not due
+
+        Job.objects.filter(pk=high.pk).update(run_at=timezone.now())
+        job = jobs.run_next('w1')
+        self.assertEqual((job.pk, job.status, job.result), (high.pk, Job.SUCCEEDED, {'calls': 3}))
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Job.QUEUED)
+
+        self.assertEqual(jobs.backoff(1), timedelta(seconds=30))
+        self.assertEqual(jobs.backoff(20), timedelta(seconds=3600))
+
+    def test_failed_after_max_attempts_and_stale_jobs_requeued(self):
+        job = jobs.enqueue('test.flaky', {'fail_times': 5}, max_attempts=1)
+        self.assertEqual(jobs.run_next('w1').status, Job.FAILED)
+
+        job = jobs.enqueue('test.flaky', {'fail_times': 0}, max_attempts=2)
+        for attempt, worker in enumerate(('w1', 'w2'), 1):
+            claimed = jobs.claim(worker)
+            self.assertEqual((claimed.pk, claimed.locked_by, claimed.attempts), (job.pk, worker, attempt))
+            self.assertIsNone(jobs.claim('w3'))
+            # The worker dies without recording anything.
+            Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=2))
+            self.assertEqual(jobs.requeue_stale(), (1, 0) if attempt == 1 else (0, 1))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.FAILED, 2, ''))
+        self.assertIsNone(jobs.claim('w3'))
+
+    def test_rollup_rebuild_is_queued_and_reported(self):
+        make_attendance(self.alice, date(2026, 5, 4), utc(2026, 5, 4, 9, 0), utc(2026, 5, 4, 17, 0))
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post('/api/reports/attendance-rollups/', {'start_date': '2026-05-01', 'end_date': '2026-05-31'})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], Job.QUEUED)
+        self.assertFalse(DailyDepartmentAttendance.objects.exists())
+
+        # Between jobs the command closes stale connections, which would include the test transaction's.
+        with mock.patch('api.management.commands.run_workers.close_old_connections'):
+            call_command('run_workers', once=True, stdout=io.StringIO())
+        response = client.get(f"/api/jobs/{response.data['id']}/")
+        self.assertEqual(response.data['status'], Job.SUCCEEDED)
+        self.assertEqual(response.data['result'], {'daily_rows': 1, 'monthly_rows': 1})
+
+        client.force_authenticate(self.alice)
+        self.assertEqual(client.get(f"/api/jobs/{response.data['id']}/").status_code, 404)
+        self.assertEqual(client.post('/api/reports/attendance-rollups/', {}).status_code, 403)
+
+
+class AttendanceExportTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN, department='Administration')
+        self.alice = make_user('alice', employee_id='E1')
+        self.bob = make_user('bob', department='Sales')
+        make_attendance(self.alice, date(2026, 1, 5), utc(2026, 1, 5, 9, 0), utc(2026, 1, 5, 17, 30))
+        make_attendance(self.alice, date(2026, 2, 5), utc(2026, 2, 5, 9, 0))
+        make_attendance(self.bob, date(2026, 1, 6), utc(2026, 1, 6, 9, 0), utc(2026, 1, 6, 10, 0))
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_streams_csv_with_hours_and_filters(self):
+        response = self.client.get('/api/attendance/export/', {'end_date': '2026-01-31', 'department': 'Engineering'})
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][0], 'Employee ID')
+        self.assertEqual(rows[1:], [[
+            'E1', 'alice', '', '', 'Engineering', '2026-01-05',
+            '2026-01-05 09:00:00', '2026-01-05 17:30:00', '8.5', 'Present', 'No',
+        ]])
+
+    def test_streams_a_readable_xlsx_package(self):
+        response = self.client.get('/api/attendance/export/', {'file_format': 'xlsx'})
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 4)
+        self.assertIn('<v>8.5</v>', sheet)
+
+    def test_xlsx_rolls_over_to_new_sheets_at_the_row_limit(self):
+        rows = [[f'E{n}', n] for n in range(5)]
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(exports.stream_xlsx(rows, max_rows=3))))
+        self.assertIsNone(archive.testzip())
+        sheets = [archive.read(f'xl/worksheets/sheet{n}.xml').decode() for n in (1, 2, 3)]
+        # Each sheet starts with the header, then up to two rows.
+        self.assertEqual([sheet.count('<row>') for sheet in sheets], [3, 3, 2])
+        self.assertTrue(all('Employee ID' in sheet for sheet in sheets))
+        self.assertIn('<v>4</v>', sheets[2])
+        workbook = archive.read('xl/workbook.xml').decode()
+        self.assertEqual(workbook.count('<sheet '), 3)
+        self.assertIn('name="Attendance 3"', workbook)
+        self.assertEqual(archive.read('[Content_Types].xml').decode().count('worksheet+xml'), 3)
+
+        empty = zipfile.ZipFile(io.BytesIO(b''.join(exports.stream_xlsx([]))))
+        self.assertEqual(empty.read('xl/worksheets/sheet1.xml').decode().count('<row>'), 1)
+        self.assertNotIn('xl/worksheets/sheet2.xml', empty.namelist())
+
+    def test_rejects_unknown_format_and_non_admins(self):
+        self.assertEqual(self.client.get('/api/attendance/export/', {'file_format': 'pdf'}).status_code, 400)
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get('/api/attendance/export/').status_code, 403)
+
+    def test_post_builds_the_export_in_a_job(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root, MEDIA_ACCEL=''):
+            response = self.client.post(
+                '/api/attendance/export/', {'end_date': '2026-01-31', 'department': 'Engineering'}, format='json',
+            )
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual((response.data['name'], response.data['download_url']), ('exports.attendance', None))
+
+            job = jobs.run_next('w1')
+            self.assertEqual(job.status, Job.SUCCEEDED)
+            url = self.client.get(f"/api/jobs/{job.pk}/").data['download_url']
+            self.assertIn('/media/attendance_exports/attendance_2026-01-31.csv?signature=', url)
+
+            download = self.client.get(url)
+            rows = list(csv.reader(io.StringIO(b''.join(download.streaming_content).decode())))
+            self.assertEqual([row[0] for row in rows], ['Employee ID', 'E1'])
+            # Private: no link without the signature.
+            self.assertEqual(self.client.get(url.split('?')[0]).status_code, 404)
+
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.post('/api/attendance/export/').status_code, 403)
+
+    def test_management_command_uses_the_endpoint_filters(self):
+        output = io.StringIO()
+        with mock.patch('sys.stdout', output):
+            call_command('export_attendance', end_date='2026-01-31', department='Engineering')
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual([row[0] for row in rows[1:]], ['E1'])
+
+        with self.assertRaisesMessage(CommandError, 'Invalid start_date'):
+            call_command('export_attendance', start_date='2026-02-30')
+
+
+class AsgiStreamingTests(BaseTransactionTestCase):
+    """Streaming responses served by the ASGI handler go out while they are produced."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN, department='Administration')
+        self.token = Token.objects.create(user=self.admin)
+
+    def test_export_sends_rows_as_they_are_read(self):
+        alice = make_user('alice')
+        for day in range(1, 21):
+            make_attendance(alice, date(2026, 1, day), utc(2026, 1, day, 9, 0), utc(2026, 1, day, 17, 0))
+        log = []
+        read_rows = exports.attendance_export_rows
+
+        def logged_rows(*args, **kwargs):
+            for row in read_rows(*args, **kwargs):
+                log.append('row')
+                yield row
+
+        with mock.patch('api.views.attendance_export_rows', logged_rows), mock.patch('api.streaming.BATCH_BYTES', 1):
+            status, body = asgi_get('/api/attendance/export/', log, {'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(list(csv.reader(io.StringIO(body.decode())))), 21)
+        # Not buffered: something was sent before the last row was read.
+        self.assertEqual(log.count('row'), 20)
+        self.assertLess(log.index('sent'), len(log) - 1 - log[::-1].index('row'))
+
+    def test_media_download_is_read_in_chunks(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        content = bytes(range(256)) * 48
+        os.makedirs(os.path.join(media_root, 'profile_pics'))
+        with open(os.path.join(media_root, 'profile_pics', 'big.png'), 'wb') as f:
+            f.write(content)
+        log = []
+        read = media._FileRange.read
+
+        def logged_read(file, size=-1):
+            log.append('read')
+            return read(file, size)
+
+        with override_settings(MEDIA_ROOT=media_root, MEDIA_ACCEL=''), \
+                mock.patch.object(media._FileRange, 'read', logged_read), mock.patch('api.streaming.BATCH_BYTES', 1):
+            status, body = asgi_get('/media/profile_pics/big.png', log, {'Range': 'bytes=4096-'})
+        self.assertEqual(status, 206)
+        self.assertEqual(body, content[4096:])
+        self.assertLess(log.index('sent'), len(log) - 1 - log[::-1].index('read'))
+
+
+class AttendanceRollupTests(BaseTestCase):
+    OFFICE = {'latitude': 13.0360406, 'longitude': 80.2181952}
+
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN, department='Administration')
+        self.alice = make_user('alice')
+        self.bob = make_user('bob', department='Sales')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def snapshot(self):
+        counters = list(rollups.COUNTERS)
+        return (
+            sorted(DailyDepartmentAttendance.objects.values_list('date', 'department', *counters)),
+            sorted(MonthlyUserAttendance.objects.values_list('month', 'user_id', *counters)),
+        )
+
+    def test_incremental_updates_match_a_rebuild(self):
+        make_attendance(self.alice, date(2026, 3, 2), utc(2026, 3, 2, 9, 0), utc(2026, 3, 2, 17, 0))
+        rollups.rebuild(date(2026, 3, 2), date(2026, 3, 2))
+        punches = [
+            {'user_id': self.alice.id, 'timestamp': utc(2026, 3, 3, 10, 0).isoformat(), **self.OFFICE},
+            {'user_id': self.bob.id, 'timestamp': utc(2026, 3, 3, 9, 0).isoformat(), **self.OFFICE},
+            {'user_id': self.bob.id, 'timestamp': utc(2026, 3, 3, 17, 45).isoformat(), **self.OFFICE},
+        ]
+        self.client.post('/api/attendance/batch/', punches, format='json')
+        self.client.post('/api/attendance/batch/', [
+            {'user_id': self.alice.id, 'timestamp': utc(2026, 3, 3, 18, 0).isoformat(), **self.OFFICE},
+        ], format='json')
+        self.client.post('/api/attendance/mark/', {'user_id': self.alice.id, **self.OFFICE})
+        self.client.post('/api/attendance/mark/', {'user_id': self.alice.id, **self.OFFICE})
+
+        incremental = self.snapshot()
+        daily = {(row[0], row[1]): row[2:] for row in incremental[0]}
+        # present, absent, half_day, minutes_worked, late_arrivals
+        self.assertEqual(daily[(date(2026, 3, 3), 'Engineering')], (1, 0, 0, 480, 1))
+        self.assertEqual(daily[(date(2026, 3, 3), 'Sales')], (1, 0, 0, 525, 0))
+
+        today = date.today()
+        rollups.rebuild(min(date(2026, 3, 1), today), max(date(2026, 3, 31), today))
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_racing_check_outs_count_once(self):
+        today = timezone.now().date()
+        make_attendance(self.alice, today, timezone.now() - timedelta(hours=2))
+        rollups.rebuild(today, today)
+        # What a second check-out read before the first one committed.
+        stale = Attendance.objects.get(user=self.alice, date=today)
+
+        record_check_in(self.alice)
+        after_first = self.snapshot()
+        self.assertEqual(MonthlyUserAttendance.objects.get(user=self.alice).minutes_worked, 120)
+        with mock.patch.object(Attendance.objects, 'get_or_create', return_value=(stale, False)):
+            _, message = record_check_in(self.alice)
+        self.assertEqual(message, 'Already checked out for today.')
+        self.assertEqual(self.snapshot(), after_first)
+
+    def test_rollup_endpoint_filters(self):
+        make_attendance(self.alice, date(2026, 3, 2), utc(2026, 3, 2, 9, 0), utc(2026, 3, 2, 17, 0))
+        make_attendance(self.bob, date(2026, 4, 2), utc(2026, 4, 2, 9, 0))
+        rollups.rebuild(date(2026, 3, 1), date(2026, 4, 30))
+
+        response = self.client.get('/api/reports/attendance-rollups/', {'department': 'Sales'})
+        self.assertEqual([row['department'] for row in response.data['daily']], ['Sales'])
+        self.assertEqual([row['user__username'] for row in response.data['monthly']], ['bob'])
+
+        response = self.client.get('/api/reports/attendance-rollups/', {'end_date': '2026-03-31'})
+        self.assertEqual([row['minutes_worked'] for row in response.data['monthly']], [480])
+
+
+class SyntheticDataTests(BaseTestCase):
+    def rows(self, prefix):
+        return list(
+            Attendance.objects.filter(user__username__startswith=prefix)
+            .order_by('user__username', 'date').values_list('status', 'check_in_time', 'check_out_time')
+        )
+
+    def test_generated_rollups_match_a_rebuild(self):
+        generator = synthetic.Generator(employees=5, days=20, seed=1)
+        users = generator.run()
+
+        workdays = len(list(synthetic.workdays(generator.start, generator.end)))
+        self.assertEqual(len(users), 5)
+        self.assertEqual(Attendance.objects.count(), 5 * workdays)
+        self.assertEqual(WorkUpdate.objects.count(), 5 * 2 * 2)
+        self.assertEqual(Ticket.objects.count(), 15)
+        self.assertEqual(TicketUpdate.objects.count(), 30)
+        self.assertTrue(all(user.check_password(synthetic.DEFAULT_PASSWORD) for user in users[:1]))
+
+        counters = list(rollups.COUNTERS)
+        generated = sorted(MonthlyUserAttendance.objects.values_list('month', 'user_id', *counters))
+        generated_daily = sorted(DailyDepartmentAttendance.objects.values_list('date', 'department', *counters))
+        rollups.rebuild(generator.start, generator.end)
+        self.assertEqual(sorted(MonthlyUserAttendance.objects.values_list('month', 'user_id', *counters)), generated)
+        self.assertEqual(
+            sorted(DailyDepartmentAttendance.objects.values_list('date', 'department', *counters)), generated_daily,
+        )
+
+    def test_same_seed_same_dataset(self):
+        synthetic.Generator(employees=3, days=10, seed=7, prefix='a').run()
+        synthetic.Generator(employees=3, days=10, seed=7, prefix='b').run()
+        synthetic.Generator(employees=3, days=10, seed=8, prefix='c').run()
+        self.assertEqual(self.rows('a'), self.rows('b'))
+        self.assertNotEqual(self.rows('a'), self.rows('c'))
+
+    def test_seed_data_keeps_existing_attendance(self):
+        alice = make_user('alice')
+        today = timezone.localdate()
+        existing = make_attendance(alice, today, status='Absent')
+
+        call_command('seed_data', stdout=io.StringIO())
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.status, 'Absent')
+        days = len(list(synthetic.workdays(today - timedelta(days=29), today)))
+        self.assertEqual(alice.attendance_records.count(), days if today.weekday() < 5 else days + 1)
+        self.assertEqual(alice.assigned_tickets.count(), 3)
+
+
+class EndpointBenchmarkTests(BaseTestCase):
+    def test_every_route_runs(self):
+        admin = make_user('admin', role=User.IS_ADMIN)
+        synthetic.Generator(employees=3, days=7, seed=1).run()
+        employee = User.objects.filter(role=User.IS_EMPLOYEE).order_by('pk').first()
+        tokens = {
+            'admin': Token.objects.create(user=admin).key,
+            'employee': Token.objects.create(user=employee).key,
+        }
+
+        scenarios = benchmarks.scenarios(page_size=10)
+        self.assertIn('tickets-list', [scenario.label for scenario in scenarios])
+        results = [benchmarks.run(scenario, tokens, employee, requests=2, warmup=0) for scenario in scenarios]
+        measured = [row for row in results if 'skipped' not in row]
+        self.assertTrue(all(row['status'] == 200 for row in measured), measured)
+        self.assertEqual(
+            {row['endpoint'] for row in results if 'skipped' in row},
+            {'login', 'attendance_batch', 'employee-bulk-import', 'employee-update-profile', 'document-detail', 'jobs-detail', 'events'},
+        )
+        tickets = next(row for row in measured if row['endpoint'] == 'tickets-list')
+        self.assertGreater(tickets['queries'], 0)
+        self.assertGreater(tickets['bytes'], 0)
+        self.assertLessEqual(tickets['p50_ms'], tickets['p99_ms'])
+
+    def test_compare_reports_regressions(self):
+        row = {'scale': 100, 'method': 'GET', 'endpoint': 'tickets-list', 'p95_ms': 10.0, 'queries': 2, 'bytes': 1000}
+        self.assertEqual(benchmarks.compare([row], [dict(row, p95_ms=11.0)], threshold=0.25), [])
+        self.assertEqual(
+            benchmarks.compare([row], [dict(row, p95_ms=20.0, queries=3)], threshold=0.25),
+            ['GET tickets-list @ 100: p95 10.0 -> 20.0 ms', 'GET tickets-list @ 100: queries 2 -> 3'],
+        )
+
+
+class RequestMetricsTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_server_timing_and_histograms(self):
+        Ticket.objects.create(title='t', description='d', created_by=self.admin, month='March', year=2026)
+        response = self.client.get('/api/tickets/')
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('render;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+        merged = metrics.collect()
+        counts, _ = merged[('http_request_duration_seconds', ('tickets-list', 'GET', '200'))]
+        self.assertEqual(sum(counts), 1)
+        self.assertIn(('http_request_queries', ('tickets-list', 'GET')), merged)
+
+    def test_serialize_and_render_are_timed_on_conditional_lists(self):
+        # The conditional GET mixin renders inside the view, before the middleware's render hook.
+        Ticket.objects.create(title='t', description='d', created_by=self.admin, month='March', year=2026)
+        serialize, render = TicketSerializer.to_representation, JSONRenderer.render
+
+        def slow(method):
+            def wrapper(*args, **kwargs):
+                time.sleep(0.05)
+                return method(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(TicketSerializer, 'to_representation', slow(serialize)), \
+                mock.patch.object(JSONRenderer, 'render', slow(render)):
+            self.client.get('/api/tickets/')
+        merged = metrics.collect()
+        for name in ('http_request_serialize_seconds', 'http_request_render_seconds'):
+            _, total = merged[(name, ('tickets-list', 'GET'))]
+            self.assertGreaterEqual(total, 0.05, name)
+
+    async def test_async_views_are_measured(self):
+        alice = await User.objects.acreate(username='alice', role=User.IS_EMPLOYEE)
+        response = await self.async_client.get('/api/attendance/async/mark/', {'user_id': alice.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/tickets/')
+        with override_settings(METRICS_TOKEN='', DEBUG=False):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with override_settings(METRICS_TOKEN='s3cret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_count{route="tickets-list",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_queries_bucket{route="tickets-list",method="GET",le="+Inf"} 1', body)
+
+    def test_processes_share_metrics_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        other = [['http_request_queries', ['tickets-list', 'GET'], [0, 0, 2, 0, 0, 0, 0, 0, 0, 0], 4]]
+        with open(os.path.join(directory, 'metrics-1-1.json'), 'w') as file:
+            json.dump(other, file)
+
+        with override_settings(METRICS_DIR=directory):
+            self.client.get('/api/tickets/')
+            metrics.flush(force=True)
+            counts, total = metrics.collect()[('http_request_queries', ('tickets-list', 'GET'))]
+        self.assertEqual(sum(counts), 3)
+        self.assertEqual(len(os.listdir(directory)), 2)
+
+    def test_slow_requests_are_logged(self):
+        with override_settings(SLOW_REQUEST_MS=0.001), self.assertLogs('api.metrics', 'WARNING') as logs:
+            self.client.get('/api/tickets/')
+        self.assertIn('Slow request GET /api/tickets/ (tickets-list) -> 200', logs.output[0])
+
+
+class SearchTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def ticket(self, title, description='', **extra):
+        return Ticket.objects.create(
+            title=title, description=description, created_by=self.admin, month='March', year=2026, **extra
+        )
+
+    def test_ranks_and_highlights_matches(self):
+        in_body = self.ticket('Printer jam', 'The invoice printer jams after the <b>invoice</b> run')
+        in_title = self.ticket('Invoice totals wrong', 'Rounding error on the summary page')
+        self.ticket('Unrelated', 'Nothing to see')
+
+        response = self.client.get('/api/search/', {'q': 'invoices'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        # Title matches weigh more than body matches; "invoices" is stemmed to match "invoice".
+        self.assertEqual([row['id'] for row in results], [in_title.id, in_body.id])
+        self.assertEqual(results[0]['title'], '<mark>Invoice</mark> totals wrong')
+        # Angle brackets survive, escaped, on both databases (where the snippet ends may differ).
+        self.assertIn('&lt;b&gt;<mark>invoice</mark>', results[1]['snippet'])
+        self.assertEqual(results[0]['type'], 'ticket')
+
+    def test_index_follows_saves_and_deletes(self):
+        ticket = self.ticket('Laptop', 'Battery drains quickly')
+        update = TicketUpdate.objects.create(ticket=ticket, user=self.admin, update_text='Ordered a replacement battery')
+        self.assertEqual(
+            {(row['type'], row['id']) for row in search.search('battery', self.admin)},
+            {('ticket', ticket.id), ('ticket_update', update.id)},
+        )
+
+        ticket.description = 'Screen flickers'
+        ticket.save()
+        update.delete()
+        self.assertEqual(search.search('battery', self.admin), [])
+        self.assertEqual([row['id'] for row in search.search('flickers', self.admin)], [ticket.id])
+
+    def test_employees_only_find_their_own_work_updates(self):
+        mine = WorkUpdate.objects.create(user=self.alice, project_name='Billing', description='Migrated the ledger')
+        WorkUpdate.objects.create(user=self.bob, project_name='Billing', description='Reviewed the ledger')
+
+        self.client.force_authenticate(self.alice)
+        results = self.client.get('/api/search/', {'q': 'ledger'}).json()['results']
+        self.assertEqual([(row['type'], row['id'], row['user']) for row in results], [('work_update', mine.id, 'alice')])
+
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(len(self.client.get('/api/search/', {'q': 'ledger'}).json()['results']), 2)
+
+    def test_type_filter_and_pagination(self):
+        for number in range(3):
+            self.ticket(f'Network outage {number}')
+        WorkUpdate.objects.create(user=self.alice, project_name='Network', description='Cabling')
+
+        response = self.client.get('/api/search/', {'q': 'network', 'type': 'tickets', 'page_size': 2})
+        data = response.json()
+        self.assertEqual([row['type'] for row in data['results']], ['ticket', 'ticket'])
+        self.assertIn('page=2', data['next'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
+
+    def test_rejects_bad_queries(self):
+        self.assertEqual(self.client.get('/api/search/', {'q': '  ?! '}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'type': 'emails'}).status_code, 400)
+
+
+class TicketBoardTests(BaseTestCase):
+    # Collection version (ETag), counts per status, windowed cards.
+    BOARD_QUERIES = 3
+
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.alice = make_user('alice', first_name='Alice', last_name='A')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_tickets(self, status, count, month='March', year=2026, **extra):
+        return [
+            Ticket.objects.create(
+                title=f'{status} {i}', description='d', status=status, created_by=self.admin,
+                month=month, year=year, **extra,
+            )
+            for i in range(count)
+        ]
+
+    def column(self, data, status):
+        return next(column for column in data['columns'] if column['status'] == status)
+
+    def test_columns_with_counts_and_first_cards(self):
+        opened = self.create_tickets('Open', 3, assignee=self.alice)
+        self.create_tickets('Review', 1)
+        self.create_tickets('Open', 2, month='April')
+        TicketUpdate.objects.create(ticket=opened[0], user=self.alice, update_text='u')
+
+        with self.assertNumQueries(self.BOARD_QUERIES):
+            response = self.client.get('/api/tickets/board/', {'month': 'March', 'year': 2026, 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([column['status'] for column in data['columns']], ['Open', 'In_Progress', 'Review', 'Completed'])
+
+        column = self.column(data, 'Open')
+        self.assertEqual(column['count'], 3)
+        self.assertEqual([card['id'] for card in column['tickets']], [opened[2].id, opened[1].id])
+        self.assertEqual(column['tickets'][0]['assignee_name'], 'Alice A')
+        self.assertNotIn('updates', column['tickets'][0])
+        self.assertNotIn('description', column['tickets'][0])
+        self.assertIsNotNone(column['next'])
+        self.assertEqual(self.column(data, 'Review')['count'], 1)
+        self.assertIsNone(self.column(data, 'Review')['next'])
+        self.assertEqual(self.column(data, 'Completed'), {
+            'status': 'Completed', 'label': 'Completed', 'count': 0, 'tickets': [], 'next': None,
+        })
+
+        more = self.client.get(column['next']).json()
+        self.assertEqual([c['status'] for c in more['columns']], ['Open'])
+        column = more['columns'][0]
+        self.assertEqual(column['count'], 3)
+        self.assertEqual([card['id'] for card in column['tickets']], [opened[0].id])
+        self.assertIsNone(column['next'])
+
+    def test_assignee_filter(self):
+        mine = self.create_tickets('Open', 1, assignee=self.alice)
+        pool = self.create_tickets('Open', 1)
+
+        params = {'month': 'March', 'year': 2026}
+        data = self.client.get('/api/tickets/board/', {**params, 'assignee': self.alice.id}).json()
+        self.assertEqual([card['id'] for card in self.column(data, 'Open')['tickets']], [mine[0].id])
+        data = self.client.get('/api/tickets/board/', {**params, 'assignee': 'none'}).json()
+        self.assertEqual([card['id'] for card in self.column(data, 'Open')['tickets']], [pool[0].id])
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'year': 'soon'}, {'status': 'Done'}, {'assignee': 'bob'}):
+            self.assertEqual(self.client.get('/api/tickets/board/', params).status_code, 400)
+
+
+class DeltaSyncTests(BaseTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def sync(self, cursor, **params):
+        response = self.client.get('/api/changes/', {'cursor': cursor, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def start(self):
+        return self.client.get('/api/changes/').json()['cursor']
+
+    def test_upserts_and_deletes_since_cursor(self):
+        stale = WorkUpdate.objects.create(user=self.alice, project_name='Old', description='d')
+        cursor = self.start()
+
+        ticket = Ticket.objects.create(title='New', description='d', created_by=self.admin, month='March', year=2026)
+        ticket.status = 'Review'
+        ticket.save()
+        update = TicketUpdate.objects.create(ticket=ticket, user=self.alice, update_text='On it')
+        stale_id = stale.id
+        stale.delete()
+
+        data = self.sync(cursor)
+        changed = data['changes']
+        self.assertEqual(set(changed), {'tickets', 'ticket_updates', 'work_updates'})
+        [row] = changed['tickets']['upserted']
+        self.assertEqual((row['id'], row['status']), (ticket.id, 'Review'))
+        self.assertNotIn('updates', row)
+        self.assertEqual([row['id'] for row in changed['ticket_updates']['upserted']], [update.id])
+        self.assertEqual(changed['work_updates'], {'upserted': [], 'deleted': [stale_id]})
+        self.assertFalse(data['more'])
+
+        self.assertEqual(self.sync(data['cursor'])['changes'], {})
+
+    def test_bulk_writes_and_profiles_are_logged(self):
+        cursor = self.start()
+        Attendance.objects.bulk_create([Attendance(user=self.alice, date=date(2026, 3, day)) for day in (2, 3)])
+        EmployeeProfile.objects.filter(user=self.bob).update(department='Sales')
+
+        changed = self.sync(cursor)['changes']
+        self.assertEqual(len(changed['attendance']['upserted']), 2)
+        [bob] = changed['employees']['upserted']
+        self.assertEqual((bob['id'], bob['profile']['department']), (self.bob.id, 'Sales'))
+
+    def test_employees_only_receive_their_own_rows(self):
+        self.client.force_authenticate(self.alice)
+        cursor = self.start()
+        mine = make_attendance(self.alice, date(2026, 3, 2))
+        gone = WorkUpdate.objects.create(user=self.alice, project_name='Mine', description='d')
+        gone_id = gone.id
+        gone.delete()
+        theirs = make_attendance(self.bob, date(2026, 3, 2))
+        WorkUpdate.objects.create(user=self.bob, project_name='Theirs', description='d').delete()
+        theirs.delete()
+
+        data = self.sync(cursor)
+        changed = data['changes']
+        self.assertEqual(set(changed), {'attendance', 'work_updates'})
+        self.assertEqual([row['id'] for row in changed['attendance']['upserted']], [mine.id])
+        # Only her own deletion; nothing of Bob's, not even as a deleted id.
+        self.assertEqual(changed['attendance']['deleted'], [])
+        self.assertEqual(changed['work_updates'], {'upserted': [], 'deleted': [gone_id]})
+
+        # The cursor has moved past Bob's entries as well.
+        make_attendance(self.bob, date(2026, 3, 3))
+        self.assertEqual(self.sync(data['cursor'])['changes'], {})
+
+        # Bob's view of the log is his own.
+        self.client.force_authenticate(self.bob)
+        self.assertEqual(self.client.get('/api/changes/', {'cursor': data['cursor']}).status_code, 410)
+
+    def test_role_change_expires_the_cursor(self):
+        self.client.force_authenticate(self.alice)
+        cursor = self.start()
+        User.objects.filter(pk=self.alice.pk).update(role=User.IS_ADMIN)
+        self.alice.refresh_from_db()
+
+        response = self.client.get('/api/changes/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 410)
+        make_attendance(self.bob, date(2026, 3, 2))
+        changed = self.sync(response.json()['cursor'], collections='attendance')['changes']
+        self.assertEqual(len(changed['attendance']['upserted']), 1)
+
+    def test_limit_pages_through_the_log(self):
+        cursor = self.start()
+        for day in range(1, 6):
+            make_attendance(self.alice, date(2026, 3, day))
+
+        seen = []
+        while True:
+            data = self.sync(cursor, limit=2, collections='attendance')
+            seen += [row['id'] for row in data['changes'].get('attendance', {}).get('upserted', [])]
+            cursor = data['cursor']
+            if not data['more']:
+                break
+        self.assertEqual(len(seen), 5)
+
+    def test_cursor_from_before_a_reset_expires(self):
+        cursor = self.start()
+        make_attendance(self.alice, date(2026, 3, 2))
+        changes.reset()
+
+        response = self.client.get('/api/changes/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.sync(response.json()['cursor'])['changes'], {})
+
+    @skipUnless(connection.vendor == 'postgresql', 'needs concurrent writers')
+    def test_open_transaction_holds_back_later_commits(self):
+        cursor = self.start()
+        opened, release = threading.Event(), threading.Event()
+        early = {}
+
+        def slow_writer():
+            try:
+                with transaction.atomic():
+                    early['id'] = make_attendance(self.alice, date(2026, 3, 2)).id
+                    opened.set()
+                    release.wait(10)
+            finally:
+                connections.close_all()
+
+        writer = threading.Thread(target=slow_writer)
+        writer.start()
+        try:
+            self.assertTrue(opened.wait(10))
+            # Committed after the writer's transaction started, so its change sorts after it.
+            late = make_attendance(self.bob, date(2026, 3, 2))
+            data = self.sync(cursor, collections='attendance')
+            self.assertEqual(data['changes'], {})
+        finally:
+            release.set()
+            writer.join()
+
+        changed = self.sync(data['cursor'], collections='attendance')['changes']
+        self.assertEqual(sorted(row['id'] for row in changed['attendance']['upserted']), sorted([early['id'], late.id]))
+        self.assertEqual(self.client.get('/api/changes/', {'cursor': 'nope'}).status_code, 400)
+
+
+class EventStreamTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.addCleanup(events._subscribers.clear)
+        # Subscribing on Postgres starts the LISTEN thread.
+        self.addCleanup(events.stop_listener)
+
+    def test_writes_publish_events_on_commit(self):
+        with mock.patch.object(events, '_send') as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                ticket = Ticket.objects.create(title='t', description='d', created_by=self.admin, month='March', year=2026)
+                make_attendance(self.alice, date(2026, 3, 2))
+                self.assertFalse(send.called)
+        self.assertEqual(send.call_args_list[0].args[0], ({
+            'type': 'ticket', 'action': 'created', 'id': ticket.id, 'status': 'Open', 'assignee_id': None,
+        },))
+        [attendance] = send.call_args_list[1].args[0]
+        self.assertEqual((attendance['type'], attendance['user_id'], attendance['date']), ('attendance', self.alice.id, '2026-03-02'))
+
+    async def test_events_are_scoped_by_role(self):
+        admin, alice, bob = events.subscribe(self.admin), events.subscribe(self.alice), events.subscribe(self.bob)
+        try:
+            events.dispatch({'type': 'attendance', 'action': 'created', 'id': 1, 'user_id': self.alice.id})
+            events.dispatch({'type': 'ticket', 'action': 'updated', 'id': 2})
+
+            self.assertEqual([(await admin.next(1))['id'], (await admin.next(1))['id']], [1, 2])
+            self.assertEqual([(await alice.next(1))['id'], (await alice.next(1))['id']], [1, 2])
+            self.assertEqual((await bob.next(1))['id'], 2)
+            self.assertIsNone(await bob.next(0.01))
+        finally:
+            for subscriber in (admin, alice, bob):
+                events.unsubscribe(subscriber)
+
+    async def test_slow_subscribers_are_told_to_resync(self):
+        subscriber = events.subscribe(self.admin)
+        try:
+            for pk in range(events.QUEUE_SIZE + 1):
+                events.dispatch({'type': 'ticket', 'action': 'updated', 'id': pk})
+            await asyncio.sleep(0)
+            self.assertEqual(await subscriber.next(1), {'type': 'resync'})
+            self.assertIsNone(await subscriber.next(0.01))
+        finally:
+            events.unsubscribe(subscriber)
+
+    async def test_stream(self):
+        token = await Token.objects.acreate(user=self.alice)
+        response = await self.async_client.get('/api/events/', {'token': token.key})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertIn(b': connected', await anext(stream))
+
+        events.dispatch({'type': 'ticket', 'action': 'created', 'id': 5})
+        chunk = await anext(stream)
+        self.assertTrue(chunk.startswith(b'event: ticket\ndata: '))
+        self.assertEqual(json.loads(chunk.split(b'data: ')[1])['id'], 5)
+
+    async def test_closed_stream_unsubscribes(self):
+        subscriber = events.subscribe(self.alice)
+        stream = async_views.stream_events(subscriber)
+        await anext(stream)
+        await stream.aclose()
+        self.assertNotIn(subscriber, events._subscribers)
+
+    async def test_stream_needs_a_token_and_asgi(self):
+        self.assertEqual((await self.async_client.get('/api/events/')).status_code, 401)
+        self.assertEqual((await self.async_client.get('/api/events/', {'token': 'nope'})).status_code, 401)
+        response = await sync_to_async(self.client.get)('/api/events/')
+        self.assertEqual(response.status_code, 501)
+
+
+class EventDeliveryTests(BaseTransactionTestCase):
+    """Committed writes reaching subscribers; on Postgres through NOTIFY and the LISTEN thread."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', role=User.IS_ADMIN)
+        self.alice = make_user('alice')
+        self.addCleanup(events._subscribers.clear)
+        self.addCleanup(events.stop_listener)
+
+    def write(self):
+        with transaction.atomic():
+            ticket = Ticket.objects.create(title='t', description='d', created_by=self.admin, month='March', year=2026)
+            Attendance.objects.bulk_create([Attendance(user=self.alice, date=date(2026, 3, day)) for day in (2, 3)])
+            events.publish(*[events.event_for(row, 'created') for row in Attendance.objects.filter(user=self.alice)])
+        return ticket
+
+    async def test_committed_writes_reach_subscribers(self):
+        admin, alice = events.subscribe(self.admin), events.subscribe(self.alice)
+        if connection.vendor == 'postgresql':
+            self.assertTrue(await sync_to_async(events._listening.wait)(5))
+
+        ticket = await sync_to_async(self.write)()
+        received = [await admin.next(5) for _ in range(3)]
+        self.assertEqual((received[0]['type'], received[0]['id']), ('ticket', ticket.id))
+        self.assertEqual([(event['type'], event['date']) for event in received[1:]], [('attendance', '2026-03-02'), ('attendance', '2026-03-03')])
+        self.assertIsNone(await admin.next(0.2))
+        self.assertEqual((await alice.next(5))['type'], 'ticket')
+
+    @skipUnless(connection.vendor == 'postgresql', 'only Postgres runs a LISTEN thread')
+    async def test_stop_listener_closes_its_connection(self):
+        events.subscribe(self.admin)
+        self.assertTrue(await sync_to_async(events._listening.wait)(5))
+        await sync_to_async(events.stop_listener)()
+        self.assertFalse(events._listening.is_set())
+        self.assertIsNone(events._listener)
+
+
+class AttendancePartitionTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = make_user('alice')
+        for day in (date(2026, 1, 30), date(2026, 2, 2), date(2026, 2, 27), date(2026, 3, 2)):
+            make_attendance(self.alice, day)
+        self.client = APIClient()
+
+    def test_history_takes_a_date_range(self):
+        response = self.client.get(
+            '/api/attendance/mark/', {'user_id': self.alice.id, 'start_date': '2026-02-01', 'end_date': '2026-02-28'},
+        )
+        self.assertEqual([row['date'] for row in response.json()['results']], ['2026-02-27', '2026-02-02'])
+        self.assertEqual(len(self.client.get('/api/attendance/mark/', {'user_id': self.alice.id}).json()['results']), 4)
+        response = self.client.get('/api/attendance/mark/', {'user_id': self.alice.id, 'start_date': 'feb'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_async_history_takes_the_same_range(self):
+        url = '/api/attendance/async/mark/'
+        params = {'user_id': self.alice.id, 'start_date': '2026-02-01', 'end_date': '2026-02-28'}
+        response = await self.async_client.get(url, params)
+        self.assertEqual([row['date'] for row in response.json()['results']], ['2026-02-27', '2026-02-02'])
+        response = await self.async_client.get(url, {**params, 'page_size': 1})
+        self.assertEqual([row['date'] for row in response.json()['results']], ['2026-02-27'])
+        response = await self.async_client.get(url, {'user_id': self.alice.id, 'end_date': '2026-02-30'})
+        self.assertEqual(response.status_code, 400)
+
+    @skipUnless(connection.vendor == 'postgresql', 'attendance is only partitioned on PostgreSQL')
+    def test_new_partitions_take_over_rows_from_the_default(self):
+        self.assertTrue(partitions.is_partitioned(connection))
+        stray = make_attendance(self.alice, date(2031, 1, 5))
+        created = partitions.ensure_partitions(connection, months_ahead=1, today=date(2031, 1, 20))
+        self.assertEqual(created, [('api_attendance_2031_01', 1), ('api_attendance_2031_02', 0)])
+        self.assertEqual(partitions.ensure_partitions(connection, months_ahead=1, today=date(2031, 1, 20)), [])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM api_attendance WHERE id = %s', [stray.id])
+            self.assertEqual(cursor.fetchone()[0], 'api_attendance_2031_01')
+
+    @skipIf(connection.vendor == 'postgresql', 'attendance is partitioned on PostgreSQL')
+    def test_command_leaves_other_databases_alone(self):
+        output = io.StringIO()
+        call_command('create_attendance_partitions', stdout=output)
+        self.assertIn('nothing to do', output.getvalue())
@@ -0,0 +1,52 @@
+"""
+Login throttles, checked by DRF before AuthView.post calls authenticate().
+
+Each password check costs a full PBKDF2 hash, so unthrottled credential
+stuffing (or a few hundred people re-logging at shift start) can saturate
+the CPU. Two sliding windows bound that work: one per username, which stops
+guessing against a single account from many addresses, and a looser one per
+client IP, which stops one address from walking through many accounts. The
+IP limit has to stay high enough for an office behind a single NAT address.
+
+DRF's SimpleRateThrottle keeps the timestamps of the attempts in the window
+in the `throttle` cache, so the window slides instead of resetting on a
+clock boundary. With the default in-process cache every worker counts on its
+own; point THROTTLE_CACHE_DIR at a directory the workers share to enforce the
+limits per host.
+"""
+import hashlib
+
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginThrottle(SimpleRateThrottle):
+    cache = caches['throttle']
+
+    def get_cache_key(self, request, view):
+        ident = self.get_login_ident(request)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def get_login_ident(self, request):
+        raise NotImplementedError
+
+
+class LoginUsernameThrottle(LoginThrottle):
+    scope = 'login_username'
+
+    def get_login_ident(self, request):
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username.strip():
+            return None
+        # Hashed so any username makes a valid cache key.
+        return hashlib.sha256(username.strip().lower().encode()).hexdigest()
+
+
+class LoginIPThrottle(LoginThrottle):
+    scope = 'login_ip'
+
+    def get_login_ident(self, request):
+        # REMOTE_ADDR, or X-Forwarded-For when REST_FRAMEWORK['NUM_PROXIES'] is set.
+        return self.get_ident(request)
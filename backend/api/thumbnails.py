@@ -0,0 +1,157 @@
+"""
+Fixed-size WebP/JPEG variants of uploaded images.
+
+Saving a model with a new image enqueues a background job (see api/signals.py
+and api/jobs.py), so the upload request never decodes the image.
+Variants are written next to the original under `<upload dir>/variants/` and
+recorded in the model's `<field>_variants` JSON column together with the
+source file name. A variant whose source no longer matches the field is
+treated as missing, so serializers fall back to None rather than serving a
+stale thumbnail.
+"""
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from . import jobs
+from .caching import bump_collections
+from .models import EmployeeProfile, TicketUpdate
+
+logger = logging.getLogger(__name__)
+
+# field -> variant -> (max width, max height, crop to exactly that size)
+VARIANTS = {
+    'profile_picture': {'thumb': (96, 96, True), 'medium': (480, 480, False)},
+    'screenshot': {'thumb': (320, 320, False), 'large': (1280, 1280, False)},
+}
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+IMAGE_FIELDS = {
+    EmployeeProfile: 'profile_picture',
+    TicketUpdate: 'screenshot',
+}
+# Cached API collections to refresh once a model's variants exist (see api/caching.py).
+MODEL_COLLECTIONS = {
+    EmployeeProfile: ('employees',),
+    TicketUpdate: ('tickets',),
+}
+
+
+def variants_column(field):
+    return f'{field}_variants'
+
+
+def variant_name(instance, field, variant, fmt='webp'):
+    """Storage name of a generated variant, or None if it is not (yet) available."""
+    source = getattr(instance, field)
+    variants = getattr(instance, variants_column(field)) or {}
+    if not source or variants.get('source') != source.name:
+        return None
+    return variants.get(variant, {}).get(fmt)
+
+
+def needs_variants(instance, field):
+    source = getattr(instance, field)
+    variants = getattr(instance, variants_column(field)) or {}
+    return (source.name if source else None) != variants.get('source')
+
+
+def render(image, width, height, crop):
+    if crop:
+        return ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return resized
+
+
+def encode(image, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = io.BytesIO()
+    # No exif= argument: the EXIF block (GPS position, device) is not copied.
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def write_variants(source_name, field, image):
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    written = {'source': source_name}
+    for variant, (width, height, crop) in VARIANTS[field].items():
+        resized = render(image, width, height, crop)
+        written[variant] = {}
+        for fmt, (_, extension, _) in FORMATS.items():
+            name = f'{directory}/variants/{stem}_{variant}.{extension}'
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            written[variant][fmt] = default_storage.save(name, ContentFile(encode(resized, fmt)))
+    return written
+
+
+def variant_files(variants):
+    return {name for variant, files in variants.items() if variant != 'source' for name in files.values()}
+
+
+def generate(model, pk, field):
+    """(Re)build the variants of one row's image; a no-op if they are current."""
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_variants(instance, field):
+        return
+    source = getattr(instance, field)
+    previous = getattr(instance, variants_column(field)) or {}
+
+    if not source:
+        written = {}
+    else:
+        largest = max((w, h) for w, h, _ in VARIANTS[field].values())
+        try:
+            with source.open('rb') as file, Image.open(file) as image:
+                # Let the JPEG decoder downscale while decoding a multi-megapixel photo.
+                image.draft('RGB', largest)
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ('RGB', 'RGBA'):
+                    has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+                    image = image.convert('RGBA' if has_alpha else 'RGB')
+                written = write_variants(source.name, field, image)
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            logger.warning('Could not build variants for %s %s: %s', model.__name__, pk, exc)
+            # Remember the failure so the same file is not retried on every save.
+            written = {'source': source.name}
+
+    rows = model.objects.filter(pk=pk)
+    if source:
+        rows = rows.filter(**{field: source.name})
+    updated = rows.update(**{variants_column(field): written})
+    if not updated:
+        # The image changed while we worked; its own job will produce the right files.
+        return
+    for name in variant_files(previous) - variant_files(written):
+        default_storage.delete(name)
+    bump_collections(*MODEL_COLLECTIONS[model])
+
+
+# Users are waiting to see their new picture; run ahead of routine jobs.
+JOB_PRIORITY = 10
+
+
+def generate_job(model, pk, field):
+    generate(apps.get_model(model), pk, field)
+
+
+def schedule(instance, field):
+    """Enqueue building the variants of instance.<field>; runs once the current transaction commits."""
+    jobs.enqueue(
+        'thumbnails.generate',
+        {'model': instance._meta.label, 'pk': instance.pk, 'field': field},
+        priority=JOB_PRIORITY,
+    )
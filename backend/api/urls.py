@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AuthView, EmployeeViewSet, AttendanceView, EmployeeDocumentViewSet, WorkUpdateViewSet, TicketViewSet, TicketUpdateViewSet, MyTicketsView
+from .async_views import attendance_mark, event_stream
+from .views import AuthView, MeView, EmployeeViewSet, AttendanceView, EmployeeDocumentViewSet, WorkUpdateViewSet, TicketViewSet, TicketUpdateViewSet, MyTicketsView, ReportsView, AttendanceBatchView, AttendanceExportView, AttendanceRollupView, JobViewSet, SearchView, ChangesView
 
 router = DefaultRouter()
 router.register(r'employees', EmployeeViewSet, basename='employee')
@@ -8,10 +9,20 @@ router.register(r'documents', EmployeeDocumentViewSet, basename='document')
 router.register(r'work-updates', WorkUpdateViewSet, basename='work_update')
 router.register(r'tickets', TicketViewSet, basename='tickets')
 router.register(r'updates', TicketUpdateViewSet, basename='ticket_updates')
+router.register(r'jobs', JobViewSet, basename='jobs')
 
 urlpatterns = [
     path('auth/login/', AuthView.as_view(), name='login'),
+    path('auth/me/', MeView.as_view(), name='me'),
     path('attendance/mark/', AttendanceView.as_view(), name='mark_attendance'),
+    path('attendance/async/mark/', attendance_mark, name='mark_attendance_async'),
+    path('attendance/batch/', AttendanceBatchView.as_view(), name='attendance_batch'),
+    path('attendance/export/', AttendanceExportView.as_view(), name='attendance_export'),
     path('my-tickets/', MyTicketsView.as_view(), name='my_tickets'),
+    path('reports/summary/', ReportsView.as_view(), name='reports_summary'),
+    path('reports/attendance-rollups/', AttendanceRollupView.as_view(), name='attendance_rollups'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('changes/', ChangesView.as_view(), name='changes'),
+    path('events/', event_stream, name='events'),
     path('', include(router.urls)),
 ]
@@ -2,12 +2,33 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.views import APIView
+from rest_framework.exceptions import Throttled
+from rest_framework.parsers import JSONParser, MultiPartParser
 from django.contrib.auth import authenticate
 from rest_framework.authtoken.models import Token
 from .models import User, EmployeeProfile
 from .serializers import UserSerializer, CreateEmployeeSerializer
+from .caching import ConditionalGetMixin
+from .metrics import TimedSerializationMixin, timed
+from . import employee_import
+from .throttling import LoginIPThrottle, LoginUsernameThrottle
+from django.conf import settings
+from django.db import IntegrityError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# What the clients need right after signing in; the rest comes from /api/auth/me/
+LOGIN_USER_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'role', 'employee_id',
+    'profile.department', 'profile.designation', 'profile.profile_picture',
+    'profile.profile_picture_thumb', 'profile.profile_picture_thumb_jpeg',
+]
 
 class AuthView(APIView):
+    # Checked in initial(), so a throttled attempt never reaches the password hasher.
+    throttle_classes = [LoginUsernameThrottle, LoginIPThrottle]
+
     def post(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
@@ -15,11 +36,9 @@ class AuthView(APIView):
         if user:
             token, created = Token.objects.get_or_create(user=user)
             try:
-                user_data = UserSerializer(user).data
+                user_data = UserSerializer(user, fields=LOGIN_USER_FIELDS).data
             except Exception as e:
-                print(f"SERIALIZER ERROR: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception('Could not serialize user %s at login', user.pk)
                 return Response({'error': f"Serializer Error: {str(e)}"}, status=500)
             
             return Response({
@@ -28,11 +47,70 @@ class AuthView(APIView):
             })
         return Response({'error': 'Invalid Credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+    def throttled(self, request, wait):
+        raise Throttled(wait, detail='Too many login attempts. Try again later.')
+
+class MeView(APIView):
+    """The signed-in user with their full profile, which the login response leaves out."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(UserSerializer(request.user).data)
+
+# What the admin employee grid renders; served by ?view=summary
+EMPLOYEE_SUMMARY_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'role', 'employee_id',
+    'profile.department', 'profile.designation', 'profile.status', 'profile.is_active_employee',
+    'profile.employee_type', 'profile.phone_number', 'profile.location', 'profile.profile_picture',
+    'profile.profile_picture_thumb', 'profile.profile_picture_thumb_jpeg',
+]
+
+class EmployeeViewSet(TimedSerializationMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = User.objects.filter(role=User.IS_EMPLOYEE)
     serializer_class = UserSerializer
+    keyset_field = 'date_joined'
+    version_collections = ('employees',)
     # permission_classes = [permissions.IsAuthenticated] # Uncomment when Auth is fully ready
 
+    def get_requested_fields(self):
+        """Fields asked for with ?view=summary or ?fields=a,b,profile.c on reads; None means all."""
+        if self.action not in ('list', 'retrieve'):
+            return None
+        if self.request.query_params.get('view') == 'summary':
+            return EMPLOYEE_SUMMARY_FIELDS
+        fields = self.request.query_params.get('fields')
+        if fields:
+            return [f.strip() for f in fields.split(',') if f.strip()]
+        return None
+
+    def get_queryset(self):
+        queryset = self.queryset.select_related('profile')
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+
+        # Only load the columns the serializer will read.
+        user_columns = {f.name for f in User._meta.concrete_fields}
+        profile_columns = {f.name for f in EmployeeProfile._meta.concrete_fields}
+        columns = [self.keyset_field]
+        for field in fields:
+            if field == 'profile':
+                columns += [f'profile__{name}' for name in profile_columns]
+            elif field.startswith('profile.') and field[len('profile.'):] in profile_columns:
+                columns.append(f"profile__{field[len('profile.'):]}")
+            elif field.startswith('profile.profile_picture_'):
+                # Variant URLs are read from the picture and its variants column.
+                columns += ['profile__profile_picture', 'profile__profile_picture_variants']
+            elif field in user_columns:
+                columns.append(field)
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
     def create(self, request):
         serializer = CreateEmployeeSerializer(data=request.data)
         if serializer.is_valid():
@@ -46,19 +124,52 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 role=User.IS_EMPLOYEE,
                 employee_id=data['employee_id']
             )
-            EmployeeProfile.objects.create(
-                user=user,
-                department=data.get('department', 'Unassigned'),
-                designation=data.get('designation', 'Trainee'),
-                phone_number=data['phone_number'],
-                location=data.get('location', 'Head Office'),
-                date_of_birth=data.get('date_of_birth'),
-                gender=data.get('gender'),
-                employee_type=data.get('employee_type', 'Full-Time')
-            )
+            employee_import.new_profile(user, data).save()
             return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[permissions.IsAuthenticated],
+            parser_classes=[JSONParser, MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Create employees from a CSV or JSON upload (`file`) or a posted JSON list of rows,
+        all or nothing unless ?partial=true. Returns the per-row report of api/employee_import.py.
+
+        Runs in the request rather than as a job: a queued job would keep the rows'
+        plaintext passwords in the job table until it ran. The row cap bounds the
+        hashing; larger files go through `manage.py import_employees`.
+        """
+        if request.user.role != User.IS_ADMIN:
+            return Response({'error': 'Only admins can import employees'}, status=status.HTTP_403_FORBIDDEN)
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                file_format = 'json' if upload.name.lower().endswith('.json') else 'csv'
+                rows = employee_import.read_rows(upload.read(), file_format)
+            elif isinstance(request.data, list):
+                rows = request.data
+            else:
+                return Response({'error': 'Upload a CSV or JSON file as `file`, or post a JSON list of rows'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not rows:
+            return Response({'error': 'No rows to import'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.EMPLOYEE_IMPORT_MAX_ROWS:
+            return Response(
+                {'error': f'At most {settings.EMPLOYEE_IMPORT_MAX_ROWS} rows per request; use `manage.py import_employees` for larger files'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            report = employee_import.import_rows(
+                rows, partial=request.query_params.get('partial') == 'true',
+                workers=settings.EMPLOYEE_IMPORT_HASH_WORKERS or None,
+            )
+        except IntegrityError:
+            # A username or employee id was taken after validation; the transaction rolled back.
+            return Response({'error': 'Some of these employees were created meanwhile; nothing was imported. Retry the import.'}, status=status.HTTP_409_CONFLICT)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
     @action(detail=False, methods=['patch'], permission_classes=[permissions.IsAuthenticated])
     def update_profile(self, request):
         user = request.user
@@ -72,24 +183,24 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             return Response(UserSerializer(user).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-from .models import EmployeeDocument
 from .serializers import EmployeeDocumentSerializer
+from .permissions import visible_documents, visible_work_updates
 from rest_framework.parsers import MultiPartParser, FormParser
 
-class EmployeeDocumentViewSet(viewsets.ModelViewSet):
+class EmployeeDocumentViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     serializer_class = EmployeeDocumentSerializer
+    keyset_field = 'uploaded_at'
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
 
     def get_queryset(self):
-        # Allow Admin to see all or filter by user_id
-        if self.request.user.role == User.IS_ADMIN:
-            user_id = self.request.query_params.get('user_id')
-            if user_id:
-                return EmployeeDocument.objects.filter(user_id=user_id)
-            return EmployeeDocument.objects.all()
-        # Employees only see their own
-        return EmployeeDocument.objects.filter(user=self.request.user)
+        # Admins see all (optionally filtered by user_id); employees only their own.
+        # The same rule guards the files themselves in api/media.py.
+        documents = visible_documents(self.request.user)
+        user_id = self.request.query_params.get('user_id')
+        if user_id and self.request.user.role == User.IS_ADMIN:
+            return documents.filter(user_id=user_id)
+        return documents
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -97,8 +208,10 @@ class EmployeeDocumentViewSet(viewsets.ModelViewSet):
 from .models import WorkUpdate
 from .serializers import WorkUpdateSerializer
 
-class WorkUpdateViewSet(viewsets.ModelViewSet):
+class WorkUpdateViewSet(TimedSerializationMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = WorkUpdateSerializer
+    keyset_field = 'date'
+    version_collections = ('work_updates',)
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -106,59 +219,40 @@ class WorkUpdateViewSet(viewsets.ModelViewSet):
         # If Admin, can filter by any user
         if self.request.user.role == User.IS_ADMIN and user_id:
              return WorkUpdate.objects.filter(user_id=user_id)
-        # Otherwise show own updates (or all if admin checks without filter)
-        if self.request.user.role == User.IS_EMPLOYEE:
-             return WorkUpdate.objects.filter(user=self.request.user)
-        return WorkUpdate.objects.all()
+        # Otherwise own updates, or all for an admin without a filter
+        return visible_work_updates(self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 from .models import Attendance
 from .serializers import AttendanceSerializer
+from .pagination import KeysetPagination
 from django.utils import timezone
-from math import radians, sin, cos, sqrt, atan2
+from django.db import transaction
+from . import events, geofence, rollups
 
-class AttendanceView(APIView):
-    def post(self, request):
-        user_id = request.data.get('user_id')
-        lat = request.data.get('latitude')
-        lng = request.data.get('longitude')
-        
-        if not user_id or not lat or not lng:
-             return Response({'error': 'Missing location data'}, status=status.HTTP_400_BAD_REQUEST)
+def geofence_error(distance):
+    if distance is None:
+        return 'No office location is configured for you.'
+    return 'You are currently not at the office location.'
 
-        # Office Coordinates: 37/5, Aryagowda Rd... Chennai 600033
-        # Office Coordinates: 37/5, Aryagowda Rd, Chennai - from User provided map link
-        OFFICE_LAT = 13.0360406
-        OFFICE_LNG = 80.2181952
-        ALLOWED_RADIUS_METERS = 200 # Enforce 200m radius
-
-        # Haversine Formula
-        R = 6371000 # Radius of Earth in meters
-        dlat = radians(float(lat) - OFFICE_LAT)
-        dlon = radians(float(lng) - OFFICE_LNG)
-        a = sin(dlat / 2)**2 + cos(radians(OFFICE_LAT)) * cos(radians(float(lat))) * sin(dlon / 2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        distance = R * c
-        
-        print(f"DEBUG: User Lat: {lat}, User Lng: {lng}, Distance: {distance}m") # Debug log
+def user_department(user):
+    profile = getattr(user, 'profile', None)
+    return profile.department if profile else None
 
-        if distance > ALLOWED_RADIUS_METERS:
-             return Response({
-                 'error': 'You are currently not at the office location.',
-                 'distance': f"{int(distance)} meters away"
-             }, status=status.HTTP_403_FORBIDDEN)
-        
-        try:
-             user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-
-        # Check in or Check out
-        today = timezone.now().date()
+def record_check_in(user):
+    """Check the user in, or out if already checked in, for today. Returns (attendance, message)."""
+    today = timezone.now().date()
+    with transaction.atomic():
         attendance, created = Attendance.objects.get_or_create(user=user, date=today)
-        
+        if not created:
+            # Lock and re-read the row, as AttendanceBatchView.write does, so a
+            # concurrent punch for the same day waits and applies its rollup
+            # delta on top of this one instead of from the same `before`.
+            attendance = Attendance.objects.select_for_update().get(pk=attendance.pk, date=today)
+        before = None if created else rollups.attendance_contribution(attendance)
+
         if not attendance.check_in_time:
              attendance.check_in_time = timezone.now()
              attendance.status = 'Present'
@@ -172,8 +266,46 @@ class AttendanceView(APIView):
         else:
              message = "Already checked out for today."
 
+        rollups.record_changes([
+            (user.id, user_department(user), attendance.date, before, rollups.attendance_contribution(attendance))
+        ])
+    return attendance, message
+
+class AttendanceView(APIView):
+    keyset_field = 'date'
+
+    def post(self, request):
+        user_id = request.data.get('user_id')
+        lat = request.data.get('latitude')
+        lng = request.data.get('longitude')
+        
+        if not user_id or not lat or not lng:
+             return Response({'error': 'Missing location data'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+             lat, lng = float(lat), float(lng)
+        except (TypeError, ValueError):
+             return Response({'error': 'Invalid location data'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+             user = User.objects.select_related('profile').get(id=user_id)
+        except (User.DoesNotExist, ValueError):
+             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        site, distance = geofence.get_index().locate(lat, lng, user.id, user_department(user))
+        
+        logger.debug('Check-in for user %s at %s, %s: site %s, distance %s m', user.id, lat, lng, site, distance)
+
+        if site is None:
+             return Response({
+                 'error': geofence_error(distance),
+                 'distance': f"{int(distance)} meters away" if distance is not None else None
+             }, status=status.HTTP_403_FORBIDDEN)
+
+        attendance, message = record_check_in(user)
+
         return Response({
              'message': message,
+             'site': site.name,
              'distance': f"{int(distance)} meters",
              'data': AttendanceSerializer(attendance).data
         })
@@ -189,15 +321,186 @@ class AttendanceView(APIView):
         except User.DoesNotExist:
              return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        history = Attendance.objects.filter(user_id=user_id).order_by('-date')
-        serializer = AttendanceSerializer(history, many=True)
-        return Response(serializer.data)
+        # start_date / end_date bound the dates scanned; on Postgres they prune
+        # the monthly partitions (api/partitions.py) the query has to visit.
+        date_range, error = date_range_filters(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        history = Attendance.objects.filter(user_id=user_id, **date_range).order_by('-date', '-id')
+        paginator = KeysetPagination()
+        with timed(request, 'serialize'):
+            page = paginator.paginate_queryset(history, request, view=self)
+            if page is not None:
+                return paginator.get_paginated_response(AttendanceSerializer(page, many=True).data)
+            serializer = AttendanceSerializer(history, many=True)
+            return Response(serializer.data)
+
+from .serializers import AttendancePunchSerializer
+from datetime import timedelta
+
+ATTENDANCE_BATCH_LIMIT = 1000
+
+def apply_punch(attendance, timestamp):
+    """
+    Same check-in / check-out rules as AttendanceView.post, at the punch's own time.
+    Returns (result, message): 'ok' when the punch changed the row, 'ignored' when not.
+    """
+    if not attendance.check_in_time:
+        attendance.check_in_time = timestamp
+        attendance.status = 'Present'
+        attendance.location_verified = True
+        return 'ok', "Check-in successful!"
+    if timestamp < attendance.check_in_time:
+        # Offline devices can deliver a day's punches out of order: the earliest
+        # one is the check-in, and the one it displaces becomes the check-out.
+        if not attendance.check_out_time:
+            attendance.check_out_time = attendance.check_in_time
+        attendance.check_in_time = timestamp
+        return 'ok', "Check-in moved earlier to this punch."
+    if not attendance.check_out_time and timestamp > attendance.check_in_time:
+        attendance.check_out_time = timestamp
+        return 'ok', "Check-out successful!"
+    if timestamp in (attendance.check_in_time, attendance.check_out_time):
+        return 'ignored', "Duplicate punch."
+    return 'ignored', "Already checked out for today."
+
+class AttendanceBatchView(APIView):
+    """
+    Ingest queued punches in one request: [{user_id, latitude, longitude, timestamp}, ...]
+    (or {"punches": [...]}). Every punch is validated up front, valid ones are written with
+    bulk_create/bulk_update in one transaction, and each item gets its own result:
+    ok, ignored (a duplicate, or a punch after the day's check-out) or error.
+    Non-admin callers may only submit their own punches.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        punches = request.data.get('punches') if isinstance(request.data, dict) else request.data
+        if not isinstance(punches, list) or not punches:
+            return Response({'error': 'Expected a non-empty list of punches'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(punches) > ATTENDANCE_BATCH_LIMIT:
+            return Response(
+                {'error': f'At most {ATTENDANCE_BATCH_LIMIT} punches per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [{'index': index, 'status': 'error'} for index in range(len(punches))]
+        latest_allowed = timezone.now() + timedelta(minutes=5)
+        is_admin = request.user.role == User.IS_ADMIN
+        valid = []
+        for index, item in enumerate(punches):
+            serializer = AttendancePunchSerializer(data=item)
+            if not serializer.is_valid():
+                results[index]['error'] = serializer.errors
+                continue
+            punch = serializer.validated_data
+            if not is_admin and punch['user_id'] != request.user.id:
+                results[index]['error'] = 'Cannot record attendance for another user'
+                continue
+            if punch['timestamp'] > latest_allowed:
+                results[index]['error'] = 'Timestamp is in the future'
+                continue
+            valid.append((index, punch))
+
+        departments = dict(
+            User.objects.filter(id__in={p['user_id'] for _, p in valid}).values_list('id', 'profile__department')
+        )
+        for index, punch in valid:
+            if punch['user_id'] not in departments:
+                results[index]['error'] = 'User not found'
+        valid = [(index, punch) for index, punch in valid if punch['user_id'] in departments]
+
+        located = geofence.get_index().locate_many([
+            (p['latitude'], p['longitude'], p['user_id'], departments[p['user_id']]) for _, p in valid
+        ])
+        for (index, _), (site, distance) in zip(valid, located):
+            if site is None:
+                results[index]['error'] = geofence_error(distance)
+                if distance is not None:
+                    results[index]['distance'] = f"{int(distance)} meters away"
+        valid = [item for item, (site, _) in zip(valid, located) if site is not None]
+
+        # A single check-in racing the batch can insert the same (user, date) first;
+        # re-read and re-apply once if that happens.
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    written = self.write(valid, departments)
+                break
+            except IntegrityError:
+                if attempt:
+                    raise
+
+        for index, (attendance, result, message) in written.items():
+            results[index].update({'status': result, 'message': message, 'attendance_id': attendance.id})
+
+        return Response({
+            'succeeded': sum(1 for result in results if result['status'] == 'ok'),
+            'ignored': sum(1 for result in results if result['status'] == 'ignored'),
+            'failed': sum(1 for result in results if result['status'] == 'error'),
+            'results': results,
+        })
+
+    def write(self, valid, departments):
+        keys = {(p['user_id'], timezone.localdate(p['timestamp'])) for _, p in valid}
+        rows = {
+            (a.user_id, a.date): a
+            for a in Attendance.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in keys},
+                date__in={day for _, day in keys},
+            )
+        }
+        to_create, to_update = {}, {}
+        before = {}
+        written = {}
+        for index, punch in sorted(valid, key=lambda item: item[1]['timestamp']):
+            key = (punch['user_id'], timezone.localdate(punch['timestamp']))
+            attendance = rows.get(key)
+            if attendance is None:
+                attendance = rows[key] = to_create[key] = Attendance(user_id=key[0], date=key[1])
+            elif key not in to_create and key not in before:
+                before[key] = rollups.attendance_contribution(attendance)
+            result, message = apply_punch(attendance, punch['timestamp'])
+            if result == 'ok' and key not in to_create:
+                to_update[key] = attendance
+            written[index] = (attendance, result, message)
+
+        Attendance.objects.bulk_create(to_create.values())
+        Attendance.objects.bulk_update(
+            to_update.values(), ['check_in_time', 'check_out_time', 'status', 'location_verified']
+        )
+        rollups.record_changes(
+            (user_id, departments[user_id], day, before.get((user_id, day)), rollups.attendance_contribution(attendance))
+            for (user_id, day), attendance in {**to_create, **to_update}.items()
+        )
+        # bulk_create/bulk_update send no signals (see api/signals.py).
+        events.publish(
+            *[events.event_for(attendance, 'created') for attendance in to_create.values()],
+            *[events.event_for(attendance, 'updated') for attendance in to_update.values()],
+        )
+        return written
 
 from .models import Ticket, TicketUpdate
-from .serializers import TicketSerializer, TicketUpdateSerializer
+from .serializers import TicketCardSerializer, TicketSerializer, TicketUpdateSerializer
+from django.db.models import Count, F, Prefetch, Q, Window
+from rest_framework.utils.urls import replace_query_param
+from django.db.models.functions import RowNumber
+import calendar
+
+def ticket_read_queryset():
+    # Everything TicketSerializer touches, loaded in two queries however many tickets are listed:
+    # tickets joined to their assignee, then all of their updates joined to the author.
+    return Ticket.objects.select_related('assignee').prefetch_related(
+        Prefetch('updates', queryset=TicketUpdate.objects.select_related('user').order_by('created_at', 'id'))
+    )
+
+BOARD_PAGE_SIZE = 20
+BOARD_MAX_PAGE_SIZE = 100
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(TimedSerializationMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = TicketSerializer
+    version_collections = ('tickets',)
+    conditional_actions = ('list', 'board')
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -206,21 +509,99 @@ class TicketViewSet(viewsets.ModelViewSet):
         # UserDashboard: '/tickets' -> Pool? No, fetchTickets fetches all.
         # But 'poolTickets' filter: !t.userId.
         # So '/tickets' should probably return ALL tickets or Open tickets.
-        return Ticket.objects.all().order_by('-created_at')
+        return ticket_read_queryset().order_by('-created_at')
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-class MyTicketsView(APIView):
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """
+        Kanban board for one month: ?month=March&year=2026 (default: this month),
+        optional assignee=<id>|none and page_size. Returns a column per status
+        with its ticket count and the newest cards. A column's `next` link loads
+        its following cards (?status=<status>&cursor=...).
+
+        Two queries: the counts per status, then the first page_size + 1 cards of
+        every column in one ROW_NUMBER() window.
+        """
+        today = timezone.localdate()
+        month = request.query_params.get('month') or calendar.month_name[today.month]
+        try:
+            year = int(request.query_params.get('year') or today.year)
+            page_size = int(request.query_params.get('page_size') or BOARD_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': 'year and page_size must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = min(max(page_size, 1), BOARD_MAX_PAGE_SIZE)
+
+        tickets = Ticket.objects.filter(month=month, year=year)
+        assignee = request.query_params.get('assignee')
+        if assignee == 'none':
+            tickets = tickets.filter(assignee__isnull=True)
+        elif assignee:
+            if not assignee.isdigit():
+                return Response({'error': 'assignee must be a user id or "none"'}, status=status.HTTP_400_BAD_REQUEST)
+            tickets = tickets.filter(assignee_id=assignee)
+
+        statuses = [value for value, _ in Ticket.STATUS_CHOICES]
+        requested = request.query_params.get('status')
+        if requested:
+            if requested not in statuses:
+                return Response({'error': f"status must be one of {', '.join(statuses)}"}, status=status.HTTP_400_BAD_REQUEST)
+            statuses = [requested]
+            tickets = tickets.filter(status=requested)
+
+        # Cards page newest first on (created_at, id), the order KeysetPagination uses.
+        paginator = KeysetPagination()
+        counts = dict(tickets.values_list('status').annotate(count=Count('id')).order_by())
+        cursor = paginator.decode_cursor(request, Ticket._meta.get_field('created_at')) if requested else None
+        if cursor is not None:
+            created_at, pk = cursor
+            tickets = tickets.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        cards = tickets.select_related('assignee').annotate(
+            position=Window(RowNumber(), partition_by=F('status'), order_by=[F('created_at').desc(), F('id').desc()]),
+        ).filter(position__lte=page_size + 1).order_by('status', 'position')
+
+        columns = {value: [] for value in statuses}
+        for card in cards:
+            columns.setdefault(card.status, []).append(card)
+
+        base_url = request.build_absolute_uri()
+        labels = dict(Ticket.STATUS_CHOICES)
+        data = []
+        for value, rows in columns.items():
+            next_url = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                next_url = replace_query_param(
+                    replace_query_param(base_url, 'status', value),
+                    'cursor', paginator.encode_cursor(rows[-1].created_at, rows[-1].pk),
+                )
+            data.append({
+                'status': value,
+                'label': labels.get(value, value),
+                'count': counts.get(value, 0),
+                'tickets': TicketCardSerializer(rows, many=True).data,
+                'next': next_url,
+            })
+        return Response({'month': month, 'year': year, 'columns': data})
+
+class MyTicketsView(ConditionalGetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    version_collections = ('tickets',)
 
     def get(self, request):
-        tickets = Ticket.objects.filter(assignee=request.user).order_by('-created_at')
-        serializer = TicketSerializer(tickets, many=True)
-        return Response(serializer.data)
+        tickets = ticket_read_queryset().filter(assignee=request.user).order_by('-created_at')
+        paginator = KeysetPagination()
+        with timed(request, 'serialize'):
+            page = paginator.paginate_queryset(tickets, request, view=self)
+            if page is not None:
+                return paginator.get_paginated_response(TicketSerializer(page, many=True).data)
+            serializer = TicketSerializer(tickets, many=True)
+            return Response(serializer.data)
 
-class TicketUpdateViewSet(viewsets.ModelViewSet):
-    queryset = TicketUpdate.objects.all()
+class TicketUpdateViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
+    queryset = TicketUpdate.objects.select_related('user')
     serializer_class = TicketUpdateSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
@@ -232,3 +613,370 @@ class TicketUpdateViewSet(viewsets.ModelViewSet):
             serializer.save(user=self.request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+from django.db.models import Avg, DurationField, ExpressionWrapper, Sum
+from django.db.models.functions import ExtractHour, ExtractMinute, ExtractSecond, TruncMonth
+from django.utils.dateparse import parse_date
+
+REPORT_ATTENDANCE_STATS = {
+    'days_present': Count('id', filter=Q(status='Present')),
+    'half_days': Count('id', filter=Q(status='Half-Day')),
+    'avg_check_in_seconds': Avg(
+        ExtractHour('check_in_time') * 3600 + ExtractMinute('check_in_time') * 60 + ExtractSecond('check_in_time')
+    ),
+    'total_worked': Sum(
+        ExpressionWrapper(F('check_out_time') - F('check_in_time'), output_field=DurationField()),
+        filter=Q(check_in_time__isnull=False, check_out_time__isnull=False),
+    ),
+}
+
+REPORT_WORK_UPDATE_STATS = {
+    'open_work_updates': Count('id', filter=~Q(status='Completed')),
+    'completed_work_updates': Count('id', filter=Q(status='Completed')),
+}
+
+def date_range_filters(params):
+    """start_date / end_date query params (inclusive) as date lookups. Returns (lookups, error message)."""
+    lookups = {}
+    for param, lookup in (('start_date', 'date__gte'), ('end_date', 'date__lte')):
+        value = params.get(param)
+        if not value:
+            continue
+        try:
+            parsed = parse_date(value)
+        except ValueError: # well formed but not a real date, e.g. 2026-02-30
+            parsed = None
+        if parsed is None:
+            return None, f'Invalid {param}, expected YYYY-MM-DD'
+        lookups[lookup] = parsed
+    return lookups, None
+
+def report_filters(params):
+    """
+    Turn start_date / end_date / department query params into lookups shared by
+    Attendance and WorkUpdate querysets. Returns (lookups, error message).
+    """
+    lookups, error = date_range_filters(params)
+    if error:
+        return None, error
+    if params.get('department'):
+        lookups['user__profile__department'] = params['department']
+    return lookups, None
+
+def _report_rows(attendance, work_updates, keys):
+    # One GROUP BY query per source table, merged on the group key.
+    rows = {}
+    for row in attendance.values(*keys).annotate(**REPORT_ATTENDANCE_STATS).order_by():
+        rows[tuple(row[k] for k in keys)] = row
+    for row in work_updates.values(*keys).annotate(**REPORT_WORK_UPDATE_STATS).order_by():
+        rows.setdefault(tuple(row[k] for k in keys), {}).update(row)
+
+    results = []
+    for row in rows.values():
+        avg_check_in = row.get('avg_check_in_seconds')
+        if avg_check_in is not None:
+            avg_check_in = int(round(avg_check_in))
+            avg_check_in = f"{avg_check_in // 3600:02d}:{(avg_check_in % 3600) // 60:02d}"
+        total_worked = row.get('total_worked')
+        results.append({
+            **{k: row[k] for k in keys},
+            'days_present': row.get('days_present', 0),
+            'half_days': row.get('half_days', 0),
+            'avg_check_in_time': avg_check_in,
+            'total_hours': round(total_worked.total_seconds() / 3600, 2) if total_worked else 0.0,
+            'open_work_updates': row.get('open_work_updates', 0),
+            'completed_work_updates': row.get('completed_work_updates', 0),
+        })
+    return results
+
+class ReportsView(APIView):
+    """
+    Attendance and work-update statistics computed in the database.
+
+    Query params: start_date, end_date (YYYY-MM-DD) and department.
+    Returns per-employee, per-department and per-month rows in one response.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != User.IS_ADMIN:
+            return Response({'error': 'Only admins can view reports'}, status=status.HTTP_403_FORBIDDEN)
+
+        filters, error = report_filters(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        attendance = Attendance.objects.filter(**filters)
+        work_updates = WorkUpdate.objects.filter(**filters)
+
+        employees = []
+        user_keys = ['user_id', 'user__username', 'user__first_name', 'user__last_name', 'user__profile__department']
+        for row in _report_rows(attendance, work_updates, user_keys):
+            employees.append({
+                'user_id': row.pop('user_id'),
+                'username': row.pop('user__username'),
+                'name': f"{row.pop('user__first_name')} {row.pop('user__last_name')}".strip(),
+                'department': row.pop('user__profile__department'),
+                **row,
+            })
+        employees.sort(key=lambda item: item['username'])
+
+        departments = []
+        for row in _report_rows(attendance, work_updates, ['user__profile__department']):
+            departments.append({'department': row.pop('user__profile__department'), **row})
+        departments.sort(key=lambda item: item['department'] or '')
+
+        months = []
+        for row in _report_rows(
+            attendance.annotate(month=TruncMonth('date')),
+            work_updates.annotate(month=TruncMonth('date')),
+            ['month'],
+        ):
+            months.append({**row, 'month': row['month'].strftime('%Y-%m')})
+        months.sort(key=lambda item: item['month'])
+
+        return Response({
+            'filters': {
+                'start_date': request.query_params.get('start_date'),
+                'end_date': request.query_params.get('end_date'),
+                'department': request.query_params.get('department'),
+            },
+            'employees': employees,
+            'departments': departments,
+            'months': months,
+        })
+
+from django.http import StreamingHttpResponse
+from .exports import EXPORT_FORMATS, attendance_export_rows, export_filename
+from .streaming import asgi_streaming
+from .serializers import JobSerializer
+from . import jobs
+
+class AttendanceExportView(APIView):
+    """
+    Streams attendance with computed hours for payroll. POST the same
+    parameters to build the file in the background instead; the job's
+    download_url fetches it once it has succeeded.
+
+    Params: start_date, end_date, department and file_format (csv or xlsx).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        file_format, filters, error = self.export_params(request, request.query_params)
+        if error:
+            return error
+
+        stream, content_type = EXPORT_FORMATS[file_format]
+        response = StreamingHttpResponse(stream(attendance_export_rows(filters)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(filters, file_format)}"'
+        return asgi_streaming(request, response)
+
+    def post(self, request):
+        file_format, filters, error = self.export_params(request, request.data)
+        if error:
+            return error
+        job = jobs.enqueue(
+            'exports.attendance',
+            {
+                'filters': {k: v.isoformat() if hasattr(v, 'isoformat') else v for k, v in filters.items()},
+                'file_format': file_format,
+            },
+            user=request.user,
+        )
+        return Response(JobSerializer(job, context={'request': request}).data, status=status.HTTP_202_ACCEPTED)
+
+    def export_params(self, request, params):
+        """(file_format, filters, None), or (None, None, error response)."""
+        if request.user.role != User.IS_ADMIN:
+            return None, None, Response({'error': 'Only admins can export attendance'}, status=status.HTTP_403_FORBIDDEN)
+        file_format = params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return None, None, Response({'error': 'file_format must be csv or xlsx'}, status=status.HTTP_400_BAD_REQUEST)
+        filters, error = report_filters(params)
+        if error:
+            return None, None, Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        return file_format, filters, None
+
+from .models import DailyDepartmentAttendance, MonthlyUserAttendance
+
+class AttendanceRollupView(APIView):
+    """
+    Pre-aggregated attendance: one row per day per department and per month per employee.
+
+    Query params: start_date, end_date (YYYY-MM-DD) and department.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != User.IS_ADMIN:
+            return Response({'error': 'Only admins can view reports'}, status=status.HTTP_403_FORBIDDEN)
+        filters, error = report_filters(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        counters = ['present', 'absent', 'half_day', 'minutes_worked', 'late_arrivals']
+        daily = DailyDepartmentAttendance.objects.order_by('date', 'department')
+        monthly = MonthlyUserAttendance.objects.order_by('month', 'user_id')
+        if 'date__gte' in filters:
+            daily = daily.filter(date__gte=filters['date__gte'])
+            monthly = monthly.filter(month__gte=rollups.month_of(filters['date__gte']))
+        if 'date__lte' in filters:
+            daily = daily.filter(date__lte=filters['date__lte'])
+            monthly = monthly.filter(month__lte=filters['date__lte'])
+        if 'user__profile__department' in filters:
+            daily = daily.filter(department=filters['user__profile__department'])
+            monthly = monthly.filter(user__profile__department=filters['user__profile__department'])
+
+        return Response({
+            'daily': list(daily.values('date', 'department', *counters)),
+            'monthly': list(monthly.values('month', 'user_id', 'user__username', *counters)),
+        })
+
+    def post(self, request):
+        """Queue a rebuild of the rollups for start_date..end_date; poll the returned job."""
+        if request.user.role != User.IS_ADMIN:
+            return Response({'error': 'Only admins can rebuild reports'}, status=status.HTTP_403_FORBIDDEN)
+        filters, error = report_filters(request.data)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        if 'date__gte' not in filters or 'date__lte' not in filters:
+            return Response({'error': 'start_date and end_date are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if filters['date__gte'] > filters['date__lte']:
+            return Response({'error': 'start_date must not be after end_date'}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = jobs.enqueue(
+            'rollups.rebuild',
+            {'start': filters['date__gte'].isoformat(), 'end': filters['date__lte'].isoformat()},
+            user=request.user,
+        )
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+from .models import Job
+
+class JobViewSet(TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
+    """Status of background jobs: admins see every job, employees the ones they started."""
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Job.objects.all()
+        if self.request.user.role != User.IS_ADMIN:
+            queryset = queryset.filter(created_by=self.request.user)
+        job_status = self.request.query_params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset.order_by('-created_at', '-id')
+
+from . import search
+
+SEARCH_TYPES = {'tickets': 'ticket', 'ticket_updates': 'ticket_update', 'work_updates': 'work_update'}
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+
+class SearchView(APIView):
+    """
+    Ranked full-text search over tickets, ticket updates and work updates (api/search.py).
+
+    Query params: q, type (comma-separated: tickets, ticket_updates, work_updates),
+    page and page_size. `title` and `snippet` are HTML with matches wrapped in <mark>.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        text = request.query_params.get('q', '')
+        if not search.terms(text):
+            return Response({'error': 'Missing search text (q)'}, status=status.HTTP_400_BAD_REQUEST)
+
+        requested = [part for part in request.query_params.get('type', '').split(',') if part]
+        if any(part not in SEARCH_TYPES for part in requested):
+            return Response(
+                {'error': f"type must be one of {', '.join(SEARCH_TYPES)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = int(request.query_params.get('page_size', SEARCH_PAGE_SIZE))
+        except ValueError:
+            return Response({'error': 'page and page_size must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = min(max(page_size, 1), SEARCH_MAX_PAGE_SIZE)
+
+        # One extra row tells whether there is a next page.
+        results = search.search(
+            text, request.user, kinds=[SEARCH_TYPES[part] for part in requested],
+            limit=page_size + 1, offset=(page - 1) * page_size,
+        )
+        next_url = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            next_url = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+        return Response({'next': next_url, 'results': results})
+
+from . import changes
+from .permissions import visible_attendance
+from .serializers import TicketSyncSerializer
+
+CHANGES_LIMIT = 500
+CHANGES_MAX_LIMIT = 2000
+
+def employee_queryset(user):
+    return User.objects.filter(role=User.IS_EMPLOYEE).select_related('profile')
+
+# collection -> (rows the user may see, serializer); see api/changes.py for what is logged.
+SYNCED_COLLECTIONS = {
+    'tickets': (lambda user: Ticket.objects.select_related('assignee'), TicketSyncSerializer),
+    'ticket_updates': (lambda user: TicketUpdate.objects.select_related('user'), TicketUpdateSerializer),
+    'work_updates': (visible_work_updates, WorkUpdateSerializer),
+    'attendance': (visible_attendance, AttendanceSerializer),
+    'employees': (employee_queryset, UserSerializer),
+}
+
+class ChangesView(APIView):
+    """
+    Delta sync. Without `cursor`, returns the current cursor: take it, load the
+    collections from their list endpoints, then poll ?cursor=... for what changed
+    since. Each collection lists the upserted objects in full and the deleted ids.
+    `more` means another request will return further changes straight away.
+
+    Query params: cursor, collections (comma-separated, default all) and limit
+    (log rows read per request). Keep the same collections for a given cursor.
+    A cursor from before the log's retention window gets 410 with a fresh cursor,
+    as does one issued before the user's role changed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        requested = [part for part in request.query_params.get('collections', '').split(',') if part]
+        if any(part not in SYNCED_COLLECTIONS for part in requested):
+            return Response(
+                {'error': f"collections must be among {', '.join(SYNCED_COLLECTIONS)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        collections = requested or list(SYNCED_COLLECTIONS)
+
+        # Employees only read the log entries of their own work updates and attendance.
+        owner = None if request.user.role == User.IS_ADMIN else request.user.pk
+        cursor = request.query_params.get('cursor')
+        if not cursor:
+            return Response({'cursor': changes.current_cursor(owner), 'more': False, 'changes': {}})
+        try:
+            limit = min(max(int(request.query_params.get('limit', CHANGES_LIMIT)), 1), CHANGES_MAX_LIMIT)
+            changed, next_cursor, more = changes.read(cursor, collections, limit, owner)
+        except ValueError:
+            return Response({'error': 'Invalid cursor or limit'}, status=status.HTTP_400_BAD_REQUEST)
+        except changes.ExpiredCursor:
+            return Response(
+                {'error': 'Cursor expired; reload the collections', 'cursor': changes.current_cursor(owner)},
+                status=status.HTTP_410_GONE,
+            )
+
+        data = {}
+        for collection, objects in changed.items():
+            queryset, serializer_class = SYNCED_COLLECTIONS[collection]
+            upserted = [pk for pk, deleted in objects.items() if not deleted]
+            rows = list(queryset(request.user).filter(pk__in=upserted).order_by('pk')) if upserted else []
+            found = {row.pk for row in rows}
+            data[collection] = {
+                'upserted': serializer_class(rows, many=True, context={'request': request}).data,
+                # Gone, or no longer visible to this user (e.g. an employee promoted to admin). The log
+                # only holds entries this user may see, so ids of others' rows are never listed here.
+                'deleted': [pk for pk in objects if pk not in found],
+            }
+        return Response({'cursor': next_cursor, 'more': more, 'changes': data})
@@ -49,12 +49,35 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    # Rows per page of list endpoints; API_PAGE_SIZE=0 returns whole lists unless the client asks for a page
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)) or None,
+    # Sliding windows for /api/auth/login/ (api/throttling.py), as '<attempts>/<s|min|hour|day>'
+    'DEFAULT_THROTTLE_RATES': {
+        'login_username': os.environ.get('LOGIN_RATE_PER_USERNAME', '10/min'),
+        'login_ip': os.environ.get('LOGIN_RATE_PER_IP', '300/min'),
+    },
+    # Reverse proxies in front of Django; the throttles then key on X-Forwarded-For instead of REMOTE_ADDR
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if os.environ.get('NUM_PROXIES') else None,
+}
+
+# Login throttle counters live in the `throttle` cache. THROTTLE_CACHE_DIR (a
+# directory the workers of a host share) makes the limits per host instead of per process.
+THROTTLE_CACHE_DIR = os.environ.get('THROTTLE_CACHE_DIR', '')
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'throttle': (
+        {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': THROTTLE_CACHE_DIR}
+        if THROTTLE_CACHE_DIR else
+        {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle'}
+    ),
 }
 
 MIDDLEWARE = [
+    'api.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -93,16 +116,23 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts so concurrent check-ins
+        # queue on the busy timeout instead of failing with "database is locked".
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
     }
 }
 
 # Update database config for production (PostgreSQL via DATABASE_URL)
 import dj_database_url
 database_url = os.environ.get('DATABASE_URL')
+# SERVE_ASGI=True serves the app through uvicorn workers (see gunicorn.conf.py). Persistent
+# connections are per thread and async views hop threads, so ASGI closes
+# connections at the end of each request instead.
+SERVE_ASGI = os.environ.get('SERVE_ASGI', 'False') == 'True'
 if database_url:
     DATABASES['default'] = dj_database_url.config(
         default=database_url,
-        conn_max_age=600,
+        conn_max_age=0 if SERVE_ASGI else 600,
         conn_health_checks=True,
     )
     # Use 'prefer' for local Docker and 'require' for production (Supabase/Render)
@@ -166,6 +196,13 @@ USE_TZ = True
 
 AUTH_USER_MODEL = 'api.User'
 
+# Token -> user lookups cached per process by api.authentication.CachedTokenAuthentication
+TOKEN_AUTH_CACHE_SIZE = int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000))
+TOKEN_AUTH_CACHE_TTL = int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 60)) # seconds
+
+# Check-ins after this local time count as late arrivals in the attendance rollups
+ATTENDANCE_LATE_AFTER = os.environ.get('ATTENDANCE_LATE_AFTER', '09:30')
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
@@ -176,6 +213,40 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are authorised by api.media.serve_media. Set MEDIA_ACCEL to 'x-accel'
+# (nginx, with an `internal` location at MEDIA_ACCEL_PREFIX aliased to
+# MEDIA_ROOT) or 'x-sendfile' (Apache/lighttpd) to let the proxy send the bytes.
+# Set it whenever SERVE_ASGI is on: ASGI has no sendfile, so without it every
+# download, ranges included, is read through Python in 64 KB steps.
+MEDIA_ACCEL = os.environ.get('MEDIA_ACCEL', '')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', 30 * 24 * 3600)) # seconds, public uploads
+MEDIA_SIGNATURE_MAX_AGE = int(os.environ.get('MEDIA_SIGNATURE_MAX_AGE', 3600)) # seconds, signed document links
+
+# Background jobs (api/jobs.py, run by `manage.py run_workers`)
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_RETRY_BACKOFF = int(os.environ.get('JOB_RETRY_BACKOFF', 30)) # seconds before the first retry, doubled each time
+JOB_RETRY_BACKOFF_MAX = int(os.environ.get('JOB_RETRY_BACKOFF_MAX', 3600)) # seconds
+JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', 3600)) # seconds before a running job is presumed dead
+
+# Bulk employee import (api/employee_import.py). Each row costs a password hash, so
+# the endpoint is capped; `manage.py import_employees` takes files of any size.
+EMPLOYEE_IMPORT_MAX_ROWS = int(os.environ.get('EMPLOYEE_IMPORT_MAX_ROWS', 500))
+EMPLOYEE_IMPORT_HASH_WORKERS = int(os.environ.get('EMPLOYEE_IMPORT_HASH_WORKERS', 0)) # hashing processes; 0 means one per CPU
+
+# Delta sync (api/changes.py): `manage.py prune_changes` drops older log entries
+CHANGE_LOG_RETENTION_DAYS = int(os.environ.get('CHANGE_LOG_RETENTION_DAYS', 30))
+
+# Server-sent events (api/events.py, /api/events/ under ASGI)
+EVENT_STREAM_HEARTBEAT = int(os.environ.get('EVENT_STREAM_HEARTBEAT', 20)) # seconds between keepalive comments
+EVENT_STREAM_RETRY_MS = int(os.environ.get('EVENT_STREAM_RETRY_MS', 5000)) # client reconnect delay
+
+# Request metrics (api/metrics.py): Server-Timing headers, /metrics and slow-request logging
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'True') == 'True'
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 1000)) # log requests slower than this; 0 disables
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '') # bearer token for /metrics; without it /metrics only answers when DEBUG is on
+METRICS_DIR = os.environ.get('METRICS_DIR', '') # directory shared by the workers of a host; unset keeps metrics per process
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -17,8 +17,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 
 from django.http import JsonResponse
 
@@ -31,11 +32,18 @@ urlpatterns = [
     path('api/', include('api.urls')),
 ] 
 
-# Serve media files in development AND production (for this simple docker setup)
-from django.views.static import serve
+# Uploads go through api.media (permission checks, ranges, proxy handoff via
+# MEDIA_ACCEL). Static files are served by WhiteNoise from STATIC_ROOT.
+from api.media import serve_media
 from django.urls import re_path
 
 urlpatterns += [
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
-    re_path(r'^static/(?P<path>.*)$', serve, {'document_root': settings.STATIC_ROOT}),
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
+
+# Prometheus scrape target; see api/metrics.py for access control.
+from api.metrics import metrics_view
+
+urlpatterns += [
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,22 @@
+"""
+Gunicorn settings, picked up automatically from the working directory.
+
+WSGI (sync workers) stays the default. SERVE_ASGI=True runs config.asgi under
+uvicorn workers instead, so the async check-in endpoint (api/async_views.py)
+can hold many in-flight requests per worker during the morning spike.
+"""
+import os
+
+if os.environ.get('SERVE_ASGI', 'False') == 'True':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+
+
+def worker_exit(server, worker):
+    # Close the event listener's LISTEN connection (api/events.py) with the worker.
+    import sys
+    events = sys.modules.get('api.events')
+    if events is not None:
+        events.stop_listener()
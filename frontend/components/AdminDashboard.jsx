@@ -21,10 +21,12 @@ import {
 import { api } from '../services/api';
 import Reports from './Reports';
 import ProjectReport from './ProjectReport';
+import LoadMore from './LoadMore';
 import TicketConsole from './tickets/AdminDashboard.tsx';
 
 const AdminDashboard = ({ user, onLogout }) => {
     const [employees, setEmployees] = useState([]);
+    const [employeesNext, setEmployeesNext] = useState(null);
     const [loading, setLoading] = useState(false);
     const [adminSubTab, setAdminSubTab] = useState('All Employees');
     const [activeView, setActiveView] = useState('admin');
@@ -36,8 +38,9 @@ const AdminDashboard = ({ user, onLogout }) => {
     const fetchEmployees = async () => {
         setLoading(true);
         try {
-            const data = await api.getEmployees();
-            setEmployees(data);
+            const page = await api.getEmployees();
+            setEmployees(page.results);
+            setEmployeesNext(page.next);
         } catch (err) {
             console.error("Failed to fetch employees", err);
         } finally {
@@ -45,6 +48,15 @@ const AdminDashboard = ({ user, onLogout }) => {
         }
     };
 
+    // Only loaded pages are counted; "+" marks that more employees have not been fetched yet.
+    const loadedCount = (n) => `${n}${employeesNext ? '+' : ''}`;
+
+    const loadMoreEmployees = async (next) => {
+        const page = await api.getEmployees(next);
+        setEmployees(prev => [...prev, ...page.results]);
+        setEmployeesNext(page.next);
+    };
+
     const [showAddUserModal, setShowAddUserModal] = useState(false);
     const [newUserLoading, setNewUserLoading] = useState(false);
     const [newUserError, setNewUserError] = useState('');
@@ -56,19 +68,27 @@ const AdminDashboard = ({ user, onLogout }) => {
     });
 
     const [allWorkUpdates, setAllWorkUpdates] = useState([]);
+    const [workUpdatesNext, setWorkUpdatesNext] = useState(null);
 
     useEffect(() => {
         if (activeView === 'reports' || activeView === 'project-reports') {
             const fetchReports = async () => {
                 try {
-                    const updates = await api.getWorkUpdates();
-                    setAllWorkUpdates(updates);
+                    const page = await api.getWorkUpdates();
+                    setAllWorkUpdates(page.results);
+                    setWorkUpdatesNext(page.next);
                 } catch (e) { console.error("Failed to fetch reports", e); }
             };
             fetchReports();
         }
     }, [activeView]);
 
+    const loadMoreWorkUpdates = async (next) => {
+        const page = await api.getWorkUpdates(null, next);
+        setAllWorkUpdates(prev => [...prev, ...page.results]);
+        setWorkUpdatesNext(page.next);
+    };
+
 
     const [isEditingUser, setIsEditingUser] = useState(false);
 
@@ -161,7 +181,7 @@ const AdminDashboard = ({ user, onLogout }) => {
     );
 
     const [selectedEmployee, setSelectedEmployee] = useState(null);
-    const [empDetails, setEmpDetails] = useState({ attendance: [], work: [], documents: [] });
+    const [empDetails, setEmpDetails] = useState({ attendance: [], work: [], documents: [], next: {} });
     const [detailTab, setDetailTab] = useState('profile');
 
     useEffect(() => {
@@ -177,12 +197,27 @@ const AdminDashboard = ({ user, onLogout }) => {
                 api.getWorkUpdates(id),
                 api.getDocuments(id)
             ]);
-            setEmpDetails({ attendance: att, work, documents: docs });
+            setEmpDetails({
+                attendance: att.results, work: work.results, documents: docs.results,
+                next: { attendance: att.next, work: work.next, documents: docs.next }
+            });
         } catch (error) {
             console.error("Failed to fetch employee details", error);
         }
     };
 
+    const loadMoreDetails = async (key, next) => {
+        const id = selectedEmployee.id;
+        const page = key === 'attendance' ? await api.getAttendanceHistory(id, next)
+            : key === 'work' ? await api.getWorkUpdates(id, next)
+                : await api.getDocuments(id, next);
+        setEmpDetails(prev => ({
+            ...prev,
+            [key]: [...prev[key], ...page.results],
+            next: { ...prev.next, [key]: page.next }
+        }));
+    };
+
     if (selectedEmployee) {
         return (
             <div className="min-h-screen bg-slate-50 flex flex-col font-['Inter']">
@@ -292,6 +327,7 @@ const AdminDashboard = ({ user, onLogout }) => {
                                     ))}
                                     {empDetails.attendance.length === 0 && <tr><td colSpan="5" className="py-8 text-center text-slate-400 font-bold">No attendance records found.</td></tr>}
                                 </tbody>
+                                <tfoot><tr><td colSpan="5"><LoadMore next={empDetails.next.attendance} onLoad={next => loadMoreDetails('attendance', next)} /></td></tr></tfoot>
                             </table>
                         )}
 
@@ -308,6 +344,7 @@ const AdminDashboard = ({ user, onLogout }) => {
                                     </div>
                                 ))}
                                 {empDetails.work.length === 0 && <p className="text-center py-8 text-slate-400 font-bold">No work updates logged.</p>}
+                                <LoadMore next={empDetails.next.work} onLoad={next => loadMoreDetails('work', next)} />
                             </div>
                         )}
 
@@ -322,6 +359,7 @@ const AdminDashboard = ({ user, onLogout }) => {
                                     </div>
                                 ))}
                                 {empDetails.documents.length === 0 && <p className="col-span-3 text-center py-8 text-slate-400 font-bold">No documents uploaded.</p>}
+                                <LoadMore next={empDetails.next.documents} onLoad={next => loadMoreDetails('documents', next)} className="col-span-3" />
                             </div>
                         )}
                     </div>
@@ -350,8 +388,12 @@ const AdminDashboard = ({ user, onLogout }) => {
                 </header>
 
                 <main className="p-10 flex-1 overflow-y-auto custom-scrollbar relative">
-                    {activeView === 'reports' ? <Reports allWorkUpdates={allWorkUpdates} /> :
-                        activeView === 'project-reports' ? <ProjectReport allWorkUpdates={allWorkUpdates} /> :
+                    {activeView === 'reports' || activeView === 'project-reports' ? (
+                        <>
+                            {activeView === 'reports' ? <Reports allWorkUpdates={allWorkUpdates} /> : <ProjectReport allWorkUpdates={allWorkUpdates} />}
+                            <LoadMore next={workUpdatesNext} onLoad={loadMoreWorkUpdates} />
+                        </>
+                    ) :
                             activeView === 'tickets' ? <TicketConsole /> : (
                                 <>
                                     <div className="flex items-end justify-between mb-10">
@@ -362,9 +404,9 @@ const AdminDashboard = ({ user, onLogout }) => {
                                         <button onClick={() => setShowAddUserModal(true)} className="flex items-center gap-2.5 px-6 py-3.5 bg-[#0097a7] hover:bg-[#00838f] text-white rounded-xl font-bold transition-all shadow-lg shadow-cyan-500/20"><UserPlusIcon className="w-5 h-5" /> Add New User</button>
                                     </div>
                                     <div className="grid grid-cols-4 gap-6 mb-10">
-                                        <StatCard icon={<UsersGroupIcon className="text-cyan-500" />} label="TOTAL FORCE" value={employees.length} trend="+12%" />
-                                        <StatCard icon={<MapPinIcon className="text-cyan-500" />} label="CURRENTLY ON-SITE" value={employees.filter(e => e.profile?.status === 'On-Site').length} badge="Live" />
-                                        <StatCard icon={<ShieldCheckIcon className="text-cyan-500" />} label="ADMINS" value={employees.filter(e => e.role === 'ADMIN').length} badge="Internal" />
+                                        <StatCard icon={<UsersGroupIcon className="text-cyan-500" />} label="TOTAL FORCE" value={loadedCount(employees.length)} trend="+12%" />
+                                        <StatCard icon={<MapPinIcon className="text-cyan-500" />} label="CURRENTLY ON-SITE" value={loadedCount(employees.filter(e => e.profile?.status === 'On-Site').length)} badge="Live" />
+                                        <StatCard icon={<ShieldCheckIcon className="text-cyan-500" />} label="ADMINS" value={loadedCount(employees.filter(e => e.role === 'ADMIN').length)} badge="Internal" />
                                         <StatCard icon={<FileTextIcon className="text-red-500" />} label="PENDING ACCESS" value="7" badge="Critical" badgeColor="text-red-500" />
                                     </div>
                                     <div className="bg-white rounded-[32px] border border-slate-100 shadow-sm overflow-hidden mb-10">
@@ -372,7 +414,7 @@ const AdminDashboard = ({ user, onLogout }) => {
                                             <div className="flex gap-10">
                                                 {['All Employees', 'AI Research', 'Cloud Infra', 'Operations'].map(tab => (
                                                     <button key={tab} onClick={() => setAdminSubTab(tab)} className={`relative py-2 text-sm font-bold transition-all ${adminSubTab === tab ? 'text-cyan-600' : 'text-slate-400 hover:text-slate-600'}`}>
-                                                        {tab} {tab === 'All Employees' && <span className="ml-1 text-[10px] opacity-40">{employees.length}</span>}
+                                                        {tab} {tab === 'All Employees' && <span className="ml-1 text-[10px] opacity-40">{loadedCount(employees.length)}</span>}
                                                         {adminSubTab === tab && <div className="absolute -bottom-[25px] left-0 right-0 h-1 bg-[#00bcd4] rounded-full" />}
                                                     </button>
                                                 ))}
@@ -407,6 +449,7 @@ const AdminDashboard = ({ user, onLogout }) => {
                                                 )}
                                             </tbody>
                                         </table>
+                                        {!loading && <LoadMore next={employeesNext} onLoad={loadMoreEmployees} />}
                                     </div>
                                 </>
                             )}
@@ -20,6 +20,7 @@ import {
 } from './Icons';
 import { gemini } from '../services/geminiService';
 import { api } from '../services/api';
+import LoadMore from './LoadMore';
 import TicketDashboard from './tickets/UserDashboard.tsx';
 
 const EmployeeDashboard = ({ user, onLogout }) => {
@@ -28,12 +29,14 @@ const EmployeeDashboard = ({ user, onLogout }) => {
 
     // Attendance State
     const [attendanceHistory, setAttendanceHistory] = useState([]);
+    const [attendanceNext, setAttendanceNext] = useState(null);
     const [todayAttendance, setTodayAttendance] = useState(null);
     const [loadingAttendance, setLoadingAttendance] = useState(false);
     const [attMessage, setAttMessage] = useState('');
 
     // Documents State
     const [documents, setDocuments] = useState([]);
+    const [documentsNext, setDocumentsNext] = useState(null);
     const [loadingDocs, setLoadingDocs] = useState(false);
     const [uploading, setUploading] = useState(false);
     const fileInputRef = useRef(null);
@@ -49,9 +52,13 @@ const EmployeeDashboard = ({ user, onLogout }) => {
     // Profile State
     const [isEditingProfile, setIsEditingProfile] = useState(false);
     const [profileData, setProfileData] = useState({});
+    // Full profile, fetched on first visit to the profile view; login only returns the basics.
+    const [fullProfile, setFullProfile] = useState(null);
+    const profile = fullProfile || user?.profile;
 
     // Work Updates State
     const [workUpdates, setWorkUpdates] = useState([]);
+    const [workUpdatesNext, setWorkUpdatesNext] = useState(null);
     const [newWorkUpdate, setNewWorkUpdate] = useState({ project_name: '', description: '', status: 'In Progress' });
     const [loadingWork, setLoadingWork] = useState(false);
 
@@ -66,20 +73,30 @@ const EmployeeDashboard = ({ user, onLogout }) => {
             fetchDocuments();
         } else if (activeView === 'work') {
             fetchWorkUpdates();
-        }
-        if (user && user.profile) {
-            setProfileData(user.profile);
+        } else if (activeView === 'profile' && user && !fullProfile) {
+            fetchProfile();
         }
     }, [activeView, user]);
 
+    const fetchProfile = async () => {
+        try {
+            const me = await api.getMe();
+            setFullProfile(me.profile || {});
+            setProfileData(me.profile || {});
+        } catch (error) {
+            console.error("Failed to fetch profile", error);
+        }
+    };
+
     const fetchAttendance = async () => {
         setLoadingAttendance(true);
         try {
-            const history = await api.getAttendanceHistory(user.id);
-            setAttendanceHistory(history);
-            // Check if checked in today
+            const page = await api.getAttendanceHistory(user.id);
+            setAttendanceHistory(page.results);
+            setAttendanceNext(page.next);
+            // Check if checked in today (newest first, so it is on the first page)
             const todayStr = new Date().toISOString().split('T')[0];
-            const todayRecord = history.find(h => h.date === todayStr);
+            const todayRecord = page.results.find(h => h.date === todayStr);
             setTodayAttendance(todayRecord);
         } catch (err) {
             console.error(err);
@@ -88,11 +105,18 @@ const EmployeeDashboard = ({ user, onLogout }) => {
         }
     };
 
+    const loadMoreAttendance = async (next) => {
+        const page = await api.getAttendanceHistory(user.id, next);
+        setAttendanceHistory(prev => [...prev, ...page.results]);
+        setAttendanceNext(page.next);
+    };
+
     const fetchDocuments = async () => {
         setLoadingDocs(true);
         try {
-            const docs = await api.getDocuments();
-            setDocuments(docs);
+            const page = await api.getDocuments();
+            setDocuments(page.results);
+            setDocumentsNext(page.next);
         } catch (err) {
             console.error(err);
         } finally {
@@ -100,6 +124,12 @@ const EmployeeDashboard = ({ user, onLogout }) => {
         }
     };
 
+    const loadMoreDocuments = async (next) => {
+        const page = await api.getDocuments(null, next);
+        setDocuments(prev => [...prev, ...page.results]);
+        setDocumentsNext(page.next);
+    };
+
     const handleMarkAttendance = () => {
         if (!navigator.geolocation) {
             alert("Geolocation is not supported by your browser");
@@ -158,8 +188,9 @@ const EmployeeDashboard = ({ user, onLogout }) => {
     const fetchWorkUpdates = async () => {
         setLoadingWork(true);
         try {
-            const data = await api.getWorkUpdates(user.id);
-            setWorkUpdates(data);
+            const page = await api.getWorkUpdates(user.id);
+            setWorkUpdates(page.results);
+            setWorkUpdatesNext(page.next);
         } catch (error) {
             console.error(error);
         } finally {
@@ -167,6 +198,12 @@ const EmployeeDashboard = ({ user, onLogout }) => {
         }
     };
 
+    const loadMoreWorkUpdates = async (next) => {
+        const page = await api.getWorkUpdates(user.id, next);
+        setWorkUpdates(prev => [...prev, ...page.results]);
+        setWorkUpdatesNext(page.next);
+    };
+
     const handleCreateWorkUpdate = async (e) => {
         e.preventDefault();
         try {
@@ -264,7 +301,7 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                     <div className="relative">
                         <div className="w-32 h-32 rounded-full overflow-hidden border-4 border-slate-50 shadow-inner">
                             <img
-                                src={user?.profile?.profile_picture || `https://api.dicebear.com/7.x/avataaars/svg?seed=${user?.username}`}
+                                src={profile?.profile_picture || `https://api.dicebear.com/7.x/avataaars/svg?seed=${user?.username}`}
                                 alt="profile"
                                 className="w-full h-full object-cover"
                             />
@@ -354,19 +391,19 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                                 <div className="space-y-4">
                                     <ProfileInput label="FULLNAME" value={`${user?.first_name} ${user?.last_name}`} />
                                     <ProfileInput label="USERNAME" value={user?.username} />
-                                    <ProfileInput label="PHONE" value={user?.profile?.phone_number} />
-                                    <ProfileInput label="DOB" value={user?.profile?.date_of_birth} />
+                                    <ProfileInput label="PHONE" value={profile?.phone_number} />
+                                    <ProfileInput label="DOB" value={profile?.date_of_birth} />
                                 </div>
                             </div>
                             <div className="bg-white rounded-[32px] p-8 border border-slate-100 shadow-sm">
                                 <h3 className="font-bold text-slate-900 mb-6 flex items-center gap-2"><MapPinIcon className="w-4 h-4 text-slate-400" /> Location & Address</h3>
                                 <div className="bg-slate-50 rounded-2xl p-4 mb-4 flex items-center gap-4">
                                     <div className="w-12 h-12 bg-white rounded-xl shadow-sm flex items-center justify-center text-cyan-500"><BuildingIcon /></div>
-                                    <div><p className="text-sm font-bold text-slate-900 leading-none mb-1">Office Location</p><p className="text-[10px] font-medium text-slate-400 uppercase tracking-wider">{user?.profile?.location}</p></div>
+                                    <div><p className="text-sm font-bold text-slate-900 leading-none mb-1">Office Location</p><p className="text-[10px] font-medium text-slate-400 uppercase tracking-wider">{profile?.location}</p></div>
                                 </div>
                                 <div className="space-y-2 mt-4">
-                                    <p className="text-sm text-slate-600"><strong>Address:</strong> {user?.profile?.address_line1 || 'Not set'}</p>
-                                    <p className="text-sm text-slate-600"><strong>City:</strong> {user?.profile?.city || 'Not set'} - {user?.profile?.zip_code}</p>
+                                    <p className="text-sm text-slate-600"><strong>Address:</strong> {profile?.address_line1 || 'Not set'}</p>
+                                    <p className="text-sm text-slate-600"><strong>City:</strong> {profile?.city || 'Not set'} - {profile?.zip_code}</p>
                                 </div>
                             </div>
                         </div>
@@ -377,14 +414,14 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                             <div className="grid grid-cols-2 gap-8">
                                 <div className="bg-slate-50 p-6 rounded-2xl">
                                     <h4 className="font-bold text-slate-900 mb-2">School</h4>
-                                    <p className="text-sm text-slate-600 mb-1">{user?.profile?.school_name || 'Not provided'}</p>
-                                    <p className="text-xs text-slate-400">Year: {user?.profile?.school_year} | Grade: {user?.profile?.school_percentage}</p>
+                                    <p className="text-sm text-slate-600 mb-1">{profile?.school_name || 'Not provided'}</p>
+                                    <p className="text-xs text-slate-400">Year: {profile?.school_year} | Grade: {profile?.school_percentage}</p>
                                 </div>
                                 <div className="bg-slate-50 p-6 rounded-2xl">
                                     <h4 className="font-bold text-slate-900 mb-2">College</h4>
-                                    <p className="text-sm text-slate-600 mb-1">{user?.profile?.college_name || 'Not provided'}</p>
-                                    <p className="text-xs text-slate-400">{user?.profile?.college_degree} | Year: {user?.profile?.college_year}</p>
-                                    <p className="text-xs text-slate-400">CGPA: {user?.profile?.college_cgpa}</p>
+                                    <p className="text-sm text-slate-600 mb-1">{profile?.college_name || 'Not provided'}</p>
+                                    <p className="text-xs text-slate-400">{profile?.college_degree} | Year: {profile?.college_year}</p>
+                                    <p className="text-xs text-slate-400">CGPA: {profile?.college_cgpa}</p>
                                 </div>
                             </div>
                         </div>
@@ -396,14 +433,14 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                                 <div>
                                     <p className="text-[10px] font-bold text-slate-400 uppercase tracking-widest mb-2">Skills</p>
                                     <div className="flex flex-wrap gap-2">
-                                        {user?.profile?.skills ? user.profile.skills.split(',').map((skill, i) => (
+                                        {profile?.skills ? profile.skills.split(',').map((skill, i) => (
                                             <span key={i} className="px-3 py-1 bg-cyan-50 text-cyan-700 rounded-lg text-xs font-bold">{skill.trim()}</span>
                                         )) : <span className="text-slate-400 text-sm">No skills listed</span>}
                                     </div>
                                 </div>
                                 <div>
                                     <p className="text-[10px] font-bold text-slate-400 uppercase tracking-widest mb-2">Interests</p>
-                                    <p className="text-sm text-slate-600">{user?.profile?.hobbies || 'Not provided'}</p>
+                                    <p className="text-sm text-slate-600">{profile?.hobbies || 'Not provided'}</p>
                                 </div>
                             </div>
                         </div>
@@ -478,6 +515,7 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                                 {attendanceHistory.length === 0 && <tr><td colSpan="5" className="text-center py-4 text-slate-400">No records found</td></tr>}
                             </tbody>
                         </table>
+                        <LoadMore next={attendanceNext} onLoad={loadMoreAttendance} />
                     </div>
                 )}
             </div>
@@ -516,6 +554,7 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                             </div>
                         ))}
                         {documents.length === 0 && <div className="col-span-3 text-center py-12 text-slate-400">No documents uploaded yet.</div>}
+                        <LoadMore next={documentsNext} onLoad={loadMoreDocuments} className="col-span-3" />
                     </div>
                 )}
             </div>
@@ -567,6 +606,7 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                             ))}
                             {workUpdates.length === 0 && <tr><td colSpan="4" className="text-center py-8 text-slate-400 font-bold">No updates yet.</td></tr>}
                         </tbody>
+                        <tfoot><tr><td colSpan="4"><LoadMore next={workUpdatesNext} onLoad={loadMoreWorkUpdates} /></td></tr></tfoot>
                     </table>
                 )}
             </div>
@@ -583,7 +623,7 @@ const EmployeeDashboard = ({ user, onLogout }) => {
                     <div className="font-bold text-slate-900">Welcome back, {user?.first_name}!</div>
                     <div className="flex items-center gap-6">
                         <button className="p-2 text-indigo-600 bg-indigo-50 rounded-xl transition-colors relative"><BellIcon /><div className="absolute top-1 right-1 w-2 h-2 bg-indigo-600 rounded-full border-2 border-indigo-50" /></button>
-                        <div className="w-10 h-10 rounded-full bg-slate-100 overflow-hidden border border-slate-200"><img src={user?.profile?.profile_picture || `https://api.dicebear.com/7.x/avataaars/svg?seed=${user?.username}`} alt="avatar" className="w-full h-full object-cover" /></div>
+                        <div className="w-10 h-10 rounded-full bg-slate-100 overflow-hidden border border-slate-200"><img src={profile?.profile_picture || `https://api.dicebear.com/7.x/avataaars/svg?seed=${user?.username}`} alt="avatar" className="w-full h-full object-cover" /></div>
                     </div>
                 </header>
 
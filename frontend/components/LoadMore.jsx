@@ -0,0 +1,34 @@
+import React, { useState } from 'react';
+
+// "Load more" under a paginated list: shown while the last page had a `next` link.
+// onLoad(next) fetches that page and appends its rows.
+const LoadMore = ({ next, onLoad, className = '' }) => {
+    const [loading, setLoading] = useState(false);
+    if (!next) return null;
+
+    const handleClick = async () => {
+        setLoading(true);
+        try {
+            await onLoad(next);
+        } catch (err) {
+            console.error(err);
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div className={`flex justify-center py-4 ${className}`}>
+            <button
+                type="button"
+                onClick={handleClick}
+                disabled={loading}
+                className="px-5 py-2 rounded-xl bg-slate-100 text-slate-600 text-sm font-bold hover:bg-slate-900 hover:text-white transition-all disabled:opacity-50"
+            >
+                {loading ? 'Loading...' : 'Load more'}
+            </button>
+        </div>
+    );
+};
+
+export default LoadMore;
@@ -48,7 +48,9 @@ const Login = ({ onLogin }) => {
             onLogin(data.user);
         } catch (err) {
             console.error(err);
-            setError('Invalid credentials. Please check your username and password.');
+            setError(err.message.startsWith('Too many')
+                ? err.message
+                : 'Invalid credentials. Please check your username and password.');
         } finally {
             setLoading(false);
         }
@@ -21,9 +21,14 @@ import {
 import { getTicketSummary } from '../../services/gemini.ts';
 
 import { API_BASE_URL } from '../config.ts';
+// @ts-ignore
+import { fetchList, fetchPage } from '../../services/api';
+// @ts-ignore
+import LoadMore from '../LoadMore';
 
 const AdminDashboard: React.FC = () => {
   const [tickets, setTickets] = useState<Ticket[]>([]);
+  const [ticketsNext, setTicketsNext] = useState<string | null>(null);
   const [users, setUsers] = useState<User[]>([]);
   const [selectedTicket, setSelectedTicket] = useState<Ticket | null>(null);
   const [aiSummary, setAiSummary] = useState<string>('');
@@ -40,21 +45,18 @@ const AdminDashboard: React.FC = () => {
   React.useEffect(() => {
     const fetchData = async () => {
       try {
-        const [ticketsRes, usersRes] = await Promise.all([
-          fetch(`${API_BASE_URL}/tickets`, {
+        // Tickets load a page at a time; the assignee picker takes the first few pages of employees.
+        const [ticketsPage, usersData] = await Promise.all([
+          fetchPage(`${API_BASE_URL}/tickets/`, {
             headers: { 'Authorization': `Bearer ${auth.token}` }
           }),
-          fetch(`${API_BASE_URL}/employees`, {
+          fetchList(`${API_BASE_URL}/employees/`, {
             headers: { 'Authorization': `Bearer ${auth.token}` }
           })
         ]);
-
-        if (ticketsRes.ok && usersRes.ok) {
-          const ticketsData = await ticketsRes.json();
-          const usersData = await usersRes.json();
-          setTickets(ticketsData);
-          setUsers(usersData);
-        }
+        setTickets(ticketsPage.results);
+        setTicketsNext(ticketsPage.next);
+        setUsers(usersData);
       } catch (err) {
         console.error("Failed to fetch admin data", err);
       } finally {
@@ -67,6 +69,14 @@ const AdminDashboard: React.FC = () => {
     }
   }, [auth.token]);
 
+  const loadMoreTickets = async (url: string) => {
+    const page = await fetchPage(url, {
+      headers: { 'Authorization': `Bearer ${auth.token}` }
+    });
+    setTickets(prev => [...prev, ...page.results]);
+    setTicketsNext(page.next);
+  };
+
   // Group tickets by Month and Year
   const groupedTickets = useMemo(() => {
     const groups: { [key: string]: Ticket[] } = {};
@@ -271,6 +281,7 @@ const AdminDashboard: React.FC = () => {
               </div>
             </div>
           ))}
+          <LoadMore next={ticketsNext} onLoad={loadMoreTickets} />
         </div>
 
         {/* Action Panel */}
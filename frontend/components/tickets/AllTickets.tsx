@@ -2,22 +2,25 @@ import React, { useState, useEffect } from 'react';
 import { Ticket, TicketStatus } from '../TicketTypes.ts';
 import { Layers, Search, Filter, Calendar, ChevronRight, Clock, Loader2 } from 'lucide-react';
 import { API_BASE_URL } from '../config.ts';
+// @ts-ignore
+import { fetchPage } from '../../services/api';
+// @ts-ignore
+import LoadMore from '../LoadMore';
 
 const AllTickets: React.FC = () => {
     const [tickets, setTickets] = useState<Ticket[]>([]);
+    const [next, setNext] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
     const auth = JSON.parse(localStorage.getItem('tms_auth') || '{}');
 
     useEffect(() => {
         const fetchTickets = async () => {
             try {
-                const response = await fetch(`${API_BASE_URL}/tickets`, {
+                const page = await fetchPage(`${API_BASE_URL}/tickets/`, {
                     headers: { 'Authorization': `Bearer ${auth.token}` }
                 });
-                if (response.ok) {
-                    const data = await response.json();
-                    setTickets(data);
-                }
+                setTickets(page.results);
+                setNext(page.next);
             } catch (err) {
                 console.error("Failed to fetch tickets", err);
             } finally {
@@ -27,6 +30,14 @@ const AllTickets: React.FC = () => {
         fetchTickets();
     }, [auth.token]);
 
+    const loadMore = async (url: string) => {
+        const page = await fetchPage(url, {
+            headers: { 'Authorization': `Bearer ${auth.token}` }
+        });
+        setTickets(prev => [...prev, ...page.results]);
+        setNext(page.next);
+    };
+
     const getStatusStyles = (status: TicketStatus) => {
         switch (status) {
             case TicketStatus.OPEN: return 'bg-blue-50 text-blue-600 border-blue-100';
@@ -89,6 +100,7 @@ const AllTickets: React.FC = () => {
                         ))}
                     </tbody>
                 </table>
+                <LoadMore next={next} onLoad={loadMore} />
             </div>
         </div>
     );
@@ -20,6 +20,10 @@ import {
 } from 'lucide-react';
 
 import { API_BASE_URL } from '../config';
+// @ts-ignore
+import { fetchPage } from '../../services/api';
+// @ts-ignore
+import LoadMore from '../LoadMore';
 
 interface UserDashboardProps {
   user: User;
@@ -28,6 +32,7 @@ interface UserDashboardProps {
 const UserDashboard: React.FC<UserDashboardProps> = ({ user }) => {
   const [activeView, setActiveView] = useState<'mine' | 'pool'>('mine');
   const [allTickets, setAllTickets] = useState<Ticket[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [selectedTicket, setSelectedTicket] = useState<Ticket | null>(null);
   const [updateText, setUpdateText] = useState('');
   const [screenshot, setScreenshot] = useState<string | null>(null);
@@ -40,14 +45,12 @@ const UserDashboard: React.FC<UserDashboardProps> = ({ user }) => {
 
   const fetchTickets = async () => {
     try {
-      const url = activeView === 'mine' ? `${API_BASE_URL}/my-tickets` : `${API_BASE_URL}/tickets`;
-      const response = await fetch(url, {
+      const url = activeView === 'mine' ? `${API_BASE_URL}/my-tickets/` : `${API_BASE_URL}/tickets/`;
+      const page = await fetchPage(url, {
         headers: { 'Authorization': `Bearer ${auth.token}` }
       });
-      if (response.ok) {
-        const data = await response.json();
-        setAllTickets(data);
-      }
+      setAllTickets(page.results);
+      setNext(page.next);
     } catch (err) {
       console.error("Failed to fetch tickets", err);
     } finally {
@@ -59,6 +62,14 @@ const UserDashboard: React.FC<UserDashboardProps> = ({ user }) => {
     fetchTickets();
   }, [activeView, auth.token]);
 
+  const loadMoreTickets = async (url: string) => {
+    const page = await fetchPage(url, {
+      headers: { 'Authorization': `Bearer ${auth.token}` }
+    });
+    setAllTickets(prev => [...prev, ...page.results]);
+    setNext(page.next);
+  };
+
   // Form State for new ticket
   const [newTicketTitle, setNewTicketTitle] = useState('');
   const [newTicketDesc, setNewTicketDesc] = useState('');
@@ -298,6 +309,7 @@ const UserDashboard: React.FC<UserDashboardProps> = ({ user }) => {
               )}
             </div>
           )}
+          <LoadMore next={next} onLoad={loadMoreTickets} />
         </div>
 
         {/* Right: Interaction Workspace */}
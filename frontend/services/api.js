@@ -1,3 +1,27 @@
+// List endpoints return pages of {next, results}, newest first. fetchPage() reads one page;
+// a plain array (API_PAGE_SIZE=0) comes back as a single page with no `next`.
+export async function fetchPage(url, options = {}) {
+    const res = await fetch(url, options);
+    if (!res.ok) throw new Error(`Failed to fetch ${url}`);
+    const data = await res.json();
+    if (Array.isArray(data)) return { results: data, next: null };
+    return { results: data.results, next: data.next };
+}
+
+// Lists shown on screen load one page and fetch `next` on demand (see LoadMore). Lookups that want
+// more than a page, like the assignee picker, follow `next` for at most MAX_LIST_PAGES pages.
+export const MAX_LIST_PAGES = 5;
+
+export async function fetchList(url, options = {}, maxPages = MAX_LIST_PAGES) {
+    const rows = [];
+    for (let pages = 0; url && pages < maxPages; pages++) {
+        const page = await fetchPage(url, options);
+        rows.push(...page.results);
+        url = page.next;
+    }
+    return rows;
+}
+
 export const api = {
     baseUrl: import.meta.env.VITE_API_URL || 'http://localhost:8000/api',
 
@@ -7,6 +31,7 @@ export const api = {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ username, password })
         });
+        if (res.status === 429) throw new Error('Too many login attempts. Please wait a minute and try again.');
         if (!res.ok) throw new Error('Login failed');
         const data = await res.json();
         if (data.token) {
@@ -17,12 +42,23 @@ export const api = {
         return data;
     },
 
-    async getEmployees() {
-        const res = await fetch(`${this.baseUrl}/employees/`);
-        if (!res.ok) throw new Error('Failed to fetch employees');
+    // The login response only carries the basics; this is the signed-in user with their full profile.
+    async getMe() {
+        const token = localStorage.getItem('token');
+        const res = await fetch(`${this.baseUrl}/auth/me/`, {
+            headers: { 'Authorization': `Token ${token}` }
+        });
+        if (!res.ok) throw new Error('Failed to fetch profile');
         return await res.json();
     },
 
+    // List getters return one page; pass the previous page's `next` to get the following one.
+    async getEmployees(pageUrl = null) {
+        return await fetchPage(pageUrl || `${this.baseUrl}/employees/`).catch(() => {
+            throw new Error('Failed to fetch employees');
+        });
+    },
+
     async createEmployee(data) {
         const res = await fetch(`${this.baseUrl}/employees/`, {
             method: 'POST',
@@ -98,14 +134,14 @@ export const api = {
         return data;
     },
 
-    async getAttendanceHistory(userId) {
-        const res = await fetch(`${this.baseUrl}/attendance/mark/?user_id=${userId}`);
-        if (!res.ok) throw new Error('Failed to fetch attendance history');
-        return await res.json();
+    async getAttendanceHistory(userId, pageUrl = null) {
+        return await fetchPage(pageUrl || `${this.baseUrl}/attendance/mark/?user_id=${userId}`).catch(() => {
+            throw new Error('Failed to fetch attendance history');
+        });
     },
 
     // Documents
-    async getDocuments(userId = null) {
+    async getDocuments(userId = null, pageUrl = null) {
         const token = localStorage.getItem('token');
         let url = `${this.baseUrl}/documents/`;
         if (userId) {
@@ -113,11 +149,9 @@ export const api = {
         }
         const headers = token ? { 'Authorization': `Token ${token}` } : {};
 
-        const res = await fetch(url, {
-            headers: headers
+        return await fetchPage(pageUrl || url, { headers }).catch(() => {
+            throw new Error('Failed to fetch documents');
         });
-        if (!res.ok) throw new Error('Failed to fetch documents');
-        return await res.json();
     },
 
     async uploadDocument(formData) {
@@ -146,7 +180,7 @@ export const api = {
     },
 
     // Work Updates
-    async getWorkUpdates(userId = null) {
+    async getWorkUpdates(userId = null, pageUrl = null) {
         const token = localStorage.getItem('token');
         let url = `${this.baseUrl}/work-updates/`;
         if (userId) {
@@ -154,11 +188,9 @@ export const api = {
         }
         const headers = token ? { 'Authorization': `Token ${token}` } : {};
 
-        const res = await fetch(url, {
-            headers: headers
+        return await fetchPage(pageUrl || url, { headers }).catch(() => {
+            throw new Error('Failed to fetch work updates');
         });
-        if (!res.ok) throw new Error('Failed to fetch work updates');
-        return await res.json();
     },
 
     async createWorkUpdate(data) {